@@ -138,7 +138,7 @@ class Neo4jCodeRetriever(BaseRetriever):
                             for result in repo_results:
                                 result['secondary_repo'] = True
                                 result['repo_url'] = repo_url
-                                result['repo_name'] = repo_url.split('/')[-1].replace('.git', '')
+                                result['repo_name'] = repo_url.rsplit('/', 1)[-1].removesuffix('.git')
                             
                             secondary_results.extend(repo_results)
                         
@@ -283,7 +283,7 @@ def get_tools() -> List[Tool]:
                         
                         repo_name = "Unknown"
                         if repository_url:
-                            repo_name = repository_url.split('/')[-1].replace('.git', '')
+                            repo_name = repository_url.rsplit('/', 1)[-1].removesuffix('.git')
                             
                         formatted = [f"## Project Structure Information for {repo_name}\n"]
                         
@@ -330,7 +330,7 @@ def get_tools() -> List[Tool]:
                         # Standard formatting for other topics
                         repo_name = "Unknown"
                         if repository_url:
-                            repo_name = repository_url.split('/')[-1].replace('.git', '')
+                            repo_name = repository_url.rsplit('/', 1)[-1].removesuffix('.git')
                             
                         combined_text = "\n\n".join([r.get("text", "") for r in results])
                         return f"Project information for {repo_name} gathered from the knowledge graph:\n\n{combined_text}"
@@ -768,7 +768,7 @@ def get_tools() -> List[Tool]:
                     readme_files[path].append(content)
                 
                 # Format the output
-                repo_name = repository_url.split('/')[-1].replace('.git', '')
+                repo_name = repository_url.rsplit('/', 1)[-1].removesuffix('.git')
                 lines = [f"# Project Information for {repo_name}\n"]
                 
                 # Sort files to prioritize root README
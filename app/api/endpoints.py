@@ -31,11 +31,11 @@ async def stream_agent_response(query: str, conversation_history: str = None, re
         repository_context = ""
         if repository_url:
             # Get repository name for clearer context
-            repo_name = repository_url.split('/')[-1].replace('.git', '')
+            repo_name = repository_url.rsplit('/', 1)[-1].removesuffix('.git')
             
             # Find connected repositories
             connected_repos = await db_manager.get_connected_repositories(repository_url)
-            connected_repo_names = [repo.get('service_name', repo.get('url', '')).split('/')[-1].replace('.git', '') 
+            connected_repo_names = [repo.get('service_name', repo.get('url', '')).rsplit('/', 1)[-1].removesuffix('.git') 
                                    for repo in connected_repos]
             
             # Build context with prioritization logic
@@ -65,7 +65,7 @@ async def create_repository(repo: RepositoryCreate, background_tasks: Background
         
         # Create the repository node
         repo_url = repo.url
-        service_name = repo_url.split('/')[-1].replace('.git', '')
+        service_name = repo_url.rsplit('/', 1)[-1].removesuffix('.git')
         
         query = """
         MERGE (r:Repository {url: $url})
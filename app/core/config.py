@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     neo4j_uri: str = Field(..., env="NEO4J_URI")
     neo4j_username: str = Field(..., env="NEO4J_USERNAME")
     neo4j_password: str = Field(..., env="NEO4J_PASSWORD")
+    neo4j_database: str = Field(default="neo4j", env="NEO4J_DATABASE")
+
+    # Driver connection pool (shared by the API and the ingestion pipeline)
+    neo4j_max_connection_pool_size: int = Field(default=50, env="NEO4J_MAX_CONNECTION_POOL_SIZE")
+    neo4j_connection_acquisition_timeout: float = Field(default=60.0, env="NEO4J_CONNECTION_ACQUISITION_TIMEOUT")
 
     # OpenAI API Key
     openai_api_key: str = Field(..., env="OPENAI_API_KEY") # Make it required
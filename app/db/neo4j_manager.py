@@ -1,7 +1,7 @@
 # app/db/neo4j_manager.py
 import logging
 from neo4j import AsyncGraphDatabase, AsyncSession, AsyncTransaction, RoutingControl
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
@@ -9,10 +9,14 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 class Neo4jManager:
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j",
+                 max_connection_pool_size: int = 50, connection_acquisition_timeout: float = 60.0):
         self._uri = uri
         self._user = user
         self._password = password
+        self._database = database
+        self._max_connection_pool_size = max_connection_pool_size
+        self._connection_acquisition_timeout = connection_acquisition_timeout
         self._driver = None
 
     async def connect(self):
@@ -20,13 +24,33 @@ class Neo4jManager:
         if not self._driver:
             logger.info(f"Connecting to Neo4j at {self._uri}")
             try:
-                self._driver = AsyncGraphDatabase.driver(self._uri, auth=(self._user, self._password))
+                # One shared driver with a large pool so concurrent ingestion tasks reuse connections
+                self._driver = AsyncGraphDatabase.driver(
+                    self._uri,
+                    auth=(self._user, self._password),
+                    max_connection_pool_size=self._max_connection_pool_size,
+                    connection_acquisition_timeout=self._connection_acquisition_timeout,
+                    keep_alive=True
+                )
                 await self._driver.verify_connectivity()
                 logger.info("Neo4j connection established.")
             except Exception as e:
                 logger.error(f"Failed to connect to Neo4j: {e}", exc_info=True)
+                # Don't keep a half-open driver (and its pool) around
+                if self._driver:
+                    await self._driver.close()
+                    self._driver = None
                 raise
 
+    async def __aenter__(self):
+        """Connects on entry so `async with db_manager:` scopes the connection to a block."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Closes the connection exactly once, however the block exits."""
+        await self.close()
+
     def is_connected(self) -> bool:
         """Checks if the Neo4j connection is established."""
         return self._driver is not None
@@ -39,20 +63,41 @@ class Neo4jManager:
             self._driver = None
 
     @asynccontextmanager
-    async def get_session(self, database: str = "neo4j") -> AsyncSession:
+    async def get_session(self, database: Optional[str] = None) -> AsyncSession:
         """Provides an async context manager for a Neo4j session."""
         if not self._driver:
             await self.connect()
         session: AsyncSession = None
         try:
-            session = self._driver.session(database=database)
+            # Always name the target database to skip the home-database routing round-trip
+            session = self._driver.session(database=database or self._database)
             yield session
         finally:
             if session:
                 await session.close()
 
-    async def run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None, database: str = "neo4j"):
-        """Runs a Cypher query within a transaction."""
+    async def write_transaction(self, work: Callable[[AsyncTransaction], Awaitable[Any]],
+                                database: Optional[str] = None) -> Any:
+        """
+        Runs `work(tx)` as one managed write transaction shared by several queries.
+        
+        The driver commits when `work` returns and retries the whole unit on transient
+        errors (deadlocks, lock timeouts, leader switches), so `work` must be safe to
+        re-run and must not do slow non-database I/O while it holds locks.
+        """
+        async with self.get_session(database=database) as session:
+            return await session.execute_write(work)
+
+    async def run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None, database: Optional[str] = None,
+                        tx: Optional[AsyncTransaction] = None):
+        """Runs a Cypher query within a transaction (the given one, or a new managed one)."""
+        if tx is not None:
+            try:
+                return await self._execute_query(tx, query, parameters)
+            except Exception as e:
+                logger.error(f"Error running query: {query} | Params: {parameters} | Error: {e}", exc_info=True)
+                raise
+                
         async with self.get_session(database=database) as session:
             try:
                 result = await session.execute_write(self._execute_query, query, parameters)
@@ -61,6 +106,21 @@ class Neo4jManager:
                 logger.error(f"Error running query: {query} | Params: {parameters} | Error: {e}", exc_info=True)
                 raise
 
+    async def read_query(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+                         database: Optional[str] = None):
+        """
+        Runs a read-only Cypher query in a managed read transaction.
+        
+        Read transactions can be routed to any cluster member and take no write locks,
+        so lookups that feed later writes do not queue behind them.
+        """
+        async with self.get_session(database=database) as session:
+            try:
+                return await session.execute_read(self._execute_query, query, parameters)
+            except Exception as e:
+                logger.error(f"Error running read query: {query} | Params: {parameters} | Error: {e}", exc_info=True)
+                raise
+
     @staticmethod
     async def _execute_query(tx: AsyncTransaction, query: str, parameters: Optional[Dict[str, Any]] = None):
         """Helper function to execute a query within a transaction context."""
@@ -80,7 +140,8 @@ class Neo4jManager:
             # Core entity constraints
             "CREATE CONSTRAINT IF NOT EXISTS FOR (r:Repository) REQUIRE r.url IS UNIQUE",
             "CREATE CONSTRAINT IF NOT EXISTS FOR (s:Service) REQUIRE s.name IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE f.path IS UNIQUE", # Unique within the repo context ideally, simple approach first
+            # Relative paths (README.md, setup.py) repeat across repositories, so a File is unique per repository
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.repo_url) IS UNIQUE",
             "CREATE CONSTRAINT IF NOT EXISTS FOR (fn:Function) REQUIRE fn.unique_id IS UNIQUE", # Requires generating a unique ID
             "CREATE CONSTRAINT IF NOT EXISTS FOR (cl:Class) REQUIRE cl.unique_id IS UNIQUE", # Requires generating a unique ID
             "CREATE CONSTRAINT IF NOT EXISTS FOR (cc:CodeChunk) REQUIRE cc.chunk_id IS UNIQUE", # Requires generating a unique ID
@@ -100,6 +161,9 @@ class Neo4jManager:
             "CREATE INDEX class_name_idx IF NOT EXISTS FOR (cl:Class) ON (cl.name)",
             "CREATE INDEX api_path_idx IF NOT EXISTS FOR (api:ApiEndpoint) ON (api.api_path)",
             "CREATE INDEX datamodel_name_idx IF NOT EXISTS FOR (dm:DataModel) ON (dm.name)",
+            # Incremental re-ingest deletes endpoints and models by repository and file
+            "CREATE INDEX api_repo_file_idx IF NOT EXISTS FOR (api:ApiEndpoint) ON (api.repo_url, api.file_path)",
+            "CREATE INDEX datamodel_repo_file_idx IF NOT EXISTS FOR (dm:DataModel) ON (dm.repo_url, dm.file_path)",
         ]
         
         # Vector Index (adjust name and dimensions as needed)
@@ -112,6 +176,8 @@ class Neo4jManager:
         }} }}
         """
 
+        await self.drop_legacy_file_constraint()
+        
         async with self.get_session() as session:
             # Create constraints
             for query in constraint_queries:
@@ -138,6 +204,22 @@ class Neo4jManager:
                 
         logger.info("Constraints and vector index check complete.")
 
+    async def drop_legacy_file_constraint(self):
+        """
+        Drop the old uniqueness constraint on File.path alone, if it was created.
+        
+        Files are keyed by (path, repo_url); with the single-property constraint in place,
+        a second repository containing the same relative path cannot create its File node.
+        """
+        query = """
+        SHOW CONSTRAINTS YIELD name, labelsOrTypes, properties
+        WHERE labelsOrTypes = ['File'] AND properties = ['path']
+        RETURN name
+        """
+        for record in await self.read_query(query):
+            logger.info(f"Dropping legacy File.path uniqueness constraint {record['name']}")
+            await self.run_query(f"DROP CONSTRAINT `{record['name']}` IF EXISTS")
+
     async def get_repository_status(self, repo_url: str) -> Optional[str]:
         """
         Get the last indexed commit SHA for a repository.
@@ -154,7 +236,7 @@ class Neo4jManager:
         """
         
         try:
-            result = await self.run_query(query, {"repo_url": repo_url})
+            result = await self.read_query(query, {"repo_url": repo_url})
             if result and len(result) > 0:
                 return result[0].get("commit_sha")
             return None
@@ -177,6 +259,21 @@ class Neo4jManager:
              await session.execute_write(self._execute_query, query, parameters)
         logger.info(f"Successfully cleared data for repository: {repo_url}")
 
+    async def delete_file_nodes(self, repo_url: str, paths: List[str]):
+        """Deletes the given File nodes of a repository along with everything they contain."""
+        if not paths:
+            return
+        logger.info(f"Deleting {len(paths)} files from repository: {repo_url}")
+        # Files contain Functions, Classes, CodeChunks, ApiEndpoints and DataModels;
+        # Functions and Classes in turn contain CodeChunks
+        query = """
+        MATCH (f:File {repo_url: $repo_url})
+        WHERE f.path IN $paths
+        OPTIONAL MATCH (f)-[:CONTAINS*1..2]->(contained)
+        DETACH DELETE f, contained
+        """
+        await self.run_query(query, {"repo_url": repo_url, "paths": paths})
+
 
 
     async def batch_merge_nodes_relationships(self, batch: List[Dict[str, Any]]):
@@ -954,5 +1051,8 @@ class Neo4jManager:
 db_manager = Neo4jManager(
     uri=settings.neo4j_uri,
     user=settings.neo4j_username,
-    password=settings.neo4j_password
+    password=settings.neo4j_password,
+    database=settings.neo4j_database,
+    max_connection_pool_size=settings.neo4j_max_connection_pool_size,
+    connection_acquisition_timeout=settings.neo4j_connection_acquisition_timeout
 )
\ No newline at end of file
@@ -0,0 +1,162 @@
+# ingestion/cache.py
+"""
+Persistent SQLite cache for parse results and chunk embeddings.
+
+Entries are keyed by a hash of the content they were computed from, so
+unchanged files are not re-parsed and unchanged chunks are not re-embedded on
+the next ingestion run.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+from array import array
+from typing import Any, Dict, List, Optional
+
+from ingestion.config import ingestion_settings
+
+try:
+    # SIMD BLAKE3 is several times faster than SHA-256; both give 32-byte digests
+    from blake3 import blake3 as _content_hasher
+except ImportError:
+    _content_hasher = hashlib.sha256
+
+logger = logging.getLogger(__name__)
+
+# Hashes per IN (...) lookup; stays under SQLite's default 999 bound-parameter limit
+EMBEDDING_LOOKUP_BATCH = 900
+
+# Bump when a parser's output format changes; cached parse results from another
+# version are dropped when the cache is opened
+AST_CACHE_VERSION = 2
+
+
+def content_hash(content: str) -> bytes:
+    """
+    BLAKE3 digest of a text (SHA-256 if the blake3 package is not installed), used as
+    the cache key for whatever was derived from it.
+    """
+    return _content_hasher(content.encode('utf-8', errors='replace')).digest()
+
+
+class ASTCache:
+    """
+    SQLite-backed cache of parse results keyed by (path, content hash, parser), with a
+    second table of embeddings keyed by (content hash, model).
+    
+    Writes are committed on close() or when leaving a ``with`` block, which also evicts
+    the oldest entries once the database outgrows its size cap.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Open (creating if needed) the cache database.
+        
+        Args:
+            path: Location of the SQLite file (default: ingestion_settings.ast_cache_path)
+            max_bytes: Size cap enforced on close (default: ingestion_settings.ast_cache_max_mb)
+        """
+        self.path = path or ingestion_settings.ast_cache_path
+        self.max_bytes = max_bytes or ingestion_settings.ast_cache_max_mb * 1024 * 1024
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        
+        # Lookups come from the event loop and from worker threads
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != AST_CACHE_VERSION:
+            logger.info("AST cache version changed, dropping cached parse results")
+            self._conn.execute("DROP TABLE IF EXISTS ast_cache")
+            self._conn.execute(f"PRAGMA user_version = {AST_CACHE_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ast_cache ("
+            "path TEXT NOT NULL, sha BLOB NOT NULL, parser TEXT NOT NULL, result BLOB NOT NULL, "
+            "PRIMARY KEY (path, sha, parser))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "sha BLOB NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (sha, model))"
+        )
+        self._conn.commit()
+        logger.info(f"AST cache opened at {self.path}")
+
+    def get(self, path: str, sha: bytes, parser: str = "enhanced") -> Optional[Dict[str, Any]]:
+        """Return the cached result of the given parser for a file's content, or None."""
+        row = self._conn.execute(
+            "SELECT result FROM ast_cache WHERE path = ? AND sha = ? AND parser = ?", (path, sha, parser)
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, path: str, sha: bytes, result: Dict[str, Any], parser: str = "enhanced"):
+        """Store the given parser's result for a file's content."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ast_cache (path, sha, parser, result) VALUES (?, ?, ?, ?)",
+            (path, sha, parser, pickle.dumps(result, protocol=5))
+        )
+
+    def get_embedding(self, sha: bytes, model: str) -> Optional[List[float]]:
+        """Return the cached embedding of a text for the given model, or None."""
+        row = self._conn.execute(
+            "SELECT vector FROM embedding_cache WHERE sha = ? AND model = ?", (sha, model)
+        ).fetchone()
+        return array('f', row[0]).tolist() if row else None
+
+    def get_embeddings(self, shas: List[bytes], model: str) -> Dict[bytes, List[float]]:
+        """Return the cached embeddings among the given text hashes for the model, keyed by hash."""
+        found = {}
+        for i in range(0, len(shas), EMBEDDING_LOOKUP_BATCH):
+            batch = shas[i:i + EMBEDDING_LOOKUP_BATCH]
+            rows = self._conn.execute(
+                f"SELECT sha, vector FROM embedding_cache WHERE model = ? AND sha IN ({','.join('?' * len(batch))})",
+                (model, *batch)
+            )
+            for sha, vector in rows:
+                found[sha] = array('f', vector).tolist()
+        return found
+
+    def put_embedding(self, sha: bytes, model: str, vector: List[float]):
+        """Store the embedding of a text as packed float32 values (first write wins)."""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO embedding_cache (sha, model, dim, vector) VALUES (?, ?, ?, ?)",
+            (sha, model, len(vector), array('f', vector).tobytes())
+        )
+
+    def commit(self):
+        """Flush pending writes to disk."""
+        self._conn.commit()
+
+    def evict(self):
+        """Delete the oldest-written half of each table while the cache is over its size cap."""
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        while True:
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if (page_count - free_pages) * page_size <= self.max_bytes:
+                return
+                
+            # Rowids grow with every write, so the lowest belong to the oldest entries
+            deleted = 0
+            for table in ("ast_cache", "embedding_cache"):
+                count = self._conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                deleted += self._conn.execute(
+                    f"DELETE FROM {table} WHERE rowid IN "
+                    f"(SELECT rowid FROM {table} ORDER BY rowid LIMIT ?)", ((count + 1) // 2,)
+                ).rowcount
+            self._conn.commit()
+            logger.info(f"Evicted {deleted} entries from the AST cache")
+            if not deleted:
+                return
+
+    def close(self):
+        """Commit pending writes, enforce the size cap and close the database."""
+        self._conn.commit()
+        self.evict()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -26,6 +26,19 @@ class IngestionSettings(Settings):
         env="INGEST_TARGET_EXTENSIONS",
         description="File extensions to analyze, comma-separated"
     )
+    # Parallel fetch jobs (submodules / multiple remotes) for clone and pull
+    clone_concurrency: int = Field(
+        default=8,
+        env="CLONE_CONCURRENCY",
+        description="Number of parallel git fetch jobs used by clone and pull"
+    )
+    # Partial-clone filter: history blobs matching it are only fetched when needed.
+    # Full history is kept, since incremental ingestion diffs against the last indexed commit.
+    clone_filter: str | None = Field(
+        default="blob:limit=1m",
+        env="CLONE_FILTER",
+        description="git --filter spec for the initial clone (empty for a full clone)"
+    )
     # Local path where repositories will be cloned
     base_clone_dir: str = os.path.join(os.getcwd(), "ingestion", "repos")
     
@@ -40,9 +53,36 @@ class IngestionSettings(Settings):
     chunk_overlap: int = 200
 
     # Batch sizes for processing
-    embedding_batch_size: int = 100
+    embedding_batch_size: int = 256
     neo4j_batch_size: int = 500 # Adjust based on performance
 
+    # Embed through the OpenAI Batch API (about half the price, results within 24h)
+    use_batch_api: bool = Field(
+        default=False,
+        env="USE_BATCH_API",
+        description="Embed chunks with an OpenAI Batch API job instead of online requests"
+    )
+
+    # Local path of the Neo4j server's import directory. When set, first-time
+    # ingestion stages CodeChunks as CSV there and bulk-loads them with LOAD CSV.
+    neo4j_import_dir: str | None = Field(
+        default=None,
+        env="NEO4J_IMPORT_DIR",
+        description="Neo4j import directory used for LOAD CSV cold starts"
+    )
+
+    # SQLite file caching parse results and embeddings between runs
+    ast_cache_path: str = Field(
+        default=os.path.join(os.getcwd(), ".athenyx", "ast_cache.sqlite"),
+        env="AST_CACHE_PATH",
+        description="SQLite cache of parse results and embeddings keyed by content hash"
+    )
+    ast_cache_max_mb: int = Field(
+        default=2048,
+        env="AST_CACHE_MAX_MB",
+        description="Size above which the oldest cache entries are evicted on close"
+    )
+
     # Flag to force re-indexing even if commit SHA hasn't changed
     force_reindex: bool = Field(
         default=False,
@@ -33,20 +33,31 @@ class EnhancedLoader:
         self.base_loader = Neo4jLoader(repo_url)
         self.created_entities = {}  # Track created entities to avoid duplicates
         
-    async def load_data(self, parsed_data: List[Dict[str, Any]], chunks_with_embeddings: List[Dict[str, Any]]):
+    async def load_data(self, parsed_data: List[Dict[str, Any]], chunks_with_embeddings: List[Dict[str, Any]],
+                        chunks_preloaded: bool = False):
         """
         Load parsed data and chunks with embeddings into Neo4j.
         
         Args:
             parsed_data: List of parsed file data
             chunks_with_embeddings: List of code chunks with embeddings
+            chunks_preloaded: Whether the CodeChunk nodes were already written with load_chunk_batch
         """
         # Use the base loader for the core loading functionality
-        await self.base_loader.load_data(parsed_data, chunks_with_embeddings)
+        await self.base_loader.load_data(parsed_data, chunks_with_embeddings, chunks_preloaded=chunks_preloaded)
         
         # Enhance with additional relationships and semantic connections
         await self._enhance_relationships(parsed_data)
         
+    async def load_chunk_batch(self, chunks_with_embeddings: List[Dict[str, Any]]):
+        """
+        Write a batch of CodeChunk nodes ahead of load_data.
+        
+        Args:
+            chunks_with_embeddings: List of code chunks with embeddings
+        """
+        await self.base_loader.load_chunk_batch(chunks_with_embeddings)
+        
     async def _enhance_relationships(self, parsed_data: List[Dict[str, Any]]):
         """
         Enhance the knowledge graph with additional relationships based on parsed data.
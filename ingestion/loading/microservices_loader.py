@@ -8,6 +8,74 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Rows written per UNWIND transaction by load_all
+LOAD_BATCH_ROWS = 10000
+
+# One UNWIND statement per kind of row, in the order load_all writes them; services
+# come first so every other statement can MATCH them
+SERVICES_QUERY = """
+UNWIND $rows AS row
+MERGE (s:Service {name: row.name})
+SET s.language = row.language,
+    s.description = row.description,
+    s.endpoints = row.endpoints,
+    s.service_type = row.service_type
+"""
+
+API_ENDPOINTS_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {name: row.service_name})
+MERGE (e:ApiEndpoint {
+    path: row.path,
+    method: row.method,
+    protocol: row.protocol
+})
+MERGE (s)-[r:EXPOSES]->(e)
+SET e.parameters = row.parameters,
+    e.response_type = row.response_type,
+    e.authentication = row.authentication
+"""
+
+SERVICE_CALLS_QUERY = """
+UNWIND $rows AS row
+MATCH (s1:Service {name: row.source})
+MATCH (s2:Service {name: row.target})
+MERGE (s1)-[r:CALLS {
+    type: row.call_type,
+    protocol: row.protocol,
+    async: row.is_async
+}]->(s2)
+"""
+
+DATA_MODELS_QUERY = """
+UNWIND $rows AS row
+MERGE (m:DataModel {name: row.name})
+SET m.schema = row.schema,
+    m.validation = row.validation
+WITH m, row
+MATCH (s:Service {name: row.service_name})
+MERGE (s)-[r:USES_MODEL]->(m)
+"""
+
+CONFIG_DEPENDENCIES_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {name: row.service_name})
+MERGE (c:Configuration {key: row.key})
+SET c.type = row.value_type,
+    c.description = row.description
+MERGE (s)-[r:REQUIRES_CONFIG]->(c)
+"""
+
+SERVICE_INTERFACES_QUERY = """
+UNWIND $rows AS row
+MERGE (i:ServiceInterface {name: row.name})
+SET i.methods = row.methods,
+    i.description = row.description
+WITH i, row
+MATCH (s:Service {name: row.service_name})
+MERGE (s)-[r:IMPLEMENTS]->(i)
+"""
+
 class MicroservicesLoader:
     def __init__(self, neo4j_uri: str = None, neo4j_user: str = None, neo4j_password: str = None):
         """
@@ -104,41 +172,72 @@ class MicroservicesLoader:
 
     def load_microservice_structure(self, parsed_data: Dict[str, Any]):
         """Main method to load microservice structure into Neo4j."""
-        with self.driver.session() as session:
-            # Create service node
-            session.execute_write(self.create_service_node, {
+        self.load_all([parsed_data])
+
+    def load_all(self, services: List[Dict[str, Any]]):
+        """
+        Load the structure of many microservices, one UNWIND batch per kind of row.
+        
+        Each kind is written in transactions of up to LOAD_BATCH_ROWS rows, so a
+        repository's services cost a handful of round-trips rather than several per
+        service. A failed batch is retried in halves, so a malformed row only costs
+        itself; it is logged and the remaining rows are still written.
+        """
+        service_rows, endpoint_rows, call_rows = [], [], []
+        model_rows, config_rows, interface_rows = [], [], []
+        for parsed_data in services:
+            service_info = parsed_data.get("service_info", {})
+            relationships = parsed_data.get("relationships", {})
+            service_rows.append({
                 "name": parsed_data["service_name"],
                 "language": parsed_data["language"],
                 "description": parsed_data.get("description", ""),
-                "endpoints": parsed_data.get("service_info", {}).get("endpoints", []),
-                "service_type": parsed_data.get("service_info", {}).get("service_type")
+                "endpoints": service_info.get("endpoints", []),
+                "service_type": service_info.get("service_type")
             })
-
-            # Create API endpoints
-            for endpoint in parsed_data.get("api_info", []):
-                session.execute_write(self.create_api_endpoint, endpoint)
-
-            # Create service relationships
-            for rel in parsed_data.get("relationships", {}).get("service_calls", []):
-                session.execute_write(self.create_service_relationships, [rel])
-
-            # Create data models
-            for model in parsed_data.get("relationships", {}).get("data_dependencies", []):
-                session.execute_write(self.create_data_model, model)
-
-            # Create configuration dependencies
-            for config in parsed_data.get("service_info", {}).get("config_values", []):
-                session.execute_write(self.create_config_dependency, {
+            endpoint_rows.extend(parsed_data.get("api_info", []))
+            call_rows.extend(relationships.get("service_calls", []))
+            model_rows.extend(relationships.get("data_dependencies", []))
+            config_rows.extend(
+                {
                     "service_name": parsed_data["service_name"],
                     "key": config["key"],
                     "value_type": config["type"],
                     "description": config.get("description", "")
-                })
-
-            # Create service interfaces
-            if "service_interfaces" in parsed_data.get("relationships", {}):
-                for interface in parsed_data["relationships"]["service_interfaces"]:
-                    session.execute_write(self.create_service_interface, interface)
+                }
+                for config in service_info.get("config_values", [])
+            )
+            interface_rows.extend(relationships.get("service_interfaces", []))
+            
+        with self.driver.session() as session:
+            for query, rows in (
+                (SERVICES_QUERY, service_rows),
+                (API_ENDPOINTS_QUERY, endpoint_rows),
+                (SERVICE_CALLS_QUERY, call_rows),
+                (DATA_MODELS_QUERY, model_rows),
+                (CONFIG_DEPENDENCIES_QUERY, config_rows),
+                (SERVICE_INTERFACES_QUERY, interface_rows),
+            ):
+                for i in range(0, len(rows), LOAD_BATCH_ROWS):
+                    self._write_batch(session, query, rows[i:i + LOAD_BATCH_ROWS])
+
+    def _write_batch(self, session, query: str, rows: List[Dict[str, Any]]):
+        """Writes a batch in one transaction, bisecting it on failure down to the bad rows."""
+        try:
+            session.execute_write(self._write_rows, query, rows)
+        except Exception as e:
+            if len(rows) == 1:
+                logger.error(f"Error loading microservice row {rows[0]}: {e}")
+                return
+            logger.warning(f"Error loading microservice batch ({len(rows)} rows), retrying in halves: {e}")
+            half = len(rows) // 2
+            self._write_batch(session, query, rows[:half])
+            self._write_batch(session, query, rows[half:])
+
+    @staticmethod
+    def _write_rows(tx, query: str, rows: List[Dict[str, Any]]):
+        """Runs one UNWIND $rows statement."""
+        tx.run(query, rows=rows).consume()
 
     def create_indices(self):
         """Creates necessary indices for better query performance."""
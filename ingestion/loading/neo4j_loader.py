@@ -1,47 +1,519 @@
 # ingestion/loading/neo4j_loader.py
+import asyncio
+import contextvars
+import json
 import logging
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from app.db.neo4j_manager import db_manager # Use the instantiated manager
+from ingestion.cache import content_hash
 from ingestion.config import ingestion_settings
+import csv
+import re
 import uuid
-import hashlib
+
+try:
+    # Rust JSON encoder, several times faster than the stdlib for property serialization
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
+# Producer/consumer settings for CodeChunk ingestion
+CHUNK_QUEUE_MAXSIZE = 4
+CHUNK_CONSUMERS = 4
+CHUNK_PARAM_WORKERS = 4
+
+# Files written concurrently by load_data (each holds one pooled session while it runs)
+FILE_CONCURRENCY = 16
+
+# Regular files are written in multi-file batches of about this many File/Function/Class
+# rows, one transaction per batch
+FILE_BATCH_ROWS = 10000
+
+# Status code Neo4j returns when apoc.periodic.iterate is not installed
+APOC_MISSING_CODE = "Neo.ClientError.Procedure.ProcedureNotFound"
+
+# Cold-start LOAD CSV settings
+CHUNK_CSV_COLUMNS = ["chunk_id", "content", "start_line", "end_line",
+                     "parent_type", "file_path", "parent_id", "embedding"]
+
+# Chunk id markers of class/function chunks, matched in one case-insensitive scan
+CLASS_MARKER_RE = re.compile(r"_class_|::class", re.IGNORECASE)
+FUNCTION_MARKER_RE = re.compile(r"_function_|::func", re.IGNORECASE)
+CSV_ROWS_PER_TRANSACTION = 10000
+# Cypher expression decoding a _csv_text column; {col} is the row field
+CSV_TEXT_DECODE = "replace(replace(coalesce(row.{col}, ''), '%5C', '\\\\'), '%25', '%')"
+
+# Documentation classification for File nodes
+README_RE = re.compile(r"readme", re.IGNORECASE)
+DOC_DIR_RE = re.compile(r"/docs/|/documentation/")
+DOC_FILE_TYPES = frozenset({"md", "markdown", "txt", "rst", "adoc"})
+
+# READMEs larger than this are truncated before chunking
+README_MAX_BYTES = 1_000_000
+# Leading bytes inspected for NUL bytes to detect binary files
+BINARY_SNIFF_BYTES = 8192
+
+# Blank-line paragraph separator used to split README content
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+# Lower-cased file names picked up by the README scan
+README_FILENAMES = frozenset({"readme.md", "readme.txt", "readme"})
+
+# Directories never descended into by the README scan
+README_SKIP_DIRS = frozenset({".git", "node_modules", "vendor", ".venv", "venv", "dist", "build", "__pycache__"})
+
+# File keys written by the running write transaction; _write moves them into
+# _file_nodes_seen once that transaction commits
+_pending_file_nodes: contextvars.ContextVar[Optional[set]] = contextvars.ContextVar(
+    "pending_file_nodes", default=None
+)
+
+def _csv_text(value: str) -> str:
+    """
+    Escape free text for LOAD CSV, which (with legacy_quote_escaping) also reads a
+    backslash-quote as an escaped quote. Backslashes are written as %5C and percent
+    signs as %25; CSV_TEXT_DECODE reverses this on the server.
+    """
+    return value.replace('%', '%25').replace('\\', '%5C')
+
+def json_property(value: Any) -> str:
+    """Serialize a list or dict to the compact JSON string stored as a Neo4j property."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    # Same compact separators as orjson, so stored values do not depend on which is installed
+    return json.dumps(value, separators=(',', ':'))
+
+# Map file extensions to languages
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.scala': 'scala',
+    '.kt': 'kotlin',
+    '.swift': 'swift',
+    '.m': 'objective-c',
+    '.cs': 'csharp',
+    '.proto': 'protobuf',
+    '.md': 'markdown',
+    '.txt': 'text',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.xml': 'xml',
+    '.html': 'html',
+    '.css': 'css',
+    '.scss': 'scss',
+    '.sql': 'sql',
+    '.sh': 'shell',
+    '.bash': 'shell'
+}
+
+# Constraints backing the MERGE keys used by this loader, so every MERGE is an index seek.
+# The linking queries pin these indexes with USING INDEX hints, so they must exist.
+LOADER_CONSTRAINTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (r:Repository) REQUIRE r.url IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (s:Service) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.repo_url) IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (cc:CodeChunk) REQUIRE cc.chunk_id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (fn:Function) REQUIRE fn.unique_id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (cl:Class) REQUIRE cl.unique_id IS UNIQUE",
+]
+
+# (label, properties) of the constraints whose backing indexes are pinned by USING INDEX
+# hints; a query with a hint for a missing index fails instead of falling back to a scan
+HINTED_CONSTRAINTS = frozenset({
+    ("File", ("path", "repo_url")),
+    ("CodeChunk", ("chunk_id",)),
+    ("Function", ("unique_id",)),
+    ("Class", ("unique_id",)),
+})
+
+# Range indexes for the non-key predicates of the linking queries (line-range parent
+# fallback, per-repo File lookups by basename)
+LOADER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS FOR (fn:Function) ON (fn.file_path, fn.repo_url)",
+    "CREATE INDEX IF NOT EXISTS FOR (cl:Class) ON (cl.file_path, cl.repo_url)",
+    "CREATE INDEX IF NOT EXISTS FOR (f:File) ON (f.repo_url)",
+    "CREATE INDEX file_basename IF NOT EXISTS FOR (f:File) ON (f.basename, f.repo_url)",
+]
+
+
+def _is_documentation(path: str, file_type: str) -> bool:
+    """Whether a File node is documentation (README, markdown, docs directory, etc.)"""
+    return (
+        bool(README_RE.search(path)) or
+        file_type.lower() in DOC_FILE_TYPES or
+        bool(DOC_DIR_RE.search(path))
+    )
+
+
+def _split_markdown(content: str, size: int = 1000, overlap: int = 100) -> List[str]:
+    """
+    Split markdown into chunks of at most `size` characters on paragraph boundaries.
+    
+    Paragraphs are packed greedily; each new chunk starts with the last `overlap`
+    characters of the previous one when they fit. Paragraphs longer than `size`
+    fall back to a sliding character window.
+    """
+    chunks = []
+    current = ""
+    step = max(size - overlap, 1)
+    
+    for para in PARAGRAPH_RE.split(content):
+        para = para.strip()
+        if not para:
+            continue
+            
+        if len(para) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            for start in range(0, len(para), step):
+                chunks.append(para[start:start + size])
+                if start + size >= len(para):
+                    break
+            continue
+            
+        candidate = f"{current}\n\n{para}" if current else para
+        if len(candidate) <= size:
+            current = candidate
+            continue
+            
+        chunks.append(current)
+        tail = current[-overlap:] if overlap else ""
+        current = f"{tail}\n\n{para}" if tail and len(tail) + len(para) + 2 <= size else para
+        
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _derive_chunk_params(chunk_id: str, parent_id: str) -> Dict[str, str]:
+    """Derive the parent type and file path of a CodeChunk from its identifiers"""
+    # Extract file path from parent_id for file-level chunks
+    file_path = parent_id.replace("file::", "") if parent_id.startswith("file::") else ""
+    
+    # Determine parent type from parent_id or chunk metadata
+    parent_lower = parent_id.lower()
+    if parent_id.startswith("file::"):
+        # Check for class/function pattern in parent_id
+        if "::class::" in parent_lower:
+            parent_type = "Class"
+        elif "::function::" in parent_lower:
+            parent_type = "Function"
+        else:
+            # If not a class or function, it's a file-level chunk
+            parent_type = "File"
+    elif "::class::" in parent_lower or CLASS_MARKER_RE.search(chunk_id):
+        parent_type = "Class"
+    elif "::function::" in parent_lower or FUNCTION_MARKER_RE.search(chunk_id):
+        parent_type = "Function"
+    else:
+        # Default to the most common pattern from TreeSitterParser
+        # Check if parent_id contains double-colon and make a reasonable guess
+        if "::" in parent_id:
+            parts = parent_id.split("::")
+            if len(parts) > 1:
+                # If the second part is PascalCase, it's likely a class
+                second_part = parts[1]
+                if second_part and second_part[0].isupper():
+                    parent_type = "Class"
+                else:
+                    parent_type = "Function"
+            else:
+                parent_type = "File"  # Default to File if we can't determine
+        else:
+            parent_type = "File"  # Default to File
+    
+    return {"parent_type": parent_type, "file_path": file_path}
+
+
+def _build_chunk_params(chunk_refs: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+    """
+    Derive CodeChunk params for a batch of (chunk_id, parent_id) pairs.
+    
+    Module-level so it can be pickled and run in a ProcessPoolExecutor.
+    """
+    return [_derive_chunk_params(chunk_id, parent_id) for chunk_id, parent_id in chunk_refs]
+
+
+# Links a Class to every copy of a duplicated proto file
+PROTO_CLASS_LINK_QUERY = """
+MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
+USING INDEX cl:Class(unique_id)
+UNWIND $paths AS path
+MATCH (f:File {path: path, repo_url: $repo_url})
+USING INDEX f:File(path, repo_url)
+MERGE (f)-[:CONTAINS]->(cl)
+"""
+
+# Links a Function to every copy of a duplicated proto file
+PROTO_FUNCTION_LINK_QUERY = """
+MATCH (fn:Function {unique_id: $unique_id, repo_url: $repo_url})
+USING INDEX fn:Function(unique_id)
+UNWIND $paths AS path
+MATCH (f:File {path: path, repo_url: $repo_url})
+USING INDEX f:File(path, repo_url)
+MERGE (f)-[:CONTAINS]->(fn)
+"""
+
+# Creates or updates a Function and links it to its Service
+FUNCTION_MERGE_QUERY = """
+MERGE (fn:Function {unique_id: $unique_id})
+SET fn.name = $name,
+    fn.start_line = $start_line,
+    fn.end_line = $end_line,
+    fn.repo_url = $repo_url,
+    fn.service_name = $service_name,
+    fn.file_path = $file_path
+WITH fn
+MATCH (s:Service {name: $service_name})
+MERGE (fn)-[:BELONGS_TO]->(s)
+"""
+
+# FUNCTION_MERGE_QUERY plus the CONTAINS link from its (non-proto) File
+FUNCTION_MERGE_AND_LINK_QUERY = FUNCTION_MERGE_QUERY + """
+WITH fn
+MATCH (f:File {path: $file_path, repo_url: $repo_url})
+MERGE (f)-[:CONTAINS]->(fn)
+"""
+
+# Creates or updates a Class and links it to its Service
+CLASS_MERGE_QUERY = """
+MERGE (cl:Class {unique_id: $unique_id})
+SET cl.name = $name,
+    cl.start_line = $start_line,
+    cl.end_line = $end_line,
+    cl.repo_url = $repo_url,
+    cl.service_name = $service_name,
+    cl.file_path = $file_path,
+    cl.is_data_model = $is_data_model,
+    cl.is_api = $is_api,
+    cl.type = $class_type,
+    cl.framework = $framework
+WITH cl
+MATCH (s:Service {name: $service_name})
+MERGE (cl)-[:BELONGS_TO]->(s)
+"""
+
+# CLASS_MERGE_QUERY plus the CONTAINS link from its (non-proto) File
+CLASS_MERGE_AND_LINK_QUERY = CLASS_MERGE_QUERY + """
+WITH cl
+MATCH (f:File {path: $file_path, repo_url: $repo_url})
+MERGE (f)-[:CONTAINS]->(cl)
+"""
+
+# Creates all Function or Class nodes of a (non-proto) file and links them to the
+# File and Service in one statement, keyed by label. Classes of regular files are
+# never data models or APIs.
+SYMBOL_BULK_MERGE_QUERIES = {
+    label: f"""
+OPTIONAL MATCH (s:Service {{name: $service_name}})
+UNWIND $rows AS r
+MERGE (n:{label} {{unique_id: r.unique_id}})
+SET n.name = r.name,
+    n.start_line = r.start_line,
+    n.end_line = r.end_line,
+    n.repo_url = $repo_url,
+    n.service_name = $service_name,
+    n.file_path = r.file_path{extra}
+FOREACH (_ IN CASE WHEN s IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (n)-[:BELONGS_TO]->(s)
+)
+WITH n, r
+MATCH (f:File {{path: r.file_path, repo_url: $repo_url}})
+USING INDEX f:File(path, repo_url)
+MERGE (f)-[:CONTAINS]->(n)
+"""
+    for label, extra in (
+        ("Function", ""),
+        ("Class", """,
+    n.is_data_model = false,
+    n.is_api = false,
+    n.type = 'class',
+    n.framework = 'Unknown'"""),
+    )
+}
+
+# Creates a batch of File nodes and links them to their Repository and Service
+FILE_BULK_MERGE_QUERY = """
+OPTIONAL MATCH (r:Repository {url: $repo_url})
+OPTIONAL MATCH (s:Service {name: $service_name})
+UNWIND $rows AS row
+MERGE (f:File {path: row.path, repo_url: $repo_url})
+SET f.name = row.name,
+    f.basename = row.name,
+    f.language = row.language,
+    f.file_type = row.file_type,
+    f.service_name = $service_name,
+    f.is_documentation = row.is_documentation
+FOREACH (_ IN CASE WHEN r IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (f)-[:BELONGS_TO]->(r)
+)
+FOREACH (_ IN CASE WHEN s IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (f)-[:BELONGS_TO]->(s)
+)
+"""
+
+# Links a CodeChunk to its Function or Class parent, resolved by unique_id with a
+# fallback to the tightest enclosing line range, keyed by parent label
+CHUNK_PARENT_LINK_QUERIES = {
+    label: f"""
+MATCH (cc:CodeChunk {{chunk_id: $chunk_id}})
+OPTIONAL MATCH (by_id:{label} {{unique_id: $parent_id, repo_url: $repo_url}})
+USING INDEX by_id:{label}(unique_id)
+OPTIONAL MATCH (by_range:{label})
+WHERE by_id IS NULL
+AND by_range.file_path = $file_path
+AND by_range.repo_url = $repo_url
+AND by_range.start_line <= $start_line
+AND by_range.end_line >= $end_line
+WITH cc, by_id, by_range
+ORDER BY (by_range.end_line - by_range.start_line) ASC
+LIMIT 1
+WITH cc, coalesce(by_id, by_range) AS p
+FOREACH (_ IN CASE WHEN p IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (p)-[:CONTAINS]->(cc)
+)
+RETURN p IS NOT NULL AS linked
+"""
+    for label in ("Function", "Class")
+}
+
+
 class Neo4jLoader:
 
+    # Constraints only need to be created once per process
+    _indexes_ensured = False
+
     def __init__(self, repo_url: str):
         self.repo_url = repo_url
+        # The repo name is fixed for the lifetime of the loader, so derive it once
+        self._repo_name = ingestion_settings.extract_repo_name(repo_url)
+        self._repo_prefix = f"{self._repo_name}/"
+        # Repository display name as stored on the graph; the service name defaults to it
+        self._display_name = repo_url.rsplit('/', 1)[-1].removesuffix('.git')
+        self._service_name = self._display_name
+        # The repository is cloned at ingestion_settings.clone_dir
+        self._repo_root = os.path.join(ingestion_settings.clone_dir, self._repo_name)
+        # (path, repo_url) pairs already ensured by _ensure_file_node_exists
+        self._file_nodes_seen = set()
+        # Assume APOC is installed until the first bulk merge proves otherwise
+        self._apoc_available = True
 
-    def _normalize_path(self, path: str, repo_url: str) -> str:
+    def _normalize_path(self, path: str) -> str:
         """
         Normalize path by removing duplicate repository name prefix.
         
         Args:
             path: The file path to normalize
-            repo_url: Repository URL to extract repo name from
             
         Returns:
             Normalized path
         """
-        if not path:
-            return path
-            
-        repo_name = ingestion_settings.extract_repo_name(repo_url)
-        if path.startswith(f"{repo_name}/"):
-            return path[len(repo_name)+1:]
+        if path and path.startswith(self._repo_prefix):
+            return path[len(self._repo_prefix):]
         
         return path
 
-    async def load_data(self, parsed_data: List[Dict[str, Any]], chunks_with_embeddings: List[Dict[str, Any]]):
+    async def _write(self, work):
+        """
+        Run work(tx) in a managed (retried) write transaction.
+        
+        File nodes ensured by the unit are only remembered in _file_nodes_seen once it
+        has committed, so a rolled-back attempt never lets later writes skip them.
+        """
+        pending = set()
+        
+        async def attempt(tx):
+            # A retried attempt starts over, so forget what the failed one wrote
+            pending.clear()
+            token = _pending_file_nodes.set(pending)
+            try:
+                return await work(tx)
+            finally:
+                _pending_file_nodes.reset(token)
+                
+        result = await db_manager.write_transaction(attempt)
+        self._file_nodes_seen.update(pending)
+        return result
+
+    def _mark_file_node(self, key: Tuple[str, str]):
+        """Remember an ensured File key, deferred to the commit when inside _write"""
+        pending = _pending_file_nodes.get()
+        (pending if pending is not None else self._file_nodes_seen).add(key)
+
+    def _file_node_known(self, key: Tuple[str, str]) -> bool:
+        """Whether a File key was already ensured by a committed write or by the running one"""
+        pending = _pending_file_nodes.get()
+        return key in self._file_nodes_seen or (pending is not None and key in pending)
+
+    async def _ensure_indexes(self):
+        """Create the constraints and indexes backing this loader's lookups (idempotent, runs once)"""
+        if Neo4jLoader._indexes_ensured:
+            return
+            
+        # A leftover File.path constraint would reject the same path in a second repository
+        await db_manager.drop_legacy_file_constraint()
+        
+        for query in LOADER_CONSTRAINTS:
+            try:
+                await db_manager.run_query(query)
+            except Exception as e:
+                logger.warning(f"Could not create constraint (may already exist): {e}")
+                
+        # The linking queries cannot run without the hinted indexes, so fail the load
+        # now rather than on the first write that uses them
+        result = await db_manager.read_query(
+            "SHOW CONSTRAINTS YIELD labelsOrTypes, properties RETURN labelsOrTypes, properties"
+        )
+        existing = {
+            (record["labelsOrTypes"][0], tuple(record["properties"]))
+            for record in result
+            if record["labelsOrTypes"] and record["properties"]
+        }
+        missing = HINTED_CONSTRAINTS - existing
+        if missing:
+            raise RuntimeError(
+                "Missing uniqueness constraints required by the loader: " +
+                ", ".join(f"{label}({', '.join(props)})" for label, props in sorted(missing))
+            )
+                
+        for query in LOADER_INDEXES:
+            try:
+                await db_manager.run_query(query)
+            except Exception as e:
+                logger.warning(f"Could not create index (may already exist): {e}")
+                
+        Neo4jLoader._indexes_ensured = True
+
+    async def load_data(self, parsed_data: List[Dict[str, Any]], chunks_with_embeddings: List[Dict[str, Any]],
+                        chunks_preloaded: bool = False):
         """
         Load parsed data and code chunks into Neo4j.
         
         Args:
             parsed_data: List of parsed file data
             chunks_with_embeddings: List of code chunks with embeddings
+            chunks_preloaded: Whether the CodeChunk nodes were already written with
+                load_chunk_batch, so they only need linking
         """
         if not parsed_data:
             logger.warning("No parsed data to load.")
@@ -55,58 +527,71 @@ class Neo4jLoader:
                 logger.info("Connecting to Neo4j database")
                 await db_manager.connect()
                     
-            # Extract repository name from the URL for better tracking
-            repo_name = self.repo_url.split('/')[-1].replace('.git', '')
-            
-            # Determine service name (default to repository name without extension)
-            service_name = repo_name.replace('.git', '')
+            # Make sure MERGE lookups are backed by indexes before writing anything
+            await self._ensure_indexes()
             
-            # Create Repository node
-            logger.info(f"Creating repository node for {self.repo_url}")
-            await self._create_repository_node(self.repo_url, repo_name, service_name)
+            # Files ensured by a previous load may have been removed since
+            self._file_nodes_seen.clear()
+                    
+            # Repository and service names are derived once in __init__
+            repo_name = self._display_name
+            service_name = self._service_name
             
-            # Create Service node (if needed for the domain model)
-            logger.info(f"Creating service node for {service_name}")
-            await self._create_service_node(service_name, f"Service for {repo_name}", self.repo_url)
+            # Create Repository and Service nodes in a single round-trip
+            logger.info(f"Creating repository and service nodes for {self.repo_url}")
+            await self._bootstrap_repo_and_service(self.repo_url, repo_name, service_name)
             
-            # Process files
+            # Process files concurrently: protobuf and documentation files one at a time in their
+            # own transaction, all other files in large multi-file batches
             logger.info(f"Processing {len(parsed_data)} files")
+            single_files = []
+            bulk_files = []
             for file_data in parsed_data:
                 # Skip empty files
                 if not file_data:
                     continue
+                if self._needs_single_file_load(file_data):
+                    single_files.append(file_data)
+                else:
+                    bulk_files.append(file_data)
                     
-                # Process the file and create nodes
-                file_node = await self._process_file(file_data)
-                if not file_node:
-                    continue
-                
-                # Special handling for READMEs (ensure they are chunked for RAG)
-                file_path = file_data.get('path', '')
-                if file_data.get('is_documentation', False) or file_path.lower().endswith('.md'):
-                    await self._ensure_readme_chunks(file_path, self.repo_url, service_name)
+            semaphore = asyncio.Semaphore(FILE_CONCURRENCY)
+            await asyncio.gather(
+                *(self._load_file(file_data, service_name, semaphore) for file_data in single_files),
+                *(self._load_file_batch(batch, semaphore) for batch in self._batch_files(bulk_files))
+            )
             
             # Scan for README files that might not have been captured by the parser
             await self._scan_for_readme_files(self.repo_url, service_name)
                     
             # Process chunks with embeddings
             logger.info(f"Processing {len(chunks_with_embeddings)} code chunks with embeddings")
-            for chunk_data in chunks_with_embeddings:
-                # Skip empty chunks
-                if not chunk_data:
-                    continue
+            
+            # On a cold start, bulk-load the CodeChunk nodes from CSV so the consumers only link them
+            if not chunks_preloaded and ingestion_settings.neo4j_import_dir and await self._repository_is_empty():
+                chunks_preloaded = await self._cold_load_via_csv(chunks_with_embeddings, service_name)
                 
-                # Process the chunk and create nodes
-                await self._create_code_chunk_node(
-                    chunk_id=chunk_data.get('chunk_id', ''),
-                    content=chunk_data.get('content', ''),
-                    start_line=chunk_data.get('start_line', 0),
-                    end_line=chunk_data.get('end_line', 0),
-                    parent_id=chunk_data.get('parent_id', ''),
-                    embedding=chunk_data.get('embedding', []),
-                    repo_url=self.repo_url,
-                    service_name=service_name
+            # Overlap row building (producer) with Neo4j writes (consumers)
+            queue = asyncio.Queue(maxsize=CHUNK_QUEUE_MAXSIZE)
+            
+            async def produce():
+                await self._produce_chunk_batches(chunks_with_embeddings, queue, service_name)
+                for _ in range(CHUNK_CONSUMERS):
+                    await queue.put(None)
+                    
+            tasks = [asyncio.create_task(produce())] + [
+                asyncio.create_task(
+                    self._consume_chunk_batches(queue, service_name, create_nodes=not chunks_preloaded)
                 )
+                for _ in range(CHUNK_CONSUMERS)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except Exception:
+                # A failed producer or consumer would leave the others blocked on the queue
+                for task in tasks:
+                    task.cancel()
+                raise
                 
             logger.info(f"Successfully loaded data for repository {self.repo_url}")
         except Exception as e:
@@ -117,6 +602,402 @@ class Neo4jLoader:
             # Will be closed by the caller
             pass
 
+    async def load_chunk_batch(self, chunks_with_embeddings: List[Dict[str, Any]]):
+        """
+        Write a batch of CodeChunk nodes (content, properties and embedding) with one UNWIND.
+        
+        Lets chunks be written while the rest of the repository is still being embedded;
+        pass chunks_preloaded=True to load_data afterwards so it only links them.
+        
+        Args:
+            chunks_with_embeddings: List of code chunks with embeddings
+        """
+        if not chunks_with_embeddings:
+            return
+            
+        if not db_manager.is_connected():
+            logger.info("Connecting to Neo4j database")
+            await db_manager.connect()
+        await self._ensure_indexes()
+        
+        rows = [
+            self._build_code_chunk_row(
+                chunk_id=chunk_data.get('chunk_id', ''),
+                content=chunk_data.get('content', ''),
+                start_line=chunk_data.get('start_line', 0),
+                end_line=chunk_data.get('end_line', 0),
+                parent_id=chunk_data.get('parent_id', ''),
+                embedding=chunk_data.get('embedding', []),
+                repo_url=self.repo_url,
+                service_name=self._service_name
+            )
+            for chunk_data in chunks_with_embeddings
+            if chunk_data  # Skip empty chunks
+        ]
+        await self._bulk_merge("CodeChunk", "chunk_id", rows, vector_prop="embedding",
+                               unchanged_prop="chunk_sha")
+
+    async def _load_file(self, file_data: Dict[str, Any], service_name: str, semaphore: asyncio.Semaphore):
+        """Load one parsed file, bounded by the shared semaphore"""
+        async with semaphore:
+            # Special handling for READMEs (ensure they are chunked for RAG). The chunks are
+            # embedded before the transaction opens, so no HTTP call runs while it holds locks.
+            file_path = file_data.get('path', '')
+            readme_rows = []
+            if self._is_doc_file(file_data):
+                try:
+                    readme_rows = await self._build_readme_chunk_rows(file_path, self.repo_url)
+                except Exception as e:
+                    logger.error(f"Error building README chunks for {file_path}: {e}", exc_info=True)
+                    
+            async def work(tx):
+                file_node = await self._process_file(file_data, tx=tx)
+                if file_node and readme_rows:
+                    await self._write_readme_chunks(readme_rows, file_node, self.repo_url, service_name, tx=tx)
+                    
+            # Process the file and create nodes, writing all of its statements in one transaction
+            try:
+                await self._write(work)
+            except Exception as e:
+                # The driver has already retried transient errors; don't report success
+                # for a run that lost this file
+                logger.error(f"Error loading file {file_data.get('path')}: {e}")
+                raise
+
+    @staticmethod
+    def _is_doc_file(file_data: Dict[str, Any]) -> bool:
+        """Whether a parsed file is documentation that gets chunked for RAG"""
+        path = file_data.get('path') or ''
+        ext = file_data.get('ext')
+        detected_language = (
+            LANGUAGE_BY_EXTENSION.get(ext, 'unknown') if ext is not None else Neo4jLoader._detect_language(path)
+        )
+        return (
+            file_data.get('is_documentation', False) or
+            path.lower().endswith('.md') or
+            _is_documentation(path, detected_language)
+        )
+
+    @staticmethod
+    def _needs_single_file_load(file_data: Dict[str, Any]) -> bool:
+        """Whether a file needs the per-file path (protobuf linking, README and docs chunking)"""
+        path = file_data.get('path') or ''
+        return (
+            path.endswith('.proto') or
+            file_data.get('language') == 'protobuf' or
+            Neo4jLoader._is_doc_file(file_data)
+        )
+
+    @staticmethod
+    def _batch_files(files: List[Dict[str, Any]]):
+        """Group files into batches of about FILE_BATCH_ROWS File/Function/Class rows"""
+        batch = []
+        rows = 0
+        for file_data in files:
+            batch.append(file_data)
+            rows += 1 + len(file_data.get('functions', [])) + len(file_data.get('classes', []))
+            if rows >= FILE_BATCH_ROWS:
+                yield batch
+                batch = []
+                rows = 0
+        if batch:
+            yield batch
+
+    async def _load_file_batch(self, batch: List[Dict[str, Any]], semaphore: asyncio.Semaphore):
+        """Write a batch of regular files and their functions and classes in one transaction"""
+        files = []
+        for file_data in batch:
+            prepared = self._prepare_file(file_data)
+            if not prepared:
+                continue
+            file_path, file_name, language, detected_language = prepared
+            files.append((
+                {
+                    "path": file_path,
+                    "name": file_name,
+                    "language": language,
+                    "file_type": detected_language,
+                    "is_documentation": _is_documentation(file_path, detected_language)
+                },
+                self._symbol_rows(file_data.get('functions', []), file_path),
+                self._symbol_rows(file_data.get('classes', []), file_path)
+            ))
+            
+        if not files:
+            return
+            
+        async with semaphore:
+            await self._write_file_rows(files)
+            
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Loaded {len(files)} files, {sum(len(f[1]) for f in files)} functions "
+                         f"and {sum(len(f[2]) for f in files)} classes")
+
+    async def _write_file_rows(self, files: List[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]]):
+        """
+        Write (file_row, function_rows, class_rows) entries in one transaction.
+        
+        Transient errors are retried by the driver. Any other failure splits the batch
+        in halves and retries each, so one bad file cannot drop the rest of the batch;
+        a single file that still fails raises and fails the load.
+        """
+        params = {"repo_url": self.repo_url, "service_name": self._service_name}
+        file_rows = [file_row for file_row, _, _ in files]
+        symbol_rows = (
+            ("Function", [row for _, rows, _ in files for row in rows]),
+            ("Class", [row for _, _, rows in files for row in rows])
+        )
+        
+        async def work(tx):
+            await db_manager.run_query(FILE_BULK_MERGE_QUERY, {**params, "rows": file_rows}, tx=tx)
+            for label, rows in symbol_rows:
+                if rows:
+                    await db_manager.run_query(SYMBOL_BULK_MERGE_QUERIES[label], {**params, "rows": rows}, tx=tx)
+                    
+        try:
+            await self._write(work)
+        except Exception as e:
+            if len(files) == 1:
+                logger.error(f"Error loading file {file_rows[0]['path']}: {e}")
+                raise
+            logger.warning(f"Error loading batch of {len(files)} files, retrying in halves: {e}")
+            half = len(files) // 2
+            await self._write_file_rows(files[:half])
+            await self._write_file_rows(files[half:])
+            return
+            
+        self._file_nodes_seen.update((row["path"], self.repo_url) for row in file_rows)
+
+    async def _produce_chunk_batches(self, chunks_with_embeddings: List[Dict[str, Any]],
+                                     queue: asyncio.Queue, service_name: str):
+        """Build CodeChunk rows and push them onto the queue in batches"""
+        batch_size = ingestion_settings.neo4j_batch_size
+        chunks = [chunk_data for chunk_data in chunks_with_embeddings if chunk_data]  # Skip empty chunks
+        chunk_batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+        
+        # Derive per-chunk params in worker processes. Only the identifiers are shipped
+        # to the pool; content and embeddings stay in this process.
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=CHUNK_PARAM_WORKERS) as pool:
+            futures = [
+                loop.run_in_executor(
+                    pool,
+                    _build_chunk_params,
+                    [(c.get('chunk_id', ''), c.get('parent_id', '')) for c in chunk_batch]
+                )
+                for chunk_batch in chunk_batches
+            ]
+            
+            for chunk_batch, future in zip(chunk_batches, futures):
+                derived_params = await future
+                await queue.put([
+                    self._build_code_chunk_row(
+                        chunk_id=chunk_data.get('chunk_id', ''),
+                        content=chunk_data.get('content', ''),
+                        start_line=chunk_data.get('start_line', 0),
+                        end_line=chunk_data.get('end_line', 0),
+                        parent_id=chunk_data.get('parent_id', ''),
+                        embedding=chunk_data.get('embedding', []),
+                        repo_url=self.repo_url,
+                        service_name=service_name,
+                        derived=derived
+                    )
+                    for chunk_data, derived in zip(chunk_batch, derived_params)
+                ])
+
+    async def _consume_chunk_batches(self, queue: asyncio.Queue, service_name: str, create_nodes: bool = True):
+        """Write CodeChunk batches from the queue until a None sentinel is received"""
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+                
+            try:
+                # Create the chunk nodes in bulk (unless already loaded from CSV)
+                if create_nodes:
+                    await self._bulk_merge("CodeChunk", "chunk_id", batch, vector_prop="embedding",
+                                           unchanged_prop="chunk_sha")
+                    
+                # File-level chunks of regular files are linked in one UNWIND; everything
+                # else (Class/Function parents, protobuf and fuzzy fallbacks) is resolved per chunk.
+                # All links of the batch share one transaction.
+                file_rows = [
+                    {
+                        "chunk_id": row["chunk_id"],
+                        "file_path": row["props"]["file_path"],
+                        "repo_url": self.repo_url,
+                        "service_name": service_name
+                    }
+                    for row in batch
+                    if row["props"]["parent_type"] == "File"
+                    and row["props"]["file_path"]
+                    and not row["props"]["file_path"].endswith('.proto')
+                ]
+                
+                async def work(tx):
+                    linked = await self._bulk_link_chunks_to_files(file_rows, tx=tx)
+                    for row in batch:
+                        if row["chunk_id"] not in linked:
+                            await self._link_code_chunk_node(row, self.repo_url, service_name, tx=tx)
+                            
+                await self._write(work)
+            except Exception as e:
+                # The driver has already retried transient errors; don't report success
+                # for a load that lost these chunks
+                logger.error(f"Error loading batch of {len(batch)} code chunks: {e}")
+                raise
+
+    async def _bulk_link_chunks_to_files(self, rows: List[Dict[str, Any]], tx=None) -> set:
+        """
+        Link CodeChunks to their File and Service nodes with a single UNWIND.
+        
+        Args:
+            rows: List of {"chunk_id", "file_path", "repo_url", "service_name"} dictionaries
+            
+        Returns:
+            Set of chunk_ids that were linked
+        """
+        if not rows:
+            return set()
+            
+        query = """
+        UNWIND $rows AS r
+        MATCH (cc:CodeChunk {chunk_id: r.chunk_id})
+        USING INDEX cc:CodeChunk(chunk_id)
+        MATCH (f:File {path: r.file_path, repo_url: r.repo_url})
+        USING INDEX f:File(path, repo_url)
+        MERGE (f)-[:CONTAINS]->(cc)
+        WITH cc, r
+        MATCH (s:Service {name: r.service_name})
+        MERGE (cc)-[:BELONGS_TO]->(s)
+        RETURN r.chunk_id AS chunk_id
+        """
+        result = await db_manager.run_query(query, {"rows": rows}, tx=tx)
+        return {record["chunk_id"] for record in result}
+
+    async def _repository_is_empty(self) -> bool:
+        """Check whether this repository has no CodeChunk nodes yet (first-time ingestion)"""
+        query = """
+        OPTIONAL MATCH (cc:CodeChunk {repo_url: $repo_url})
+        WITH cc LIMIT 1
+        RETURN cc IS NULL AS is_empty
+        """
+        result = await db_manager.read_query(query, {"repo_url": self.repo_url})
+        return bool(result and result[0]["is_empty"])
+
+    async def _cold_load_via_csv(self, chunks_with_embeddings: List[Dict[str, Any]], service_name: str) -> bool:
+        """
+        Bulk-load CodeChunk nodes for a first-time ingestion through LOAD CSV.
+        
+        The CSV is staged in `neo4j_import_dir`, which must be the directory the
+        Neo4j server serves `file:///` URLs from.
+        
+        Args:
+            chunks_with_embeddings: List of code chunks with embeddings
+            service_name: Service name
+            
+        Returns:
+            True if the chunks were loaded, False if the caller should fall back to MERGE
+        """
+        rows = [
+            self._build_code_chunk_row(
+                chunk_id=chunk_data.get('chunk_id', ''),
+                content=chunk_data.get('content', ''),
+                start_line=chunk_data.get('start_line', 0),
+                end_line=chunk_data.get('end_line', 0),
+                parent_id=chunk_data.get('parent_id', ''),
+                embedding=chunk_data.get('embedding', []),
+                repo_url=self.repo_url,
+                service_name=service_name
+            )
+            for chunk_data in chunks_with_embeddings
+            if chunk_data
+        ]
+        if not rows:
+            return False
+            
+        file_name = f"chunks_{self._repo_name}_{uuid.uuid4().hex}.csv"
+        csv_path = os.path.join(ingestion_settings.neo4j_import_dir, file_name)
+        
+        def _write_csv():
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(CHUNK_CSV_COLUMNS)
+                for row in rows:
+                    props = row["props"]
+                    writer.writerow([
+                        _csv_text(row["chunk_id"]), _csv_text(props["content"]), props["start_line"], props["end_line"],
+                        props["parent_type"], _csv_text(props["file_path"]), _csv_text(props["parent_id"]),
+                        ";".join(map(str, row["vector"]))
+                    ])
+        
+        # LOAD CSV ... IN TRANSACTIONS must run in an auto-commit transaction.
+        # Embeddings go through setNodeVectorProperty (float32), as on the MERGE path.
+        # chunk_sha is deliberately not written: a load that fails part-way leaves nodes
+        # the MERGE fallback must rewrite rather than skip as unchanged.
+        query = f"""
+        LOAD CSV WITH HEADERS FROM $csv_url AS row
+        CALL {{
+            WITH row
+            MERGE (cc:CodeChunk {{chunk_id: {CSV_TEXT_DECODE.format(col="chunk_id")}}})
+            SET cc.content = {CSV_TEXT_DECODE.format(col="content")},
+                cc.start_line = toInteger(row.start_line),
+                cc.end_line = toInteger(row.end_line),
+                cc.repo_url = $repo_url,
+                cc.service_name = $service_name,
+                cc.parent_type = row.parent_type,
+                cc.file_path = {CSV_TEXT_DECODE.format(col="file_path")},
+                cc.parent_id = {CSV_TEXT_DECODE.format(col="parent_id")}
+            WITH cc, row
+            WHERE row.embedding IS NOT NULL AND row.embedding <> ''
+            CALL db.create.setNodeVectorProperty(cc, 'embedding', [x IN split(row.embedding, ';') | toFloat(x)])
+        }} IN TRANSACTIONS OF $rows_per_tx ROWS
+        """
+        
+        try:
+            await asyncio.to_thread(_write_csv)
+            async with db_manager.get_session() as session:
+                result = await session.run(query, {
+                    "csv_url": f"file:///{file_name}",
+                    "repo_url": self.repo_url,
+                    "service_name": service_name,
+                    "rows_per_tx": CSV_ROWS_PER_TRANSACTION
+                })
+                await result.consume()
+            logger.info(f"Cold-loaded {len(rows)} code chunks via LOAD CSV")
+            return True
+        except Exception as e:
+            logger.warning(f"LOAD CSV cold start failed, falling back to MERGE: {e}")
+            return False
+        finally:
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+
+    async def _bootstrap_repo_and_service(self, url: str, name: str, service_name: str):
+        """Create the Repository and Service nodes and link them in one transaction"""
+        query = """
+        MERGE (r:Repository {url: $url})
+        SET r.name = $name,
+            r.service_name = $service_name,
+            r.last_commit_hash = coalesce(r.last_commit_hash, "")
+        MERGE (s:Service {name: $service_name})
+        SET s.description = $description,
+            s.repository_url = $url
+        MERGE (s)-[:BELONGS_TO]->(r)
+        """
+        params = {
+            "url": url,
+            "name": name,
+            "service_name": service_name,
+            "description": f"Service extracted from Service for {name}"
+        }
+        try:
+            await db_manager.run_query(query, params)
+            logger.info(f"Created Repository node {name} and Service node {service_name}")
+        except Exception as e:
+            logger.error(f"Error creating Repository/Service nodes: {e}")
+            raise
+
     async def _create_repository_node(self, url: str, name: str, service_name: str):
         """Create a Repository node"""
         query = """
@@ -124,7 +1005,6 @@ class Neo4jLoader:
         SET r.name = $name,
             r.service_name = $service_name,
             r.last_commit_hash = $last_commit_hash
-        RETURN r
         """
         params = {
             "url": url, 
@@ -147,7 +1027,6 @@ class Neo4jLoader:
         SET s.description = $description,
             s.repository_url = $repo_url
         MERGE (s)-[:BELONGS_TO]->(r)
-        RETURN s
         """
         params = {"name": name, "description": f"Service extracted from {description}", "repo_url": repo_url}
         try:
@@ -157,17 +1036,22 @@ class Neo4jLoader:
             logger.error(f"Error creating Service node: {e}")
             raise
 
-    async def _create_file_node(self, path: str, name: str, language: str, file_type: str, repo_url: str, service_name: str):
-        """Create a File node and link to Repository and Service"""
+    async def _create_file_node(self, path: str, name: str, language: str, file_type: str, repo_url: str, service_name: str, tx=None):
+        """
+        Create a File node and link to Repository and Service.
+        
+        Returns:
+            The normalized path of the File node, or None if it could not be created
+        """
         # Normalize path to prevent duplicate repository name
-        path = self._normalize_path(path, repo_url)
+        path = self._normalize_path(path)
             
         query = """
-        MERGE (f:File {path: $path})
+        MERGE (f:File {path: $path, repo_url: $repo_url})
         SET f.name = $name,
+            f.basename = $basename,
             f.language = $language,
             f.file_type = $file_type,
-            f.repo_url = $repo_url,
             f.service_name = $service_name,
             f.is_documentation = $is_documentation
         WITH f
@@ -175,20 +1059,16 @@ class Neo4jLoader:
         MATCH (s:Service {name: $service_name})
         MERGE (f)-[:BELONGS_TO]->(r)
         MERGE (f)-[:BELONGS_TO]->(s)
-        RETURN f
         """
         
         # Mark documentation files (README, markdown, etc.)
-        is_documentation = (
-            "README" in path.upper() or 
-            file_type.lower() in ["md", "markdown", "txt", "rst", "adoc"] or
-            "/docs/" in path or
-            "/documentation/" in path
-        )
+        is_readme = bool(README_RE.search(path))
+        is_documentation = _is_documentation(path, file_type)
         
         params = {
             "path": path,
             "name": name,
+            "basename": name,
             "language": language,
             "file_type": file_type,
             "repo_url": repo_url,
@@ -196,137 +1076,170 @@ class Neo4jLoader:
             "is_documentation": is_documentation
         }
         try:
-            await db_manager.run_query(query, params)
+            await db_manager.run_query(query, params, tx=tx)
+            # Later _ensure_file_node_exists calls for this file can skip the round-trip
+            self._mark_file_node((path, repo_url))
             # Log README files specifically since they're important
-            if "README" in path.upper():
+            if is_readme:
                 logger.info(f"Created File node for README: {path}")
-                
-                # For README files, create direct text chunks if not already created by the parser
-                # This ensures README content is always indexed regardless of parser limitations
-                if name.upper() == "README.MD" or name.upper() == "README":
-                    await self._ensure_readme_chunks(path, repo_url, service_name)
+            return path
         except Exception as e:
+            # Inside a shared transaction the failure must abort (and retry) the whole unit
+            if tx is not None:
+                raise
             logger.error(f"Error creating File node for {path}: {e}")
             # Continue processing other files
+            return None
             
     async def _ensure_readme_chunks(self, path: str, repo_url: str, service_name: str):
         """Ensure README files are properly chunked and indexed, even if parser doesn't handle them well"""
         try:
-            # Extract repo name from the repo_url using the config utility
-            repo_name = ingestion_settings.extract_repo_name(repo_url)
-            
-            # Normalize path
-            path = self._normalize_path(path, repo_url)
-            
-            # The repository is cloned at ingestion_settings.clone_dir
-            repo_root = os.path.join(ingestion_settings.clone_dir, repo_name)
-            
-            # Use the repo_root with the file path
-            full_path = os.path.join(repo_root, path)
-            logger.info(f"Looking for README file at {full_path}")
-            
-            if not os.path.exists(full_path):
-                logger.warning(f"README file not found at {full_path}")
+            rows = await self._build_readme_chunk_rows(path, repo_url)
+            if not rows:
                 return False
-                
-            # Check if we already have chunks for this README
-            check_query = """
-            MATCH (f:File {path: $path, repo_url: $repo_url})-[:CONTAINS]->(cc:CodeChunk)
-            RETURN count(cc) as chunk_count
-            """
-            check_params = {"path": path, "repo_url": repo_url}
-            check_result = await db_manager.run_query(check_query, check_params)
-            
-            if check_result and check_result[0]["chunk_count"] > 0:
-                logger.info(f"README {path} already has {check_result[0]['chunk_count']} chunks")
-                return True
-            
-            # Read the file
-            with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-                
-            if not content.strip():
-                logger.warning(f"README file {path} is empty")
-                return False
-                
-            # Create chunks (simple paragraph-based for markdown)
-            from langchain_text_splitters import MarkdownTextSplitter
-            splitter = MarkdownTextSplitter(chunk_size=1000, chunk_overlap=100)
-            chunks = splitter.split_text(content)
-            
-            # Create chunk nodes directly
-            logger.info(f"Creating {len(chunks)} chunks for README {path}")
-            
-            for i, chunk_text in enumerate(chunks):
-                chunk_id = f"readme::{repo_name}::{path}::{i}"
-                
-                # Create embedding for the chunk
-                from ingestion.processing.embedding import generate_embedding
-                embedding = await generate_embedding(chunk_text)
-                
-                # Estimate line range
-                start_line = i * 10  # Approximate, not accurate but helps with sorting
-                end_line = start_line + chunk_text.count('\n') + 1
-                
-                # Create the chunk node
-                create_query = """
-                MERGE (cc:CodeChunk {chunk_id: $chunk_id})
-                SET cc.content = $content,
-                    cc.start_line = $start_line,
-                    cc.end_line = $end_line,
-                    cc.repo_url = $repo_url,
-                    cc.service_name = $service_name,
-                    cc.embedding = $embedding,
-                    cc.parent_type = 'File',
-                    cc.is_readme = true
-                WITH cc
-                MATCH (f:File {path: $path, repo_url: $repo_url})
-                MERGE (f)-[:CONTAINS]->(cc)
-                """
-                
-                create_params = {
-                    "chunk_id": chunk_id,
-                    "content": chunk_text,
-                    "start_line": start_line,
-                    "end_line": end_line,
-                    "repo_url": repo_url,
-                    "service_name": service_name,
-                    "embedding": embedding,
-                    "path": path
-                }
-                
-                await db_manager.run_query(create_query, create_params)
-                
-            logger.info(f"Successfully created README chunks for {path}")
+            await self._write_readme_chunks(rows, self._normalize_path(path), repo_url, service_name)
             return True
         except Exception as e:
             logger.error(f"Error ensuring README chunks for {path}: {e}", exc_info=True)
             return False
 
+    async def _build_readme_chunk_rows(self, path: str, repo_url: str) -> List[Dict[str, Any]]:
+        """
+        Read, split and embed a README that has no chunks yet.
+        
+        Runs outside any write transaction, since embedding is a remote call.
+        
+        Returns:
+            CodeChunk rows for _write_readme_chunks, or an empty list if there is nothing to write
+        """
+        # Normalize path
+        path = self._normalize_path(path)
+        
+        # Use the repo root with the file path
+        full_path = os.path.join(self._repo_root, path)
+        logger.info(f"Looking for README file at {full_path}")
+        
+        if not os.path.exists(full_path):
+            logger.warning(f"README file not found at {full_path}")
+            return []
+            
+        # Check if we already have chunks for this README
+        check_query = """
+        MATCH (f:File {path: $path, repo_url: $repo_url})-[:CONTAINS]->(cc:CodeChunk)
+        RETURN count(cc) as chunk_count
+        """
+        check_params = {"path": path, "repo_url": repo_url}
+        check_result = await db_manager.read_query(check_query, check_params)
+        
+        if check_result and check_result[0]["chunk_count"] > 0:
+            logger.info(f"README {path} already has {check_result[0]['chunk_count']} chunks")
+            return []
+        
+        # Read the file, capping oversized READMEs and skipping binary content
+        if os.path.getsize(full_path) <= README_MAX_BYTES:
+            raw = Path(full_path).read_bytes()
+        else:
+            with open(full_path, 'rb') as f:
+                raw = f.read(README_MAX_BYTES)
+        if b"\x00" in raw[:BINARY_SNIFF_BYTES]:
+            logger.warning(f"README file {path} looks binary, skipping")
+            return []
+        content = raw.decode('utf-8', errors='replace')
+            
+        if not content.strip():
+            logger.warning(f"README file {path} is empty")
+            return []
+            
+        # Create chunks (simple paragraph-based for markdown)
+        chunks = _split_markdown(content, size=1000, overlap=100)
+        
+        # Create chunk nodes directly
+        logger.info(f"Creating {len(chunks)} chunks for README {path}")
+        
+        # Embed every chunk of this README through the bulk endpoint
+        from ingestion.processing.embedding import generate_embeddings
+        embeddings = await generate_embeddings(chunks)
+        
+        rows = []
+        for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
+            # Estimate line range
+            start_line = i * 10  # Approximate, not accurate but helps with sorting
+            rows.append({
+                "chunk_id": f"readme::{self._repo_name}::{path}::{i}",
+                "content": chunk_text,
+                "start_line": start_line,
+                "end_line": start_line + chunk_text.count('\n') + 1,
+                "embedding": embedding
+            })
+        return rows
+
+    async def _write_readme_chunks(self, rows: List[Dict[str, Any]], path: str, repo_url: str,
+                                   service_name: str, tx=None):
+        """Create pre-embedded README chunks and link them to their File in a single round-trip"""
+        create_query = """
+        UNWIND $rows AS row
+        MERGE (cc:CodeChunk {chunk_id: row.chunk_id})
+        SET cc.content = row.content,
+            cc.start_line = row.start_line,
+            cc.end_line = row.end_line,
+            cc.repo_url = $repo_url,
+            cc.service_name = $service_name,
+            cc.parent_type = 'File',
+            cc.is_readme = true
+        WITH cc, row
+        CALL db.create.setNodeVectorProperty(cc, 'embedding', row.embedding)
+        WITH cc
+        MATCH (f:File {path: $path, repo_url: $repo_url})
+        MERGE (f)-[:CONTAINS]->(cc)
+        """
+        
+        create_params = {
+            "rows": rows,
+            "repo_url": repo_url,
+            "service_name": service_name,
+            "path": path
+        }
+        
+        await db_manager.run_query(create_query, create_params, tx=tx)
+        
+        logger.info(f"Successfully created README chunks for {path}")
+
+    @staticmethod
+    def _iter_readmes(root: str):
+        """Yield absolute README paths under root, pruning vendored and build directories"""
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in README_SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.lower() in README_FILENAMES and entry.is_file():
+                            yield entry.path
+            except OSError as e:
+                logger.debug(f"Skipping unreadable directory {current}: {e}")
+
+    @staticmethod
+    def _walk_readmes(repo_root: str) -> List[str]:
+        """Walk the repository and return README paths relative to repo_root"""
+        # Convert absolute paths to relative paths within the repo
+        return [os.path.relpath(path, repo_root) for path in Neo4jLoader._iter_readmes(repo_root)]
+
     async def _scan_for_readme_files(self, repo_url: str, service_name: str):
         """Scan for README files in the repository and ensure they are properly chunked"""
         try:
-            # Extract repo name from the repo_url
-            repo_name = ingestion_settings.extract_repo_name(repo_url)
-            
-            # The repository is cloned at ingestion_settings.clone_dir
-            repo_root = os.path.join(ingestion_settings.clone_dir, repo_name)
+            repo_root = self._repo_root
             
             if not os.path.exists(repo_root):
                 logger.warning(f"Repository directory not found at {repo_root}")
                 return
             
-            # Find all README files in the repository
-            readme_files = []
-            for root, _, files in os.walk(repo_root):
-                for file in files:
-                    if file.lower() in ["readme.md", "readme.txt", "readme"]:
-                        abs_path = os.path.join(root, file)
-                        # Convert absolute path to relative path within the repo
-                        rel_path = os.path.relpath(abs_path, repo_root)
-                        readme_files.append(rel_path)
+            # Find all README files in the repository without blocking the event loop
+            readme_files = await asyncio.to_thread(self._walk_readmes, repo_root)
             
-            logger.warning(f"Found {len(readme_files)} README files in repository {repo_name}")
+            logger.warning(f"Found {len(readme_files)} README files in repository {self._repo_name}")
             
             # Process each README file
             for readme_path in readme_files:
@@ -348,24 +1261,14 @@ class Neo4jLoader:
             logger.error(f"Error scanning for README files: {e}", exc_info=True)
 
     async def _create_function_node(self, unique_id: str, name: str, start_line: int, end_line: int, 
-                                   file_path: str, repo_url: str, service_name: str):
+                                   file_path: str, repo_url: str, service_name: str, tx=None):
         """Create a Function node and link to File and Service"""
         # Check if this is a protobuf file
         is_protobuf = file_path.endswith('.proto')
 
-        query = """
-        MERGE (fn:Function {unique_id: $unique_id})
-        SET fn.name = $name,
-            fn.start_line = $start_line,
-            fn.end_line = $end_line,
-            fn.repo_url = $repo_url,
-            fn.service_name = $service_name,
-            fn.file_path = $file_path
-        WITH fn
-        MATCH (s:Service {name: $service_name})
-        MERGE (fn)-[:BELONGS_TO]->(s)
-        RETURN fn
-        """
+        # Regular files are connected to the file directly in the same statement
+        query = FUNCTION_MERGE_QUERY if is_protobuf else FUNCTION_MERGE_AND_LINK_QUERY
+        
         params = {
             "unique_id": unique_id,
             "name": name,
@@ -375,50 +1278,28 @@ class Neo4jLoader:
             "repo_url": repo_url,
             "service_name": service_name
         }
-        try:
-            await db_manager.run_query(query, params)
+        await db_manager.run_query(query, params, tx=tx)
+        
+        # Ensure the Function is connected to its parent File
+        if is_protobuf:
+            # For protobuf files, find all instances of this file and connect to all of them
+            proto_files = await self._find_all_proto_file_paths(file_path, repo_url, tx=tx)
             
-            # Ensure the Function is connected to its parent File
-            if is_protobuf:
-                # For protobuf files, find all instances of this file and connect to all of them
-                proto_files = await self._find_all_proto_file_paths(file_path, repo_url)
-                
-                for proto_path in proto_files:
-                    # First ensure the file node exists
-                    await self._ensure_file_node_exists(proto_path, repo_url, service_name)
-                    
-                    # Then connect the function to it
-                    link_query = """
-                    MATCH (fn:Function {unique_id: $unique_id, repo_url: $repo_url})
-                    MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                    MERGE (f)-[:CONTAINS]->(fn)
-                    """
-                    
-                    await db_manager.run_query(link_query, {
-                        "unique_id": unique_id,
-                        "file_path": proto_path,
-                        "repo_url": repo_url
-                    })
-            else:
-                # Regular files - just connect to the file directly
-                link_query = """
-                MATCH (fn:Function {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                MERGE (f)-[:CONTAINS]->(fn)
-                """
-                await db_manager.run_query(link_query, {
-                    "unique_id": unique_id,
-                    "file_path": file_path,
-                    "repo_url": repo_url
-                })
+            # First ensure the file nodes exist
+            for proto_path in proto_files:
+                await self._ensure_file_node_exists(proto_path, repo_url, service_name, tx=tx)
             
-            # Don't log every function to avoid spamming logs
-        except Exception as e:
-            logger.error(f"Error creating Function node for {name}: {e}")
-            # Continue processing other functions
+            # Then connect the function to all of them in one round-trip
+            await db_manager.run_query(PROTO_FUNCTION_LINK_QUERY, {
+                "unique_id": unique_id,
+                "paths": proto_files,
+                "repo_url": repo_url
+            }, tx=tx)
+        
+        # Don't log every function to avoid spamming logs
 
     async def _create_class_node(self, unique_id: str, name: str, start_line: int, end_line: int, 
-                                file_path: str, repo_url: str, service_name: str, is_data_model=False, is_api=False):
+                                file_path: str, repo_url: str, service_name: str, is_data_model=False, is_api=False, tx=None):
         """Create a Class node and link to File and Service"""
         # Check if this is a protobuf file
         is_protobuf = file_path.endswith('.proto')
@@ -437,23 +1318,9 @@ class Neo4jLoader:
                 is_data_model = True
                 class_type = "message"
         
-        query = """
-        MERGE (cl:Class {unique_id: $unique_id})
-        SET cl.name = $name,
-            cl.start_line = $start_line,
-            cl.end_line = $end_line,
-            cl.repo_url = $repo_url,
-            cl.service_name = $service_name,
-            cl.file_path = $file_path,
-            cl.is_data_model = $is_data_model,
-            cl.is_api = $is_api,
-            cl.type = $class_type,
-            cl.framework = $framework
-        WITH cl
-        MATCH (s:Service {name: $service_name})
-        MERGE (cl)-[:BELONGS_TO]->(s)
-        RETURN cl
-        """
+        # Regular files are connected to the file directly in the same statement
+        query = CLASS_MERGE_QUERY if is_protobuf else CLASS_MERGE_AND_LINK_QUERY
+        
         params = {
             "unique_id": unique_id,
             "name": name,
@@ -467,250 +1334,170 @@ class Neo4jLoader:
             "class_type": class_type,
             "framework": framework
         }
-        try:
-            await db_manager.run_query(query, params)
+        await db_manager.run_query(query, params, tx=tx)
+        
+        # Ensure the Class is connected to its parent File
+        if is_protobuf:
+            # For protobuf files, find all instances of this file and connect to all of them
+            proto_files = await self._find_all_proto_file_paths(file_path, repo_url, tx=tx)
+            
+            # First ensure the file nodes exist
+            for proto_path in proto_files:
+                await self._ensure_file_node_exists(proto_path, repo_url, service_name, tx=tx)
+            
+            # Then connect the class to all of them in one round-trip
+            await db_manager.run_query(PROTO_CLASS_LINK_QUERY, {
+                "unique_id": unique_id,
+                "paths": proto_files,
+                "repo_url": repo_url
+            }, tx=tx)
+        
+        # Log only for special classes
+        if is_data_model:
+            logger.info(f"Created DataModel node for {name} in {file_path}")
+        elif is_api:
+            logger.info(f"Created ApiEndpoint node for {name} in {file_path}")
+
+    def _build_code_chunk_row(self, chunk_id: str, content: str, start_line: int, end_line: int,
+                              parent_id: str, embedding: List[float], repo_url: str, service_name: str,
+                              derived: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Build the MERGE row (key plus properties) for a CodeChunk node"""
+        if derived is None:
+            derived = _derive_chunk_params(chunk_id, parent_id)
+        
+        return {
+            "chunk_id": chunk_id,
+            # Stored separately so it can be written as a compact float32 vector property
+            "vector": embedding or [],
+            "props": {
+                # Lets a re-load skip chunks whose text and position did not change
+                "chunk_sha": content_hash(f"{start_line}:{end_line}:{content}").hex(),
+                "content": content,
+                "start_line": start_line,
+                "end_line": end_line,
+                "repo_url": repo_url,
+                "service_name": service_name,
+                "parent_type": derived["parent_type"],
+                "file_path": derived["file_path"],
+                "parent_id": parent_id
+            }
+        }
+
+    async def _bulk_merge(self, label: str, key_prop: str, rows: List[Dict[str, Any]], parallel: bool = True,
+                          vector_prop: Optional[str] = None, unchanged_prop: Optional[str] = None):
+        """
+        MERGE nodes in bulk using apoc.periodic.iterate, falling back to a plain UNWIND.
+        
+        Args:
+            label: Node label to merge on
+            key_prop: Property that uniquely identifies the node
+            rows: List of {key_prop: ..., "props": {...}} dictionaries
+            parallel: Whether APOC may run batches in parallel. Keep this False for
+                relationship MERGEs that could deadlock on dense nodes.
+            vector_prop: Optional property to fill from each row's "vector" entry using
+                db.create.setNodeVectorProperty (stored as float32, ready for the vector index)
+            unchanged_prop: Optional property in each row's "props" that fingerprints the row.
+                Existing nodes that already store the same value are not rewritten, so
+                re-loading unchanged data is a no-op upsert.
+        """
+        if not rows:
+            return
             
-            # Ensure the Class is connected to its parent File
-            if is_protobuf:
-                # For protobuf files, find all instances of this file and connect to all of them
-                proto_files = await self._find_all_proto_file_paths(file_path, repo_url)
-                
-                for proto_path in proto_files:
-                    # First ensure the file node exists
-                    await self._ensure_file_node_exists(proto_path, repo_url, service_name)
-                    
-                    # Then connect the class to it
-                    link_query = """
-                    MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-                    MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                    MERGE (f)-[:CONTAINS]->(cl)
-                    """
-                    
-                    await db_manager.run_query(link_query, {
-                        "unique_id": unique_id,
-                        "file_path": proto_path,
-                        "repo_url": repo_url
-                    })
-            else:
-                # Regular files - just connect to the file directly
-                link_query = """
-                MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                MERGE (f)-[:CONTAINS]->(cl)
-                """
-                await db_manager.run_query(link_query, {
-                    "unique_id": unique_id,
-                    "file_path": file_path,
-                    "repo_url": repo_url
+        merge_clause = f"MERGE (n:{label} {{{key_prop}: r.{key_prop}}})"
+        if unchanged_prop:
+            merge_clause += (
+                f" WITH n, r WHERE n.{unchanged_prop} IS NULL"
+                f" OR n.{unchanged_prop} <> r.props.{unchanged_prop}"
+            )
+        merge_clause += " SET n += r.props"
+        if vector_prop:
+            merge_clause += (
+                f' WITH n, r WHERE size(r.vector) > 0'
+                f' CALL db.create.setNodeVectorProperty(n, "{vector_prop}", r.vector)'
+            )
+        
+        if self._apoc_available:
+            apoc_query = f"""
+            CALL apoc.periodic.iterate(
+                'UNWIND $rows AS r RETURN r',
+                '{merge_clause}',
+                {{batchSize: $batch_size, parallel: $parallel, params: {{rows: $rows}}}}
+            )
+            YIELD failedOperations, errorMessages
+            RETURN failedOperations, errorMessages
+            """
+            try:
+                result = await db_manager.run_query(apoc_query, {
+                    "rows": rows,
+                    "batch_size": ingestion_settings.neo4j_batch_size,
+                    "parallel": parallel
                 })
-            
-            # Log only for special classes
-            if is_data_model:
-                logger.info(f"Created DataModel node for {name} in {file_path}")
-            elif is_api:
-                logger.info(f"Created ApiEndpoint node for {name} in {file_path}")
-        except Exception as e:
-            logger.error(f"Error creating Class node for {name}: {e}")
-            # Continue processing other classes
+            except Exception as e:
+                # Only a missing procedure means APOC is unavailable; anything else is a real failure
+                if getattr(e, "code", None) != APOC_MISSING_CODE:
+                    raise
+                logger.warning(f"APOC not available, falling back to UNWIND for bulk merges: {e}")
+                self._apoc_available = False
+            else:
+                # Failed batches are reported in the result rather than raised
+                if result and result[0]["failedOperations"]:
+                    raise RuntimeError(f"apoc.periodic.iterate failed: {result[0]['errorMessages']}")
+                return
+        
+        await db_manager.run_query(f"UNWIND $rows AS r {merge_clause}", {"rows": rows})
 
     async def _create_code_chunk_node(self, chunk_id: str, content: str, start_line: int, end_line: int,
                                     parent_id: str, embedding: List[float], repo_url: str, service_name: str):
         """Create a CodeChunk node and link to parent (File, Function, or Class) and Service"""
-        
-        # Extract file path from parent_id for file-level chunks
-        original_file_path = parent_id.replace("file::", "") if parent_id.startswith("file::") else ""
-        file_path = original_file_path
+        row = self._build_code_chunk_row(chunk_id, content, start_line, end_line,
+                                         parent_id, embedding, repo_url, service_name)
+        try:
+            await self._bulk_merge("CodeChunk", "chunk_id", [row], vector_prop="embedding",
+                                   unchanged_prop="chunk_sha")
+        except Exception as e:
+            logger.error(f"Error creating CodeChunk node for {chunk_id}: {e}")
+            return
+            
+        await self._link_code_chunk_node(row, repo_url, service_name)
+
+    async def _link_code_chunk_node(self, row: Dict[str, Any], repo_url: str, service_name: str, tx=None):
+        """Link an existing CodeChunk node to its parent (File, Function, or Class) and Service"""
+        chunk_id = row["chunk_id"]
+        props = row["props"]
+        parent_id = props["parent_id"]
+        parent_type = props["parent_type"]
+        file_path = props["file_path"]
+        start_line = props["start_line"]
+        end_line = props["end_line"]
         
         # Check if this is a protobuf file and handle specially
         is_protobuf = file_path.endswith('.proto')
         
-        # Determine parent type from parent_id or chunk metadata
-        if parent_id.startswith("file::"):
-            # Check for class/function pattern in parent_id
-            if "::class::" in parent_id.lower():
-                parent_type = "Class"
-            elif "::function::" in parent_id.lower():
-                parent_type = "Function"
-            else:
-                # If not a class or function, it's a file-level chunk
-                parent_type = "File"
-        elif "::class::" in parent_id.lower() or any(class_marker in chunk_id.lower() for class_marker in ["_class_", "::class"]):
-            parent_type = "Class"
-        elif "::function::" in parent_id.lower() or any(func_marker in chunk_id.lower() for func_marker in ["_function_", "::func"]):
-            parent_type = "Function"
-        else:
-            # Default to the most common pattern from TreeSitterParser
-            # Check if parent_id contains double-colon and make a reasonable guess
-            if "::" in parent_id:
-                parts = parent_id.split("::")
-                if len(parts) > 1:
-                    # If the second part is PascalCase, it's likely a class
-                    second_part = parts[1]
-                    if second_part and second_part[0].isupper():
-                        parent_type = "Class"
-                    else:
-                        parent_type = "Function"
-                else:
-                    parent_type = "File"  # Default to File if we can't determine
-            else:
-                parent_type = "File"  # Default to File
-        
-        # Create CodeChunk node
-        create_query = """
-        MERGE (cc:CodeChunk {chunk_id: $chunk_id})
-        SET cc.content = $content,
-            cc.start_line = $start_line,
-            cc.end_line = $end_line,
-            cc.repo_url = $repo_url,
-            cc.service_name = $service_name,
-            cc.embedding = $embedding,
-            cc.parent_type = $parent_type,
-            cc.file_path = $file_path,
-            cc.parent_id = $parent_id
-        RETURN cc
-        """
-        
-        create_params = {
-            "chunk_id": chunk_id,
-            "content": content,
-            "start_line": start_line,
-            "end_line": end_line,
-            "repo_url": repo_url,
-            "service_name": service_name,
-            "embedding": embedding,
-            "parent_type": parent_type,
-            "file_path": file_path,
-            "parent_id": parent_id
-        }
-        
         success = False
         
         try:
-            await db_manager.run_query(create_query, create_params)
-            
             # For protobuf files, ensure we have the file node first
             if is_protobuf:
                 # Check if file node exists and create if it doesn't
-                await self._ensure_file_node_exists(file_path, repo_url, service_name)
+                await self._ensure_file_node_exists(file_path, repo_url, service_name, tx=tx)
             
             # Connect to parent entity based on type
-            if parent_type == "Class":
-                # Try to find by unique_id first
-                class_query = """
-                MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                MERGE (cl)-[:CONTAINS]->(cc)
-                RETURN cl
-                """
-                
-                class_params = {
-                    "unique_id": parent_id,
-                    "chunk_id": chunk_id,
-                    "repo_url": repo_url
-                }
-                
-                class_result = await db_manager.run_query(class_query, class_params)
-                
-                # If no class found by unique_id, try to find by line range
-                if not class_result or len(class_result) == 0:
-                    # Try to find a class that contains this chunk's line range
-                    find_class_query = """
-                    MATCH (cl:Class)
-                    WHERE cl.file_path = $file_path
-                    AND cl.repo_url = $repo_url
-                    AND cl.start_line <= $start_line
-                    AND cl.end_line >= $end_line
-                    RETURN cl
-                    ORDER BY (cl.end_line - cl.start_line) ASC
-                    LIMIT 1
-                    """
-                    
-                    find_params = {
-                        "file_path": file_path,
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "repo_url": repo_url
-                    }
-                    
-                    class_by_range = await db_manager.run_query(find_class_query, find_params)
-                    
-                    if class_by_range and len(class_by_range) > 0:
-                        # Create relationship to the found class
-                        rel_query = """
-                        MATCH (cl:Class) WHERE id(cl) = $class_id
-                        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                        MERGE (cl)-[:CONTAINS]->(cc)
-                        """
-                        
-                        rel_params = {
-                            "class_id": class_by_range[0]["cl"].id,
-                            "chunk_id": chunk_id
-                        }
-                        
-                        await db_manager.run_query(rel_query, rel_params)
-                        success = True
-                else:
-                    # Successfully connected to class
-                    success = True
+            if parent_type in ("Class", "Function"):
+                # Resolve the parent by unique_id, falling back to the tightest enclosing
+                # line range, and link it in a single round-trip
+                parent_query = CHUNK_PARENT_LINK_QUERIES[parent_type]
                 
-            elif parent_type == "Function":
-                # Try to find by unique_id first
-                function_query = """
-                MATCH (fn:Function {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                MERGE (fn)-[:CONTAINS]->(cc)
-                RETURN fn
-                """
-                
-                function_params = {
-                    "unique_id": parent_id,
+                parent_params = {
                     "chunk_id": chunk_id,
+                    "parent_id": parent_id,
+                    "file_path": file_path,
+                    "start_line": start_line,
+                    "end_line": end_line,
                     "repo_url": repo_url
                 }
                 
-                function_result = await db_manager.run_query(function_query, function_params)
-                
-                # If no function found by unique_id, try to find by line range
-                if not function_result or len(function_result) == 0:
-                    # Try to find a function that contains this chunk's line range
-                    find_function_query = """
-                    MATCH (fn:Function)
-                    WHERE fn.file_path = $file_path
-                    AND fn.repo_url = $repo_url
-                    AND fn.start_line <= $start_line
-                    AND fn.end_line >= $end_line
-                    RETURN fn
-                    ORDER BY (fn.end_line - fn.start_line) ASC
-                    LIMIT 1
-                    """
-                    
-                    find_params = {
-                        "file_path": file_path,
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "repo_url": repo_url
-                    }
-                    
-                    function_by_range = await db_manager.run_query(find_function_query, find_params)
-                    
-                    if function_by_range and len(function_by_range) > 0:
-                        # Create relationship to the found function
-                        rel_query = """
-                        MATCH (fn:Function) WHERE id(fn) = $function_id
-                        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                        MERGE (fn)-[:CONTAINS]->(cc)
-                        """
-                        
-                        rel_params = {
-                            "function_id": function_by_range[0]["fn"].id,
-                            "chunk_id": chunk_id
-                        }
-                        
-                        await db_manager.run_query(rel_query, rel_params)
-                        success = True
-                else:
-                    # Successfully connected to function
-                    success = True
+                parent_result = await db_manager.run_query(parent_query, parent_params, tx=tx)
+                success = bool(parent_result and parent_result[0]["linked"])
             
             # If we haven't successfully connected to a Class or Function, connect to File
             if not success or parent_type == "File":
@@ -726,121 +1513,78 @@ class Neo4jLoader:
                     ]
                 else:
                     file_paths_to_try = [file_path]
+                # Drop empty and duplicate candidates, keeping their priority order
+                candidates = list(dict.fromkeys(p for p in file_paths_to_try if p))
+                
+                # Probe all candidates server-side and link the first File that exists,
+                # recording its path on the chunk and connecting the chunk to its Service
+                file_rel_query = """
+                UNWIND range(0, size($candidates) - 1) AS i
+                MATCH (f:File {path: $candidates[i], repo_url: $repo_url})
+                WITH f, i
+                ORDER BY i ASC
+                LIMIT 1
+                MATCH (cc:CodeChunk {chunk_id: $chunk_id})
+                MERGE (f)-[:CONTAINS]->(cc)
+                SET cc.file_path = f.path
+                WITH cc, f
+                OPTIONAL MATCH (s:Service {name: $service_name})
+                FOREACH (_ IN CASE WHEN s IS NOT NULL THEN [1] ELSE [] END |
+                    MERGE (cc)-[:BELONGS_TO]->(s)
+                )
+                RETURN f.path AS path
+                """
                 
-                # Try all potential file paths
                 file_connected = False
-                for path_to_try in file_paths_to_try:
-                    if not path_to_try:
-                        continue
-                        
-                    # Connect to the File
-                    file_rel_query = """
-                    MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                    MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                    MERGE (f)-[:CONTAINS]->(cc)
-                    RETURN f
-                    """
-                    
-                    file_params = {
-                        "file_path": path_to_try,
+                if candidates:
+                    file_result = await db_manager.run_query(file_rel_query, {
+                        "candidates": candidates,
                         "chunk_id": chunk_id,
-                        "repo_url": repo_url
-                    }
-                    
-                    file_result = await db_manager.run_query(file_rel_query, file_params)
+                        "repo_url": repo_url,
+                        "service_name": service_name
+                    }, tx=tx)
                     
-                    if file_result and len(file_result) > 0:
-                        # Update the file path if it was different
-                        if path_to_try != file_path:
-                            update_query = """
-                            MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                            SET cc.file_path = $file_path
-                            """
-                            await db_manager.run_query(update_query, {"chunk_id": chunk_id, "file_path": path_to_try})
-                        
-                        # Connect to Service
-                        service_query = """
-                        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                        MATCH (s:Service {name: $service_name})
-                        MERGE (cc)-[:BELONGS_TO]->(s)
-                        """
-                        await db_manager.run_query(service_query, {"chunk_id": chunk_id, "service_name": service_name})
-                        
+                    if file_result:
                         file_connected = True
-                        logger.info(f"Connected {chunk_id} to file {path_to_try}")
-                        break
+                        logger.info(f"Connected {chunk_id} to file {file_result[0]['path']}")
                 
                 # If exact file paths failed, try fuzzy matching
                 if not file_connected:
-                    # Try to find any file in this repo that might contain this chunk
-                    fuzzy_file_query = """
-                    MATCH (f:File)
-                    WHERE f.repo_url = $repo_url
-                    AND f.path ENDS WITH $filename
-                    RETURN f
+                    # Link to any file in this repo with the same name, and its Service,
+                    # in a single round-trip
+                    fuzzy_query = """
+                    MATCH (f:File {basename: $filename, repo_url: $repo_url})
+                    WITH f
                     LIMIT 1
+                    MATCH (cc:CodeChunk {chunk_id: $chunk_id})
+                    MERGE (f)-[:CONTAINS]->(cc)
+                    WITH cc, f
+                    OPTIONAL MATCH (s:Service {name: $service_name})
+                    FOREACH (_ IN CASE WHEN s IS NOT NULL THEN [1] ELSE [] END |
+                        MERGE (cc)-[:BELONGS_TO]->(s)
+                    )
+                    RETURN f.path AS path
                     """
                     
-                    filename = os.path.basename(file_path)
                     fuzzy_params = {
+                        "filename": os.path.basename(file_path),
                         "repo_url": repo_url,
-                        "filename": filename
+                        "chunk_id": chunk_id,
+                        "service_name": service_name
                     }
                     
-                    fuzzy_result = await db_manager.run_query(fuzzy_file_query, fuzzy_params)
+                    fuzzy_result = await db_manager.run_query(fuzzy_query, fuzzy_params, tx=tx)
                     
-                    if fuzzy_result and len(fuzzy_result) > 0:
-                        # Create relationship to the found file
-                        fuzzy_rel_query = """
-                        MATCH (f:File) WHERE id(f) = $file_id
-                        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                        MERGE (f)-[:CONTAINS]->(cc)
-                        
-                        WITH cc, f
-                        MATCH (s:Service {name: $service_name})
-                        MERGE (cc)-[:BELONGS_TO]->(s)
-                        """
-                        
-                        fuzzy_params = {
-                            "file_id": fuzzy_result[0]["f"].id,
-                            "chunk_id": chunk_id,
-                            "service_name": service_name
-                        }
-                        
-                        await db_manager.run_query(fuzzy_rel_query, fuzzy_params)
+                    if fuzzy_result:
                         logger.info(f"Created relationship to file via fuzzy match for {chunk_id}")
                         file_connected = True
                 
                 # Only use repository fallback as a last resort
                 if not file_connected:
-                    # Create a proper file node first rather than falling back directly to repository
-                    await self._ensure_file_node_exists(file_path, repo_url, service_name)
-                    
-                    # Try one more time with the newly created file node
-                    final_file_query = """
-                    MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                    MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                    MERGE (f)-[:CONTAINS]->(cc)
-                    RETURN f
-                    """
-                    final_params = {
-                        "file_path": file_path,
-                        "chunk_id": chunk_id,
-                        "repo_url": repo_url
-                    }
-                    
-                    final_result = await db_manager.run_query(final_file_query, final_params)
-                    
-                    if final_result and len(final_result) > 0:
+                    # Create a proper file node (if missing) and link to it rather than falling
+                    # back directly to repository
+                    if await self._link_chunk_create_file_if_missing(chunk_id, file_path, repo_url, service_name, tx=tx):
                         logger.info(f"Connected {chunk_id} to newly created file node {file_path}")
-                        
-                        # Connect to Service
-                        service_query = """
-                        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
-                        MATCH (s:Service {name: $service_name})
-                        MERGE (cc)-[:BELONGS_TO]->(s)
-                        """
-                        await db_manager.run_query(service_query, {"chunk_id": chunk_id, "service_name": service_name})
                     else:
                         # Final fallback - try to use repository as parent to avoid completely orphaned chunks
                         repo_rel_query = """
@@ -851,7 +1595,6 @@ class Neo4jLoader:
                         WITH cc, r
                         MATCH (s:Service {name: $service_name})
                         MERGE (cc)-[:BELONGS_TO]->(s)
-                        RETURN cc
                         """
                         
                         repo_params = {
@@ -860,14 +1603,75 @@ class Neo4jLoader:
                             "service_name": service_name
                         }
                         
-                        await db_manager.run_query(repo_rel_query, repo_params)
+                        await db_manager.run_query(repo_rel_query, repo_params, tx=tx)
                         logger.warning(f"Created fallback relationship to repository for {chunk_id} - this should be avoided")
             
         except Exception as e:
-            logger.error(f"Error creating CodeChunk node for {chunk_id}: {e}")
+            # Inside a shared transaction the failure must abort (and retry) the whole unit
+            if tx is not None:
+                raise
+            logger.error(f"Error linking CodeChunk node for {chunk_id}: {e}")
             # Continue processing other chunks
 
-    async def _ensure_file_node_exists(self, file_path: str, repo_url: str, service_name: str):
+    async def _link_chunk_create_file_if_missing(self, chunk_id: str, file_path: str, repo_url: str,
+                                                 service_name: str, tx=None) -> bool:
+        """
+        Link a CodeChunk to its File, creating the File (linked to its Repository and
+        Service) if it doesn't exist yet, in a single round-trip.
+        
+        Args:
+            chunk_id: The chunk to link
+            file_path: Path of the chunk's file
+            repo_url: Repository URL
+            service_name: Service name
+            
+        Returns:
+            True if the chunk was linked to a File
+        """
+        file_path = self._normalize_path(file_path)
+        if not file_path:
+            return False
+            
+        query = """
+        MERGE (f:File {path: $file_path, repo_url: $repo_url})
+        ON CREATE SET f.name = $name,
+            f.basename = $name,
+            f.language = $language,
+            f.file_type = $language,
+            f.service_name = $service_name,
+            f.is_documentation = $is_documentation
+        WITH f
+        OPTIONAL MATCH (r:Repository {url: $repo_url})
+        FOREACH (_ IN CASE WHEN r IS NOT NULL THEN [1] ELSE [] END |
+            MERGE (f)-[:BELONGS_TO]->(r)
+        )
+        WITH f
+        MATCH (cc:CodeChunk {chunk_id: $chunk_id})
+        MERGE (f)-[:CONTAINS]->(cc)
+        WITH f, cc
+        OPTIONAL MATCH (s:Service {name: $service_name})
+        FOREACH (_ IN CASE WHEN s IS NOT NULL THEN [1] ELSE [] END |
+            MERGE (f)-[:BELONGS_TO]->(s)
+            MERGE (cc)-[:BELONGS_TO]->(s)
+        )
+        RETURN f.path AS path
+        """
+        
+        language = self._detect_language(file_path)
+        result = await db_manager.run_query(query, {
+            "chunk_id": chunk_id,
+            "file_path": file_path,
+            "repo_url": repo_url,
+            "name": os.path.basename(file_path),
+            "language": language,
+            "service_name": service_name,
+            "is_documentation": _is_documentation(file_path, language)
+        }, tx=tx)
+        
+        self._mark_file_node((file_path, repo_url))
+        return bool(result)
+
+    async def _ensure_file_node_exists(self, file_path: str, repo_url: str, service_name: str, tx=None):
         """
         Ensure that a File node exists for the given path. Create it if it doesn't.
         
@@ -880,49 +1684,51 @@ class Neo4jLoader:
             return
             
         # Normalize the file path by removing duplicate repository name
-        file_path = self._normalize_path(file_path, repo_url)
+        file_path = self._normalize_path(file_path)
+        
+        # Skip the round-trip for files already ensured during this load
+        key = (file_path, repo_url)
+        if self._file_node_known(key):
+            return
             
-        # Check if file exists
-        check_query = """
-        MATCH (f:File {path: $file_path, repo_url: $repo_url})
-        RETURN f
+        # Create the file if it's missing and link it in one round-trip; the MERGE
+        # seeks the (path, repo_url) uniqueness constraint
+        query = """
+        MERGE (f:File {path: $file_path, repo_url: $repo_url})
+        ON CREATE SET f.name = $name,
+            f.basename = $name,
+            f.language = $language,
+            f.file_type = $language,
+            f.service_name = $service_name,
+            f.is_documentation = $is_documentation
+        WITH f
+        MATCH (r:Repository {url: $repo_url})
+        MATCH (s:Service {name: $service_name})
+        MERGE (f)-[:BELONGS_TO]->(r)
+        MERGE (f)-[:BELONGS_TO]->(s)
         """
         
-        check_result = await db_manager.run_query(check_query, {"file_path": file_path, "repo_url": repo_url})
-        
-        if not check_result or len(check_result) == 0:
-            # File doesn't exist, create it
-            file_name = os.path.basename(file_path)
-            language = self._detect_language(file_path)
-            
-            await self._create_file_node(
-                path=file_path,
-                name=file_name,
-                language=language,
-                file_type=language,
-                repo_url=repo_url,
-                service_name=service_name
-            )
-            logger.info(f"Created missing File node for {file_path}")
-            
-            # Ensure the file is also connected to the repository
-            repo_link_query = """
-            MATCH (r:Repository {url: $repo_url})
-            MATCH (f:File {path: $file_path, repo_url: $repo_url})
-            MERGE (f)-[:BELONGS_TO]->(r)
-            """
+        language = self._detect_language(file_path)
+        await db_manager.run_query(query, {
+            "file_path": file_path,
+            "repo_url": repo_url,
+            "name": os.path.basename(file_path),
+            "language": language,
+            "service_name": service_name,
+            "is_documentation": _is_documentation(file_path, language)
+        }, tx=tx)
             
-            await db_manager.run_query(repo_link_query, {"repo_url": repo_url, "file_path": file_path})
+        self._mark_file_node(key)
 
-    async def _process_file(self, file_data):
+    def _prepare_file(self, file_data) -> Optional[Tuple[str, str, str, str]]:
         """
-        Process a file and create the appropriate nodes.
+        Normalize a parsed file's path and derive its properties.
         
         Args:
             file_data: Dictionary containing file information
-        
+            
         Returns:
-            Created File node
+            (file_path, file_name, language, detected_language), or None if the file is skipped
         """
         file_path = file_data.get('path')
         if not file_path:
@@ -935,54 +1741,103 @@ class Neo4jLoader:
             return None
             
         # Normalize path
-        file_path = self._normalize_path(file_path, self.repo_url)
+        file_path = self._normalize_path(file_path)
         file_data['path'] = file_path  # Update the path in the file_data
             
         # Extract file properties
-        file_name = os.path.basename(file_path)
-        language = file_data.get('language', self._detect_language(file_path))
-        
-        # Create file properties
-        file_props = {
-            'name': file_name,
-            'path': file_path,
-            'language': language,
-            'repo_url': self.repo_url,
-            'content_hash': self._hash_content(file_data.get('content', '')),
-            'is_documentation': file_data.get('is_documentation', False) or file_name.lower() == 'readme.md' or file_path.lower().endswith('.md')
-        }
+        # Prefer the basename/extension precomputed by the parser
+        file_name = file_data.get('basename') or os.path.basename(file_path)
+        ext = file_data.get('ext')
+        detected_language = (
+            LANGUAGE_BY_EXTENSION.get(ext, 'unknown') if ext is not None else self._detect_language(file_path)
+        )
+        language = file_data.get('language', detected_language)
+        return file_path, file_name, language, detected_language
+
+    async def _process_file(self, file_data, tx=None):
+        """
+        Process a file and create the appropriate nodes.
+        
+        Args:
+            file_data: Dictionary containing file information
+            tx: Optional transaction shared by all of this file's writes
         
-        # Extract repository name from the URL for better tracking
-        repo_name = self.repo_url.split('/')[-1].replace('.git', '')
+        Returns:
+            Path of the created File node, or None if it was skipped
+        """
+        prepared = self._prepare_file(file_data)
+        if not prepared:
+            return None
+        file_path, file_name, language, detected_language = prepared
         
-        # Determine service name (default to repository name without extension)
-        service_name = repo_name.replace('.git', '')
+        service_name = self._service_name
         
         # Create File node in Neo4j
         file_node = await self._create_file_node(
             path=file_path,
             name=file_name,
             language=language,
-            file_type=self._detect_language(file_path),
+            file_type=detected_language,
             repo_url=self.repo_url,
-            service_name=service_name
+            service_name=service_name,
+            tx=tx
         )
         
         # Process special file types
         if language == 'protobuf':
-            await self._process_protobuf_file(file_path, file_data)
+            await self._process_protobuf_file(file_path, file_data, tx=tx)
         
-        # Process functions in the file
-        for func_data in file_data.get('functions', []):
-            await self._process_function_node(func_data, file_path)
-            
-        # Process classes in the file
-        for class_data in file_data.get('classes', []):
-            await self._process_class_node(class_data, file_path)
+        if file_path.endswith('.proto'):
+            # Protobuf symbols are linked to every copy of the file, one node at a time
+            for func_data in file_data.get('functions', []):
+                await self._process_function_node(func_data, file_path, tx=tx)
+            for class_data in file_data.get('classes', []):
+                await self._process_class_node(class_data, file_path, tx=tx)
+        else:
+            # Create all of the file's functions, then all of its classes, in one round-trip each
+            await self._bulk_create_symbols("Function", file_data.get('functions', []), file_path, tx=tx)
+            await self._bulk_create_symbols("Class", file_data.get('classes', []), file_path, tx=tx)
             
         return file_node
+
+    @staticmethod
+    def _symbol_rows(symbols: List[Dict[str, Any]], file_path: str) -> List[Dict[str, Any]]:
+        """Build SYMBOL_BULK_MERGE_QUERIES rows for parsed functions or classes"""
+        return [
+            {
+                "unique_id": symbol.get('unique_id'),
+                "name": symbol.get('name'),
+                "start_line": symbol.get('start_line'),
+                "end_line": symbol.get('end_line'),
+                "file_path": file_path
+            }
+            for symbol in symbols
+            if symbol.get('unique_id')
+        ]
+
+    async def _bulk_create_symbols(self, label: str, symbols: List[Dict[str, Any]], file_path: str, tx=None):
+        """
+        Create Function or Class nodes for a file and link them to it and its Service
+        with a single UNWIND.
+        
+        Args:
+            label: "Function" or "Class"
+            symbols: Parsed function or class dictionaries of the file
+            file_path: The file path that contains these symbols
+        """
+        rows = self._symbol_rows(symbols, file_path)
+        if not rows:
+            return
+            
+        await db_manager.run_query(SYMBOL_BULK_MERGE_QUERIES[label], {
+            "rows": rows,
+            "repo_url": self.repo_url,
+            "service_name": self._service_name
+        }, tx=tx)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Created {len(rows)} {label} nodes for {file_path}")
         
-    async def _process_protobuf_file(self, file_path, file_data):
+    async def _process_protobuf_file(self, file_path, file_data, tx=None):
         """
         Process a protobuf file and create message and service nodes.
         
@@ -990,17 +1845,13 @@ class Neo4jLoader:
             file_path: The file path for the protobuf file
             file_data: Dictionary containing file information
         """
-        # Extract repository name from the URL for better tracking
-        repo_name = self.repo_url.split('/')[-1].replace('.git', '')
-        
-        # Determine service name (default to repository name without extension)
-        service_name = repo_name.replace('.git', '')
+        service_name = self._service_name
         
         # First, ensure the protobuf file is properly recorded
-        await self._ensure_file_node_exists(file_path, self.repo_url, service_name)
+        await self._ensure_file_node_exists(file_path, self.repo_url, service_name, tx=tx)
         
         # Store all proto file locations to handle duplicates
-        proto_files = await self._find_all_proto_file_paths(file_path, self.repo_url)
+        proto_files = await self._find_all_proto_file_paths(file_path, self.repo_url, tx=tx)
         
         # Process messages (data models)
         for message in file_data.get('messages', []):
@@ -1018,22 +1869,16 @@ class Neo4jLoader:
                 file_path=file_path,
                 repo_url=self.repo_url,
                 service_name=service_name,
-                is_data_model=True
+                is_data_model=True,
+                tx=tx
             )
             
             # Connect this class to all duplicate proto files
-            for proto_path in proto_files:
-                link_query = """
-                MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                MERGE (f)-[:CONTAINS]->(cl)
-                """
-                
-                await db_manager.run_query(link_query, {
-                    "unique_id": unique_id,
-                    "file_path": proto_path,
-                    "repo_url": self.repo_url
-                })
+            await db_manager.run_query(PROTO_CLASS_LINK_QUERY, {
+                "unique_id": unique_id,
+                "paths": proto_files,
+                "repo_url": self.repo_url
+            }, tx=tx)
             
             # Log creation
             logger.info(f"Created DataModel node for protobuf message: {name}")
@@ -1054,27 +1899,21 @@ class Neo4jLoader:
                 file_path=file_path,
                 repo_url=self.repo_url,
                 service_name=service_name,
-                is_api=True
+                is_api=True,
+                tx=tx
             )
             
             # Connect this class to all duplicate proto files
-            for proto_path in proto_files:
-                link_query = """
-                MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-                MATCH (f:File {path: $file_path, repo_url: $repo_url})
-                MERGE (f)-[:CONTAINS]->(cl)
-                """
-                
-                await db_manager.run_query(link_query, {
-                    "unique_id": unique_id,
-                    "file_path": proto_path,
-                    "repo_url": self.repo_url
-                })
+            await db_manager.run_query(PROTO_CLASS_LINK_QUERY, {
+                "unique_id": unique_id,
+                "paths": proto_files,
+                "repo_url": self.repo_url
+            }, tx=tx)
             
             # Log creation
             logger.info(f"Created ApiEndpoint node for protobuf service: {name}")
 
-    async def _find_all_proto_file_paths(self, file_path: str, repo_url: str):
+    async def _find_all_proto_file_paths(self, file_path: str, repo_url: str, tx=None):
         """
         Find all versions of a proto file by its basename.
         
@@ -1087,14 +1926,13 @@ class Neo4jLoader:
         """
         filename = os.path.basename(file_path)
         
+        # Equality on the indexed basename instead of a suffix scan over every File path
         query = """
-        MATCH (f:File)
-        WHERE f.repo_url = $repo_url
-        AND f.path ENDS WITH $filename
+        MATCH (f:File {basename: $filename, repo_url: $repo_url})
         RETURN f.path as path
         """
         
-        result = await db_manager.run_query(query, {"repo_url": repo_url, "filename": filename})
+        result = await db_manager.run_query(query, {"repo_url": repo_url, "filename": filename}, tx=tx)
         
         # Return all paths found plus the original path
         paths = [r["path"] for r in result]
@@ -1103,7 +1941,7 @@ class Neo4jLoader:
             
         return paths
 
-    async def _process_function_node(self, func_data, file_path):
+    async def _process_function_node(self, func_data, file_path, tx=None):
         """
         Process a function and create the appropriate nodes.
         
@@ -1111,11 +1949,7 @@ class Neo4jLoader:
             func_data: Dictionary containing function information
             file_path: The file path that contains this function
         """
-        # Extract repository name from the URL for better tracking
-        repo_name = self.repo_url.split('/')[-1].replace('.git', '')
-        
-        # Determine service name (default to repository name without extension)
-        service_name = repo_name.replace('.git', '')
+        service_name = self._service_name
         
         # Extract function properties
         unique_id = func_data.get('unique_id')
@@ -1131,28 +1965,11 @@ class Neo4jLoader:
             end_line=end_line,
             file_path=file_path,
             repo_url=self.repo_url,
-            service_name=service_name
+            service_name=service_name,
+            tx=tx
         )
-        
-        # Now create the relationship between the function and its parent file
-        link_query = """
-        MATCH (fn:Function {unique_id: $unique_id, repo_url: $repo_url})
-        MATCH (f:File {path: $file_path, repo_url: $repo_url})
-        MERGE (f)-[:CONTAINS]->(fn)
-        """
-        link_params = {
-            "unique_id": unique_id,
-            "file_path": file_path,
-            "repo_url": self.repo_url
-        }
-        
-        try:
-            await db_manager.run_query(link_query, link_params)
-            logger.debug(f"Created relationship between file {file_path} and function {name}")
-        except Exception as e:
-            logger.error(f"Error linking function {name} to file {file_path}: {e}")
 
-    async def _process_class_node(self, class_data, file_path):
+    async def _process_class_node(self, class_data, file_path, tx=None):
         """
         Process a class and create the appropriate nodes.
         
@@ -1160,11 +1977,7 @@ class Neo4jLoader:
             class_data: Dictionary containing class information
             file_path: The file path that contains this class
         """
-        # Extract repository name from the URL for better tracking
-        repo_name = self.repo_url.split('/')[-1].replace('.git', '')
-        
-        # Determine service name (default to repository name without extension)
-        service_name = repo_name.replace('.git', '')
+        service_name = self._service_name
         
         # Extract class properties
         unique_id = class_data.get('unique_id')
@@ -1180,76 +1993,15 @@ class Neo4jLoader:
             end_line=end_line,
             file_path=file_path,
             repo_url=self.repo_url,
-            service_name=service_name
+            service_name=service_name,
+            tx=tx
         )
-        
-        # Now create the relationship between the class and its parent file
-        link_query = """
-        MATCH (cl:Class {unique_id: $unique_id, repo_url: $repo_url})
-        MATCH (f:File {path: $file_path, repo_url: $repo_url})
-        MERGE (f)-[:CONTAINS]->(cl)
-        """
-        link_params = {
-            "unique_id": unique_id,
-            "file_path": file_path,
-            "repo_url": self.repo_url
-        }
-        
-        try:
-            await db_manager.run_query(link_query, link_params)
-            logger.debug(f"Created relationship between file {file_path} and class {name}")
-        except Exception as e:
-            logger.error(f"Error linking class {name} to file {file_path}: {e}")
 
-    def _detect_language(self, file_path):
+    @staticmethod
+    def _detect_language(file_path):
         """Detect language based on file extension"""
-        _, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-        
-        # Map file extensions to languages
-        language_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.jsx': 'javascript',
-            '.tsx': 'typescript',
-            '.java': 'java',
-            '.c': 'c',
-            '.cpp': 'cpp',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.scala': 'scala',
-            '.kt': 'kotlin',
-            '.swift': 'swift',
-            '.m': 'objective-c',
-            '.cs': 'csharp',
-            '.proto': 'protobuf',
-            '.md': 'markdown',
-            '.txt': 'text',
-            '.json': 'json',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.xml': 'xml',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.sql': 'sql',
-            '.sh': 'shell',
-            '.bash': 'shell'
-        }
+        return LANGUAGE_BY_EXTENSION.get(os.path.splitext(file_path)[1].lower(), 'unknown')
         
-        return language_map.get(ext, 'unknown')
-        
-    def _hash_content(self, content):
-        """Create a hash for the content"""
-        if not content:
-            return ""
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
-
     def _create_relationship(self, source_node, relationship_type, target_node):
         """
         Create a relationship between two nodes.
@@ -84,7 +84,7 @@ def main() -> None:
             for repo_url in args.repos:
                 config["repositories"].append({
                     "url": repo_url,
-                    "service_name": repo_url.split('/')[-1].replace('.git', '')
+                    "service_name": repo_url.rsplit('/', 1)[-1].removesuffix('.git')
                 })
     
     logger.info("Using enhanced knowledge system (EnhancedKnowledgeSystem) for ingestion")
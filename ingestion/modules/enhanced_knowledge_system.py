@@ -10,20 +10,91 @@ import logging
 import os
 import json
 import tempfile
-from typing import Dict, Any, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, AsyncIterable, List, Optional, Set, Tuple
 
 from app.db.neo4j_manager import db_manager
 from app.core.config import settings
+from ingestion.cache import ASTCache, content_hash
 from ingestion.config import ingestion_settings
-from ingestion.sources.git_loader import GitLoader
+from ingestion.sources.git_loader import GitLoader, repo_name_from_url
 from ingestion.parsing.enhanced_parser import EnhancedParser
-from ingestion.processing.chunking import chunk_code, chunk_code_file
-from ingestion.processing.embedding import embed_chunks
+from ingestion.processing.chunking import chunk_code_file
+from ingestion.processing.embedding import EMBED_MAX_CONCURRENCY, embed_chunks, warm_up_client
+from ingestion.processing.embedding_batch import embed_chunks_batch
 from ingestion.loading.enhanced_loader import EnhancedLoader
+from ingestion.loading.neo4j_loader import json_property
 from ingestion.schema import RELATIONSHIP_TYPES, get_node_types, get_relationship_types
 
 logger = logging.getLogger(__name__)
 
+# Files read concurrently by the reader stage per batch
+PARSE_BATCH_FILES = 1024
+# Items buffered between pipeline stages; a full queue makes the stage before it wait
+STAGE_QUEUE_MAXSIZE = 256
+# Embedded chunks written to Neo4j per UNWIND while embedding is still running
+CHUNK_LOAD_BATCH = 1000
+
+# Programming language by (lowercase) file extension
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".go": "go",
+    ".java": "java",
+    ".cs": "csharp",
+    ".php": "php",
+    ".rb": "ruby",
+    ".html": "html",
+    ".css": "css",
+    ".md": "markdown",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json"
+}
+
+
+def _language_for_path(file_path: str) -> Optional[str]:
+    """
+    Get programming language from a file path's extension (dotfiles have none).
+    
+    One rfind and one slice per path, no intermediate tuples; this runs once per file.
+    """
+    dot = file_path.rfind('.')
+    if dot <= file_path.rfind(os.sep) + 1:
+        return None
+    return LANGUAGE_BY_EXTENSION.get(file_path[dot:].lower())
+
+
+# Parse result lists whose entries carry a copy of the symbol's source text
+SYMBOL_KEYS = ("functions", "classes", "structs", "interfaces")
+
+
+def _parse_one(task: Tuple[str, str, str]) -> Dict[str, Any]:
+    """
+    Parse one (file_path, content, language) task with the EnhancedParser.
+    
+    Module-level so it can be pickled and run in a ProcessPoolExecutor. Tree-sitter
+    grammars are loaded when a worker first imports the parser module, so once per process.
+    """
+    file_path, content, language = task
+    try:
+        result = EnhancedParser.parse_file(file_path, content, language)
+        if result:
+            # Nothing after parsing reads the symbols' source text (chunks carry the
+            # code), so drop it before the result is pickled back and kept for the run
+            for key in SYMBOL_KEYS:
+                for symbol in result.get(key) or ():
+                    symbol.pop("content", None)
+            return result
+        # Add basic file entry if parsing returned None
+        return {"path": file_path, "language": language, "parse_error": True}
+    except Exception as e:
+        logger.error(f"Error parsing file {file_path} ({language}): {e}", exc_info=True)
+        return {"path": file_path, "language": language, "parse_error": True}
+
 
 class EnhancedKnowledgeSystem:
     """
@@ -101,14 +172,20 @@ class EnhancedKnowledgeSystem:
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (r:Repository) REQUIRE r.url IS UNIQUE",
                 # Use a simple uniqueness constraint instead of NODE KEY
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (s:Service) REQUIRE s.name IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE f.path IS UNIQUE",
+                "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.repo_url) IS UNIQUE",
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (fn:Function) REQUIRE fn.unique_id IS UNIQUE",
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Class) REQUIRE c.unique_id IS UNIQUE",
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (cc:CodeChunk) REQUIRE cc.chunk_id IS UNIQUE"
             ]
             
-            for query in queries:
-                await self.db_manager.run_query(query)
+            # The statements are independent, so their round-trips overlap; one failing
+            # (e.g. an equivalent index already exists) does not stop the others
+            results = await asyncio.gather(
+                *(self.db_manager.run_query(query) for query in queries), return_exceptions=True
+            )
+            for query, result in zip(queries, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Schema statement failed: {query}: {result}")
                 
             logger.info("Enhanced schema created successfully")
         except Exception as e:
@@ -132,58 +209,53 @@ class EnhancedKnowledgeSystem:
             branch=branch
         )
         
-        # Check if repository needs reindexing
-        last_indexed_sha = await self.db_manager.get_repository_status(repo_url)
-        repo, current_commit_sha = loader.get_repo_and_commit()
+        # Check if repository needs reindexing. The git fetch, the status lookup and the
+        # embedding client's connection setup run concurrently; Tree-sitter grammars are
+        # already loaded at import and inherited by the forked parse workers.
+        last_indexed_sha, (repo, current_commit_sha), _ = await asyncio.gather(
+            self.db_manager.get_repository_status(repo_url),
+            asyncio.to_thread(loader.get_repo_and_commit),
+            warm_up_client()
+        )
         
         force_reindex = repo_config.get("force_reindex", False)
         if not force_reindex and last_indexed_sha == current_commit_sha:
             logger.info(f"Repository {repo_url} already indexed at {current_commit_sha}. Skipping.")
             return
         
-        # Clear existing data for this repository
-        logger.info(f"Clearing existing data for {repo_url} before re-indexing...")
-        await self.db_manager.clear_repository_data(repo_url)
+        # Only re-ingest the files touched since the last indexed commit, when that is known
+        changes = None
+        if last_indexed_sha and not force_reindex:
+            changes = loader.get_changed_files(last_indexed_sha, current_commit_sha)
+            
+        changed_paths = None
+        if changes is not None:
+            added, modified, deleted = changes
+            await self.db_manager.delete_file_nodes(repo_url, deleted + modified)
+            changed_paths = added + modified
+        else:
+            # Clear existing data for this repository
+            logger.info(f"Clearing existing data for {repo_url} before re-indexing...")
+            await self.db_manager.clear_repository_data(repo_url)
         
         # Get and process files
         target_extensions = ingestion_settings.ingest_target_extensions.split(',')
-        files_content = loader.get_files_content(target_extensions)
+        files_content = loader.aiter_files_content(
+            target_extensions, batch_size=PARSE_BATCH_FILES, paths=changed_paths
+        )
         
-        if not files_content:
-            logger.warning(f"No files found in {repo_url} matching target extensions.")
+        # Read, parse, chunk, embed and load with the stages running concurrently
+        use_batch_api = repo_config.get("batch_mode", ingestion_settings.use_batch_api)
+        parsed_data, files_seen = await self._run_pipeline(repo_url, files_content, use_batch_api)
+        
+        if not files_seen:
+            if changed_paths is not None:
+                logger.info(f"No changed files in {repo_url} match target extensions.")
+            else:
+                logger.warning(f"No files found in {repo_url} matching target extensions.")
             await self.db_manager.update_repository_status(repo_url, current_commit_sha)
             return
         
-        # Parse files using the enhanced parser
-        parsed_data = []
-        for file_path, content in files_content:
-            # Determine language from file extension
-            _, ext = os.path.splitext(file_path)
-            language = self._get_language_from_extension(ext.lower())
-            
-            if not language:
-                logger.debug(f"Skipping parsing for file with unsupported extension: {file_path}")
-                continue
-            
-            try:
-                # Use the enhanced parser
-                result = EnhancedParser.parse_file(file_path, content, language)
-                if result:
-                    parsed_data.append(result)
-                else:
-                    # Add basic file entry if parsing returned None
-                    parsed_data.append({"path": file_path, "language": language, "parse_error": True})
-            except Exception as e:
-                logger.error(f"Error parsing file {file_path} ({language}): {e}", exc_info=True)
-                parsed_data.append({"path": file_path, "language": language, "parse_error": True})
-        
-        # Process code chunks and create embeddings
-        chunks_with_embeddings = await self._process_code_chunks(files_content)
-        
-        # Use the enhanced loader to load data into Neo4j
-        enhanced_loader = EnhancedLoader(repo_url)
-        await enhanced_loader.load_data(parsed_data, chunks_with_embeddings)
-        
         # Extract and load API endpoints and data models
         await self._process_api_endpoints(parsed_data, repo_url, service_name)
         await self._process_data_models(parsed_data, repo_url, service_name)
@@ -201,65 +273,155 @@ class EnhancedKnowledgeSystem:
         """Extract service name from repository URL."""
         if not repo_url:
             return "unknown-service"
-            
-        # Remove trailing slashes and .git extension
-        clean_url = repo_url.rstrip('/').rstrip('.git')
-        
-        # Get the last part of the URL (the repo name)
-        parts = clean_url.split('/')
-        return parts[-1]
+        return repo_name_from_url(repo_url) or "unknown-service"
     
-    def _get_language_from_extension(self, ext: str) -> Optional[str]:
-        """Get programming language from file extension."""
-        language_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".go": "go",
-            ".java": "java",
-            ".cs": "csharp",
-            ".php": "php",
-            ".rb": "ruby",
-            ".html": "html",
-            ".css": "css",
-            ".md": "markdown",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".json": "json"
-        }
-        
-        return language_map.get(ext)
-    
-    async def _process_code_chunks(self, files_content: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    async def _run_pipeline(
+        self, repo_url: str, files_content: AsyncIterable[List[Tuple[str, str]]], use_batch_api: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Process code files into chunks and generate embeddings.
+        Run the read, parse, chunk, embed and load stages as concurrent tasks.
+        
+        Stages are connected by bounded queues and signal the end of their output
+        with a None sentinel, so embedding requests overlap with parsing instead of
+        waiting for every file to be parsed first.
         
         Args:
-            files_content: List of tuples containing (file_path, content)
+            repo_url: URL of the repository being ingested
+            files_content: Async iterable of batches of (file_path, content) tuples
+            use_batch_api: Embed through an OpenAI Batch API job instead of online requests
             
         Returns:
-            List of code chunks with embeddings
+            Tuple of (parsed file data, number of files read)
         """
-        logger.info(f"Processing {len(files_content)} files for chunking and embedding")
-        
-        # Create chunks from files
-        chunks = []
-        for file_path, content in files_content:
-            # Get the file extension and determine language
-            _, ext = os.path.splitext(file_path)
-            language = self._get_language_from_extension(ext.lower())
-            language = language or "unknown"
+        loop = asyncio.get_running_loop()
+        parser_count = os.cpu_count() or 1
+        read_q = asyncio.Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+        parse_q = asyncio.Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+        chunk_q = asyncio.Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+        embed_q = asyncio.Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+        parsed_data = []
+        files_seen = 0
+        
+        async def reader():
+            nonlocal files_seen
+            async for batch in files_content:
+                for file_path, content in batch:
+                    files_seen += 1
+                    # Resolve the language once here; later stages just pass it along
+                    await read_q.put((file_path, content, _language_for_path(file_path)))
+            for _ in range(parser_count):
+                await read_q.put(None)
+                
+        async def parse_worker(pool: ProcessPoolExecutor):
+            while (item := await read_q.get()) is not None:
+                file_path, content, language = item
+                result = None
+                if language:
+                    # Unchanged files reuse the parse result from a previous run
+                    sha = content_hash(content)
+                    result = cache.get(file_path, sha)
+                    if result is None:
+                        result = await loop.run_in_executor(pool, _parse_one, (file_path, content, language))
+                        if not result.get("parse_error"):
+                            cache.put(file_path, sha, result)
+                else:
+                    logger.debug("Skipping parsing for file with unsupported extension: %s", file_path)
+                await parse_q.put((file_path, content, language, result))
+                
+        async def parser(pool: ProcessPoolExecutor):
+            # One worker per core keeps every process in the pool busy
+            await asyncio.gather(*(parse_worker(pool) for _ in range(parser_count)))
+            for _ in range(parser_count):
+                await parse_q.put(None)
+                
+        async def chunk_worker(pool: ProcessPoolExecutor):
+            while (item := await parse_q.get()) is not None:
+                file_path, content, language, result = item
+                if result is not None:
+                    parsed_data.append(result)
+                # Create chunks from file content with proper language information
+                file_chunks = await loop.run_in_executor(
+                    pool, chunk_code_file, file_path, content, "File", language or "unknown"
+                )
+                for chunk in file_chunks:
+                    await chunk_q.put(chunk)
+                    
+        async def chunker(pool: ProcessPoolExecutor):
+            # Text splitting is CPU-bound, so it shares the process pool with parsing
+            await asyncio.gather(*(chunk_worker(pool) for _ in range(parser_count)))
+            await chunk_q.put(None)
             
-            # Use the new function to create chunks from file content with proper language information
-            file_chunks = chunk_code_file(file_path, content, parent_type="File", language=language)
-            chunks.extend(file_chunks)
-        
-        # Embed the chunks
-        chunks_with_embeddings = await embed_chunks(chunks)
-        
-        return chunks_with_embeddings
+        async def embedder():
+            if use_batch_api:
+                # One Batch API job covers every chunk, so collect them all first
+                chunks = []
+                while (chunk := await chunk_q.get()) is not None:
+                    chunks.append(chunk)
+                for embedded in await embed_chunks_batch(chunks, cache=cache):
+                    await embed_q.put(embedded)
+                await embed_q.put(None)
+                return
+                
+            # Collect enough chunks to keep every concurrent embedding request busy
+            batch_size = ingestion_settings.embedding_batch_size * EMBED_MAX_CONCURRENCY
+            batch = []
+            while True:
+                chunk = await chunk_q.get()
+                if chunk is not None:
+                    batch.append(chunk)
+                if batch and (chunk is None or len(batch) >= batch_size):
+                    for embedded in await embed_chunks(batch, cache=cache):
+                        await embed_q.put(embedded)
+                    batch = []
+                if chunk is None:
+                    break
+            await embed_q.put(None)
+            
+        async def loader_task():
+            # Write CodeChunk nodes as they are embedded; linking them needs the File
+            # nodes, so it waits for load_data once every file has been parsed
+            enhanced_loader = EnhancedLoader(repo_url)
+            chunks_with_embeddings = []
+            batch = []
+            while True:
+                chunk = await embed_q.get()
+                if chunk is not None:
+                    batch.append(chunk)
+                if batch and (chunk is None or len(batch) >= CHUNK_LOAD_BATCH):
+                    await enhanced_loader.load_chunk_batch(batch)
+                    chunks_with_embeddings.extend(batch)
+                    batch = []
+                if chunk is None:
+                    break
+            logger.info(f"Parsed {len(parsed_data)} files and embedded {len(chunks_with_embeddings)} chunks from {files_seen} files")
+            
+            if not files_seen:
+                return
+                
+            # Use the enhanced loader to load the files and link the chunks
+            await enhanced_loader.load_data(parsed_data, chunks_with_embeddings, chunks_preloaded=True)
+            
+        with ASTCache() as cache, ProcessPoolExecutor(max_workers=parser_count) as pool:
+            tasks = [
+                asyncio.create_task(reader()),
+                asyncio.create_task(parser(pool)),
+                asyncio.create_task(chunker(pool)),
+                asyncio.create_task(embedder()),
+                asyncio.create_task(loader_task()),
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except Exception:
+                # A failed stage would leave its neighbours blocked on their queues
+                for task in tasks:
+                    task.cancel()
+                raise
+                
+        return parsed_data, files_seen
+    
+    def _get_language_from_extension(self, ext: str) -> Optional[str]:
+        """Get programming language from file extension."""
+        return LANGUAGE_BY_EXTENSION.get(ext)
     
     async def _process_api_endpoints(self, parsed_data, repo_url, service_name):
         """
@@ -362,7 +524,7 @@ class EnhancedKnowledgeSystem:
                     'service_name': model['service_name'],
                     'file_path': model['file_path'],
                     'orm': model['orm'],
-                    'fields': json.dumps(model['fields']),
+                    'fields': json_property(model['fields']),
                     'repo_url': model['repo_url']
                 }
                 
@@ -399,17 +561,22 @@ class EnhancedKnowledgeSystem:
         """
         logger.info("Starting enhanced knowledge system ingestion")
         
-        # Connect to the database
-        if not await self.connect_database():
-            logger.critical("Failed to connect to database. Aborting ingestion.")
-            return
-        
-        # Process each repository
-        for repo_config in self.config.get("repositories", []):
-            try:
-                await self.ingest_repository(repo_config)
-            except Exception as e:
-                logger.error(f"Error ingesting repository {repo_config.get('url')}: {e}", exc_info=True)
+        try:
+            # Connect to the database. This is not done by `async with self.db_manager`,
+            # whose __aenter__ would raise past the abort below instead of reporting it.
+            if not await self.connect_database():
+                logger.critical("Failed to connect to database. Aborting ingestion.")
+                return
+            
+            # Process each repository
+            for repo_config in self.config.get("repositories", []):
+                try:
+                    await self.ingest_repository(repo_config)
+                except Exception as e:
+                    logger.error(f"Error ingesting repository {repo_config.get('url')}: {e}", exc_info=True)
+        finally:
+            # The connection is closed on every path, including a failed connect
+            await self.db_manager.close()
         
         logger.info("Enhanced knowledge system ingestion completed")
 
@@ -458,7 +625,7 @@ def main() -> None:
         for repo_url in args.repos:
             config["repositories"].append({
                 "url": repo_url,
-                "service_name": repo_url.split('/')[-1].replace('.git', '')
+                "service_name": repo_url.rsplit('/', 1)[-1].removesuffix('.git')
             })
     
         # Create a temporary config file
@@ -2,24 +2,136 @@
 Module implementing the enterprise knowledge system.
 This handles the core code repository processing and knowledge graph creation.
 """
+import asyncio
 import logging
 import json
 import os
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
 
 from app.db.neo4j_manager import db_manager
 from app.core.config import settings
+from ingestion.cache import ASTCache, content_hash
 from ingestion.config import ingestion_settings, get_target_extensions
-from ingestion.sources.git_loader import GitLoader
+from ingestion.sources.git_loader import GitLoader, repo_name_from_url
 from ingestion.parsing.tree_sitter_parser import TreeSitterParser
-from ingestion.processing.chunking import chunk_code
-from ingestion.processing.embedding import embed_chunks
-from ingestion.loading.neo4j_loader import Neo4jLoader
+from ingestion.processing.chunking import chunk_file
+from ingestion.processing.embedding import EMBED_MAX_CONCURRENCY, embed_chunks
+from ingestion.loading.neo4j_loader import Neo4jLoader, json_property
 from ingestion.modules.microservices import MicroservicesIngestion
 from ingestion.modules.api import ApiExtractor
 
+try:
+    # Aho-Corasick automaton: finds every endpoint needle in one pass over a function body
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Files queued per parse worker while files stream in from disk
+PARSE_IN_FLIGHT_PER_WORKER = 16
+# Chunks waiting to be embedded, and embedded groups waiting to be written
+CHUNK_QUEUE_MAXSIZE = 1000
+EMBED_QUEUE_MAXSIZE = 50
+# Keeps TreeSitterParser results apart from the enhanced pipeline's in the shared AST cache
+PARSER_NAME = "tree_sitter"
+# Cross-service node pairs merged per UNWIND transaction
+CROSS_SERVICE_BATCH_ROWS = 10000
+# Function bodies fetched per page when matching them against API endpoints
+FUNCTION_PAGE_ROWS = 5000
+
+# Languages of the files parsed for API and data model extraction
+PARSE_LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".go": "go",
+    ".cs": "csharp",
+    ".java": "java",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".proto": "protobuf",
+    ".md": "markdown",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+}
+
+# Languages of the files parsed and chunked for embedding
+CHUNK_LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".go": "go",
+    ".cs": "csharp",
+    ".java": "java",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".md": "markdown",
+    ".txt": "text",
+    ".json": "json",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+}
+
+def _language_for_path(file_path: str, language_by_extension: Dict[str, str]) -> Optional[str]:
+    """Look up a file's language by its extension with one rfind and slice (dotfiles have none)."""
+    dot = file_path.rfind('.')
+    if dot <= file_path.rfind(os.sep) + 1:
+        return None
+    return language_by_extension.get(file_path[dot:].lower())
+
+def _parse_file(task: Tuple[str, str, str]) -> Dict[str, Any]:
+    """
+    Parse one (file_path, content, language) task with TreeSitterParser.
+    
+    Runs in a worker process, so it must stay a module-level function. Each worker
+    loads the grammars once on import of tree_sitter_parser; nothing is pickled but
+    the task and its result.
+    
+    Returns:
+        The parse result tagged with its language, or a parse_error entry
+    """
+    file_path, content, language = task
+    try:
+        result = TreeSitterParser.parse_file(file_path, content, language)
+    except Exception as e:
+        logger.error(f"Error parsing file {file_path} ({language}): {e}", exc_info=True)
+        result = None
+        
+    if not result:
+        # Add basic file entry if parsing failed or returned None
+        return {"path": file_path, "language": language, "parse_error": True}
+    result['language'] = language
+    return result
+
+async def _iter_in_thread(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking iterable (such as GitLoader.iter_classified_files, which reads
+    from disk) from a worker thread, so the event loop keeps running between items.
+    """
+    iterator = iter(iterable)
+    done = object()
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+def _build_matcher(needles: Iterable[str]) -> Callable[[str], Set[str]]:
+    """
+    Build a function returning the set of needles contained in a text.
+    
+    With pyahocorasick installed this is one automaton pass per text; otherwise
+    each needle is searched for in turn.
+    """
+    needles = list(needles)
+    if ahocorasick is not None and needles:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        return lambda text: {needle for _, needle in automaton.iter(text)}
+    return lambda text: {needle for needle in needles if needle in text}
+
 class EnterpriseKnowledgeSystem:
     """
     Unified knowledge system that integrates code, architecture, documentation,
@@ -92,8 +204,14 @@ class EnterpriseKnowledgeSystem:
                 "CREATE INDEX IF NOT EXISTS FOR (c:Class) ON (c.name)"
             ]
             
-            for query in queries:
-                await self.db_manager.run_query(query)
+            # The statements are independent, so their round-trips overlap; one failing
+            # (e.g. an equivalent index already exists) does not stop the others
+            results = await asyncio.gather(
+                *(self.db_manager.run_query(query) for query in queries), return_exceptions=True
+            )
+            for query, result in zip(queries, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Schema statement failed: {query}: {result}")
                 
             logger.info("Cross-repository schema created successfully")
         except Exception as e:
@@ -126,34 +244,55 @@ class EnterpriseKnowledgeSystem:
             logger.info(f"Repository {repo_url} already indexed at {current_commit_sha}. Skipping.")
             return
         
-        # Clear existing data for this repository
-        logger.info(f"Clearing existing data for {repo_url} before re-indexing...")
-        await self.db_manager.clear_repository_data(repo_url)
+        # Only re-ingest the files touched since the last indexed commit, when that is known
+        changes = None
+        if last_indexed_sha and not force_reindex:
+            changes = loader.get_changed_files(last_indexed_sha, current_commit_sha)
+            
+        changed_paths = None
+        if changes is not None:
+            added, modified, deleted = changes
+            await self._delete_file_data(repo_url, deleted + modified)
+            changed_paths = added + modified
+        else:
+            # Clear existing data for this repository
+            logger.info(f"Clearing existing data for {repo_url} before re-indexing...")
+            await self.db_manager.clear_repository_data(repo_url)
         
         # Create Repository node
         await self._create_repository_node(repo_url, service_name, repo_config.get("description", ""))
         
-        # Get and process files
+        # Get and process files. They are streamed from disk into the parse pool
+        # rather than read up front
         target_extensions = get_target_extensions()
-        files_content = loader.get_files_content(target_extensions)
+        parsed_data, files_found = await asyncio.to_thread(
+            self._parse_files,
+            loader.iter_classified_files(target_extensions, PARSE_LANGUAGE_BY_EXTENSION, paths=changed_paths)
+        )
         
-        if not files_content:
-            logger.warning(f"No files found in {repo_url} matching target extensions.")
+        if not files_found:
+            if changed_paths is not None:
+                logger.info(f"No changed files in {repo_url} match target extensions.")
+            else:
+                logger.warning(f"No files found in {repo_url} matching target extensions.")
             await self.db_manager.update_repository_status(repo_url, current_commit_sha)
             return
         
-        # Parse files based on language
-        parsed_data = self._parse_files(files_content)
-        
         # Extract API definitions and data models
         api_definitions, data_models = self._extract_api_and_data_models(parsed_data, repo_url)
         logger.info(f"Extracted {len(api_definitions)} API endpoints and {len(data_models)} data models from {repo_url}")
         
         # Load API endpoints and data models into the graph
         await self._load_api_and_data_models(api_definitions, data_models, repo_url, service_name)
-        
-        # Process code chunks and create embeddings
-        await self._process_code_chunks(files_content, repo_url, service_name)
+        # The chunk pass reparses (from the AST cache), so don't hold these across it
+        del parsed_data, api_definitions, data_models
+
+        # Process code chunks and create embeddings. The files are streamed again (from
+        # the page cache, having just been read) instead of being held between passes
+        await self._process_code_chunks(
+            loader.iter_classified_files(target_extensions, PARSE_LANGUAGE_BY_EXTENSION, paths=changed_paths),
+            repo_url, service_name
+        )
         
         # Update repository status
         await self.db_manager.update_repository_status(repo_url, current_commit_sha)
@@ -164,73 +303,90 @@ class EnterpriseKnowledgeSystem:
         
         logger.info(f"Repository {repo_url} ingestion completed.")
     
+    async def _delete_file_data(self, repo_url, paths):
+        """
+        Remove the graph data of the given files ahead of an incremental re-ingest.
+        
+        Args:
+            repo_url: Repository URL
+            paths: Repository-relative paths of deleted or modified files
+        """
+        if not paths:
+            return
+            
+        # File nodes take their chunks and symbols with them
+        await self.db_manager.delete_file_nodes(repo_url, paths)
+        
+        # API endpoints and data models are linked to the repository, not the file.
+        # One query per label, so each can seek the (repo_url, file_path) index
+        params = {"repo_url": repo_url, "paths": list(paths)}
+        for label in ("ApiEndpoint", "DataModel"):
+            query = f"""
+            MATCH (n:{label})
+            WHERE n.repo_url = $repo_url AND n.file_path IN $paths
+            DETACH DELETE n
+            """
+            await self.db_manager.run_query(query, params)
+    
     def _extract_service_name(self, repo_url):
         """Extract service name from repository URL."""
         if not repo_url:
             return "unknown-service"
-            
-        # Remove trailing slashes and .git extension
-        clean_url = repo_url.rstrip('/').rstrip('.git')
-        
-        # Get the last part of the URL (the repo name)
-        parts = clean_url.split('/')
-        return parts[-1]
+        return repo_name_from_url(repo_url) or "unknown-service"
     
     def _parse_files(self, files_content):
         """
         Parse files based on language detection.
         
         Args:
-            files_content: List of tuples containing (file_path, content)
+            files_content: Iterable of (file_path, content, language) tuples, as
+                classified with PARSE_LANGUAGE_BY_EXTENSION by GitLoader.iter_classified_files
             
         Returns:
-            List of parsed file data
+            Tuple of (list of parsed file data, number of files read)
         """
         parsed_data = []
-        
-        # --- Define language mapping ---
-        extension_to_language = {
-            ".py": "python",
-            ".go": "go",
-            ".cs": "csharp",
-            ".java": "java",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".proto": "protobuf",
-            ".md": "markdown",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".json": "json",
-        }
-        
-        # Process each file
-        for file_path, content in files_content:
-            # Determine language from file extension
-            _, ext = os.path.splitext(file_path)
-            language = extension_to_language.get(ext.lower())
-            
-            if not language:
-                self.logger.debug(f"Skipping structural parsing for file with unmapped extension: {file_path}")
-                continue
-                
-            try:
-                # Use TreeSitterParser to parse the file
-                result = TreeSitterParser.parse_file(file_path, content, language)
-                if result:
-                    result['language'] = language
+        files_found = 0
+        cached_count = 0
+        
+        # Unchanged files come from the AST cache; parsing the rest is CPU-bound, so they
+        # fan out across one process per core as they are read. Only a bounded number are
+        # queued, so the repository's files are never all held at once.
+        workers = os.cpu_count() or 1
+        with ASTCache() as cache, ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            
+            def collect(futures):
+                for future in futures:
+                    file_path, sha = in_flight.pop(future)
+                    result = future.result()
+                    if not result.get("parse_error"):
+                        cache.put(file_path, sha, result, parser=PARSER_NAME)
                     parsed_data.append(result)
-                else:
-                    # Add basic file entry if parsing returned None
-                    parsed_data.append({"path": file_path, "language": language, "parse_error": True})
                     
-            except Exception as e:
-                self.logger.error(f"Error parsing file {file_path} ({language}): {e}", exc_info=True)
-                parsed_data.append({"path": file_path, "language": language, "parse_error": True})
+            for file_path, content, language in files_content:
+                files_found += 1
+                if not language:
+                    self.logger.debug("Skipping structural parsing for file with unmapped extension: %s", file_path)
+                    continue
+                    
+                sha = content_hash(content)
+                cached = cache.get(file_path, sha, parser=PARSER_NAME)
+                if cached is not None:
+                    cached_count += 1
+                    parsed_data.append(cached)
+                    continue
+                    
+                in_flight[pool.submit(_parse_file, (file_path, content, language))] = (file_path, sha)
+                if len(in_flight) >= workers * PARSE_IN_FLIGHT_PER_WORKER:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    
+            collect(list(in_flight))
                 
-        self.logger.info(f"Successfully parsed (or attempted) {len(parsed_data)} files.")
-        return parsed_data
+        self.logger.info(f"Reused {cached_count} cached parse results; "
+                         f"successfully parsed (or attempted) {len(parsed_data)} files.")
+        return parsed_data, files_found
         
     def _handle_special_file_types(self, file_path, content, language):
         """
@@ -299,71 +455,120 @@ class EnterpriseKnowledgeSystem:
         Uses the same successful approach as the original ingestion_pipeline.
         
         Args:
-            files_content: List of tuples containing (file_path, content)
+            files_content: Iterable of (file_path, content, language) tuples
             repo_url: URL of the repository
             service_name: Name of the service/repository
         """
         logger.info(f"Processing code chunks for {repo_url}")
         
         try:
-            # --- Parse files using TreeSitterParser (like in original pipeline) ---
-            extension_to_language = {
-                ".py": "python",
-                ".go": "go",
-                ".cs": "csharp",
-                ".java": "java",
-                ".js": "javascript",
-                ".jsx": "javascript",
-                ".ts": "typescript",
-                ".tsx": "typescript",
-                ".md": "markdown",
-                ".txt": "text",
-                ".json": "json",
-                ".yml": "yaml",
-                ".yaml": "yaml",
-            }
-            
-            # Step 1: Parse files with TreeSitterParser for structural data
+            files_found = 0
             parsed_data = []
-            for file_path, content in files_content:
-                # Skip very large files and binary files
-                if len(content) > 1000000 or '\0' in content:
-                    logger.warning(f"Skipping large or binary file: {file_path}")
-                    continue
-                
-                # Determine language from file extension
-                _, ext = os.path.splitext(file_path)
-                language = extension_to_language.get(ext.lower())
-                
-                if not language:
-                    logger.debug(f"Skipping structural parsing for file with unmapped extension: {file_path}")
-                    # Add a basic file entry for completeness
-                    parsed_data.append({"path": file_path, "language": "unknown", "parse_error": True})
-                    continue
+            loop = asyncio.get_running_loop()
+            workers = os.cpu_count() or 1
+            with ASTCache() as cache, ProcessPoolExecutor(max_workers=workers) as pool:
+                # Steps 1-4 run as a stream: files are read off the event loop, parsed and
+                # chunked across the pool, chunks are embedded in groups, and each embedded
+                # group is written while the next is in flight
+                chunk_q: asyncio.Queue = asyncio.Queue(maxsize=CHUNK_QUEUE_MAXSIZE)
+                embed_q: asyncio.Queue = asyncio.Queue(maxsize=EMBED_QUEUE_MAXSIZE)
+                neo4j_loader = Neo4jLoader(repo_url=repo_url)
+                chunks_with_embeddings = []
+                chunk_count = 0
                 
+                async def chunker():
+                    # Steps 1-2: Parse files with TreeSitterParser for structural data (same as
+                    # the original pipeline, skipping files whose content was parsed before), then
+                    # chunk each parsed file. Only a bounded number of files are in the pool at
+                    # once, so the repository's contents are never all held.
+                    nonlocal files_found
+                    parsing = {}
+                    chunking = set()
+                    
+                    def chunk(file_data):
+                        parsed_data.append(file_data)
+                        chunking.add(loop.run_in_executor(pool, chunk_file, file_data, file_data.get('language', 'auto')))
+                        
+                    async def collect():
+                        nonlocal chunk_count
+                        done, _ = await asyncio.wait(parsing.keys() | chunking, return_when=asyncio.FIRST_COMPLETED)
+                        for future in done:
+                            if future in parsing:
+                                file_path, sha = parsing.pop(future)
+                                result = future.result()
+                                if not result.get("parse_error"):
+                                    cache.put(file_path, sha, result, parser=PARSER_NAME)
+                                chunk(result)
+                            else:
+                                chunking.discard(future)
+                                for chunk_data in future.result():
+                                    chunk_count += 1
+                                    await chunk_q.put(chunk_data)
+                                    
+                    async for file_path, content, _ in _iter_in_thread(files_content):
+                        files_found += 1
+                        # Skip very large files and binary files
+                        if len(content) > 1000000 or '\0' in content:
+                            logger.warning(f"Skipping large or binary file: {file_path}")
+                            continue
+                        
+                        # Determine language from file extension
+                        language = _language_for_path(file_path, CHUNK_LANGUAGE_BY_EXTENSION)
+                        
+                        if not language:
+                            logger.debug("Skipping structural parsing for file with unmapped extension: %s", file_path)
+                            # Add a basic file entry for completeness
+                            chunk({"path": file_path, "language": "unknown", "parse_error": True})
+                        else:
+                            sha = content_hash(content)
+                            cached = cache.get(file_path, sha, parser=PARSER_NAME)
+                            if cached is not None:
+                                chunk(cached)
+                            else:
+                                parsing[loop.run_in_executor(pool, _parse_file, (file_path, content, language))] = (file_path, sha)
+                                
+                        if len(parsing) + len(chunking) >= workers * PARSE_IN_FLIGHT_PER_WORKER:
+                            await collect()
+                            
+                    while parsing or chunking:
+                        await collect()
+                    await chunk_q.put(None)
+                    
+                async def embedder():
+                    # Step 3: Create embeddings, in groups large enough to keep every
+                    # concurrent embedding request busy
+                    group_size = ingestion_settings.embedding_batch_size * EMBED_MAX_CONCURRENCY
+                    group = []
+                    while True:
+                        chunk = await chunk_q.get()
+                        if chunk is not None:
+                            group.append(chunk)
+                        if group and (chunk is None or len(group) >= group_size):
+                            await embed_q.put(await embed_chunks(group))
+                            group = []
+                        if chunk is None:
+                            break
+                    await embed_q.put(None)
+                    
+                async def writer():
+                    # Step 4: Write CodeChunk nodes (using the original Neo4jLoader)
+                    while (embedded := await embed_q.get()) is not None:
+                        await neo4j_loader.load_chunk_batch(embedded)
+                        chunks_with_embeddings.extend(embedded)
+                        
+                tasks = [asyncio.create_task(stage()) for stage in (chunker, embedder, writer)]
                 try:
-                    # Use TreeSitterParser (same as original pipeline)
-                    result = TreeSitterParser.parse_file(file_path, content, language)
-                    if result:
-                        result['language'] = language
-                        parsed_data.append(result)
-                    else:
-                        parsed_data.append({"path": file_path, "language": language, "parse_error": True})
-                except Exception as e:
-                    logger.error(f"Error parsing file {file_path} ({language}): {e}", exc_info=True)
-                    parsed_data.append({"path": file_path, "language": language, "parse_error": True})
-            
-            # Step 2: Create chunks from the parsed data
-            all_chunks = chunk_code(parsed_data, "auto")
-            logger.info(f"Created {len(all_chunks)} code chunks from {len(files_content)} files")
-            
-            # Step 3: Create embeddings for the chunks
-            chunks_with_embeddings = await embed_chunks(all_chunks)
+                    await asyncio.gather(*tasks)
+                except Exception:
+                    # A failed stage would leave its neighbours blocked on their queues
+                    for task in tasks:
+                        task.cancel()
+                    raise
+            logger.info(f"Created {chunk_count} code chunks from {files_found} files")
             logger.info(f"Created embeddings for {len(chunks_with_embeddings)} code chunks")
             
-            # Step 4: Load into Neo4j (using the original Neo4jLoader)
-            neo4j_loader = Neo4jLoader(repo_url=repo_url)
-            await neo4j_loader.load_data(parsed_data, chunks_with_embeddings)
+            # Files, symbols and the links to the already written chunks
+            await neo4j_loader.load_data(parsed_data, chunks_with_embeddings, chunks_preloaded=True)
             logger.info(f"Loaded code chunks and embeddings into Neo4j for {repo_url}")
             
             # Step 5: Create additional relationships between code chunks and repository/service
@@ -420,7 +625,8 @@ class EnterpriseKnowledgeSystem:
                 neo4j_password=None,
                 repo_url=repo_url
             )
-            ingestion.process_all_services()
+            # Parsing and loading are blocking; keep the event loop free meanwhile
+            await asyncio.to_thread(ingestion.process_all_services)
             logger.info(f"Successfully analyzed microservices architecture from {repo_path}")
             
             # After processing microservices, analyze cross-service relationships
@@ -439,14 +645,29 @@ class EnterpriseKnowledgeSystem:
         logger.info("Analyzing cross-service relationships...")
         
         try:
-            # 1. Find API dependencies between services
+            # 1. Find API dependencies between services. Endpoint names, paths and
+            # service names are matched against the function bodies in Python, so only
+            # the matching pairs are sent back instead of a Cartesian scan in Cypher
             query = """
-            // Match API endpoints and potential callers
             MATCH (s1:Service)-[:EXPOSES]->(api:ApiEndpoint)
+            RETURN elementId(s1) AS service_id, s1.name AS service_name,
+                   elementId(api) AS api_id, api.name AS name, api.api_path AS api_path
+            """
+            endpoints_by_needle = {}
+            for row in await self.db_manager.read_query(query):
+                needles = {row["api_path"], row["service_name"]}
+                if row["name"]:
+                    needles.update((row["name"], row["name"].replace('_', '-')))
+                for needle in needles:
+                    if needle:
+                        endpoints_by_needle.setdefault(needle, []).append((row["service_id"], row["api_id"]))
+            
+            match_needles = _build_matcher(endpoints_by_needle)
+            
+            functions_query = """
             MATCH (s2:Service)<-[:BELONGS_TO]-(func:Function)
-            WHERE s1 <> s2
-            AND (
-                // Look for HTTP client calls that might reference this endpoint
+            WHERE
+                // Look for HTTP client calls that might reference an endpoint
                 func.code CONTAINS 'http' OR 
                 func.code CONTAINS 'fetch' OR 
                 func.code CONTAINS 'axios' OR
@@ -454,13 +675,17 @@ class EnterpriseKnowledgeSystem:
                 func.code CONTAINS 'RestTemplate' OR
                 func.code CONTAINS 'WebClient' OR
                 func.code CONTAINS 'HttpClient'
-            )
-            // Create potential dependency relationships
-            WITH api, func, s1, s2
-            WHERE func.code CONTAINS api.name OR 
-                  func.code CONTAINS REPLACE(api.name, '_', '-') OR
-                  func.code CONTAINS api.api_path OR
-                  func.code CONTAINS s1.name
+            RETURN elementId(s2) AS service_id, elementId(func) AS func_id, func.code AS code
+            ORDER BY func_id
+            SKIP $skip LIMIT $limit
+            """
+            
+            query = """
+            UNWIND $pairs AS p
+            MATCH (func) WHERE elementId(func) = p.func
+            MATCH (api) WHERE elementId(api) = p.api
+            MATCH (s1) WHERE elementId(s1) = p.s1
+            MATCH (s2) WHERE elementId(s2) = p.s2
             MERGE (func)-[:MAY_CALL]->(api)
             
             // Also create a service-to-service relationship
@@ -471,17 +696,56 @@ class EnterpriseKnowledgeSystem:
             RETURN count(*) as relationships
             """
             
-            result = await self.db_manager.run_query(query)
-            count = result[0]['relationships'] if result else 0
+            count = 0
+            skip = 0
+            while endpoints_by_needle:
+                rows = await self.db_manager.read_query(functions_query, {"skip": skip, "limit": FUNCTION_PAGE_ROWS})
+                pairs = []
+                for row in rows:
+                    # A function matching an endpoint through several needles calls it once
+                    endpoints = {
+                        endpoint
+                        for needle in match_needles(row["code"])
+                        for endpoint in endpoints_by_needle[needle]
+                        if endpoint[0] != row["service_id"]
+                    }
+                    pairs.extend(
+                        {"func": row["func_id"], "s2": row["service_id"], "s1": service_id, "api": api_id}
+                        for service_id, api_id in endpoints
+                    )
+                count += await self._merge_pairs(query, pairs)
+                
+                if len(rows) < FUNCTION_PAGE_ROWS:
+                    break
+                skip += FUNCTION_PAGE_ROWS
+            
             logger.info(f"Identified {count} potential cross-service API dependencies")
             
-            # 2. Find shared data models between services
+            # 2. Find shared data models between services. Models are paired up by name
+            # in Python, so the graph only sees the matching pairs, not every pair of models
             query = """
-            // Match data models with similar names across services
-            MATCH (s1:Service)-[:USES_MODEL]->(dm1:DataModel)
-            MATCH (s2:Service)-[:USES_MODEL]->(dm2:DataModel)
-            WHERE s1 <> s2
-            AND dm1.name = dm2.name
+            MATCH (s:Service)-[:USES_MODEL]->(dm:DataModel)
+            RETURN elementId(s) AS service_id, elementId(dm) AS model_id, dm.name AS name
+            """
+            models_by_name = {}
+            for row in await self.db_manager.read_query(query):
+                if row["name"] is not None:
+                    models_by_name.setdefault(row["name"], []).append(row)
+            
+            pairs = [
+                {"s1": a["service_id"], "dm1": a["model_id"], "s2": b["service_id"], "dm2": b["model_id"]}
+                for models in models_by_name.values() if len(models) > 1
+                for a in models
+                for b in models
+                if a["service_id"] != b["service_id"]
+            ]
+            
+            query = """
+            UNWIND $pairs AS p
+            MATCH (s1) WHERE elementId(s1) = p.s1
+            MATCH (dm1) WHERE elementId(dm1) = p.dm1
+            MATCH (s2) WHERE elementId(s2) = p.s2
+            MATCH (dm2) WHERE elementId(dm2) = p.dm2
             MERGE (dm1)-[:SIMILAR_TO]->(dm2)
             
             // Create a service-to-service relationship for shared models
@@ -492,8 +756,7 @@ class EnterpriseKnowledgeSystem:
             RETURN count(*) as relationships
             """
             
-            result = await self.db_manager.run_query(query)
-            count = result[0]['relationships'] if result else 0
+            count = await self._merge_pairs(query, pairs)
             logger.info(f"Identified {count} potential shared data models across services")
             
             # Add more relationship types as needed...
@@ -501,6 +764,21 @@ class EnterpriseKnowledgeSystem:
         except Exception as e:
             logger.error(f"Error during cross-service relationship analysis: {e}", exc_info=True)
 
+    async def _merge_pairs(self, query, pairs):
+        """
+        Run an UNWIND $pairs query over the pairs in batches of CROSS_SERVICE_BATCH_ROWS.
+        
+        The batches run one after another, since they may MERGE the same relationships.
+        
+        Returns:
+            Total of the batches' `relationships` counts
+        """
+        count = 0
+        for i in range(0, len(pairs), CROSS_SERVICE_BATCH_ROWS):
+            result = await self.db_manager.run_query(query, {"pairs": pairs[i:i + CROSS_SERVICE_BATCH_ROWS]})
+            count += result[0]['relationships'] if result else 0
+        return count
+
     # Additional methods from the original file can be added here
     # _extract_data_models_with_tree_sitter, _extract_api_and_data_models, etc.
     
@@ -583,21 +861,21 @@ class EnterpriseKnowledgeSystem:
         await self.db_manager.run_query(query, params)
         logger.info(f"Created/updated Service node for {service_name}")
         
-        # Create API endpoints
-        for api in api_definitions:
-            # Create the API endpoint node
+        # Create API endpoints, all in one round-trip
+        if api_definitions:
             query = """
+            UNWIND $rows AS row
             MERGE (api:ApiEndpoint {
-                name: $name,
-                path: $path,
-                method: $method,
-                file_path: $file_path,
-                framework: $framework,
+                name: row.name,
+                path: row.path,
+                method: row.method,
+                file_path: row.file_path,
+                framework: row.framework,
                 repo_url: $repo_url
             })
-            SET api.code = $code,
-                api.params = $params,
-                api.return_type = $return_type,
+            SET api.code = row.code,
+                api.params = row.params,
+                api.return_type = row.return_type,
                 api.last_updated = datetime()
             
             WITH api
@@ -607,41 +885,42 @@ class EnterpriseKnowledgeSystem:
             MERGE (s)-[:EXPOSES]->(api)
             
             // Create relationship to Repository
+            WITH api
             MATCH (r:Repository {url: $repo_url})
             MERGE (api)-[:BELONGS_TO]->(r)
-            
-            RETURN api
             """
-            params = {
-                "name": api.get("name", ""),
-                "path": api.get("path", ""),
-                "method": api.get("method", "GET"),
-                "file_path": api.get("file_path", ""),
-                "framework": api.get("framework", ""),
-                "code": api.get("code", ""),
-                "params": json.dumps(api.get("params", [])),
-                "return_type": api.get("return_type", ""),
-                "repo_url": repo_url,
-                "service_name": service_name
-            }
+            rows = [
+                {
+                    "name": api.get("name", ""),
+                    "path": api.get("path", ""),
+                    "method": api.get("method", "GET"),
+                    "file_path": api.get("file_path", ""),
+                    "framework": api.get("framework", ""),
+                    "code": api.get("code", ""),
+                    "params": json_property(api.get("params", [])),
+                    "return_type": api.get("return_type", "")
+                }
+                for api in api_definitions
+            ]
+            params = {"rows": rows, "repo_url": repo_url, "service_name": service_name}
             
             try:
                 await self.db_manager.run_query(query, params)
             except Exception as e:
-                logger.error(f"Error loading API endpoint {api.get('name')}: {e}")
+                logger.error(f"Error loading {len(rows)} API endpoints: {e}")
         
-        # Create data models
-        for model in data_models:
-            # Create the DataModel node
+        # Create data models, all in one round-trip
+        if data_models:
             query = """
+            UNWIND $rows AS row
             MERGE (dm:DataModel {
-                name: $name,
-                type: $type,
-                file_path: $file_path,
+                name: row.name,
+                type: row.type,
+                file_path: row.file_path,
                 repo_url: $repo_url
             })
-            SET dm.code = $code,
-                dm.fields = $fields,
+            SET dm.code = row.code,
+                dm.fields = row.fields,
                 dm.last_updated = datetime()
             
             WITH dm
@@ -651,24 +930,25 @@ class EnterpriseKnowledgeSystem:
             MERGE (s)-[:USES_MODEL]->(dm)
             
             // Create relationship to Repository
+            WITH dm
             MATCH (r:Repository {url: $repo_url})
             MERGE (dm)-[:BELONGS_TO]->(r)
-            
-            RETURN dm
             """
-            params = {
-                "name": model.get("name", ""),
-                "type": model.get("type", ""),
-                "file_path": model.get("file_path", ""),
-                "code": model.get("code", ""),
-                "fields": json.dumps(model.get("fields", [])),
-                "repo_url": repo_url,
-                "service_name": service_name
-            }
+            rows = [
+                {
+                    "name": model.get("name", ""),
+                    "type": model.get("type", ""),
+                    "file_path": model.get("file_path", ""),
+                    "code": model.get("code", ""),
+                    "fields": json_property(model.get("fields", []))
+                }
+                for model in data_models
+            ]
+            params = {"rows": rows, "repo_url": repo_url, "service_name": service_name}
             
             try:
                 await self.db_manager.run_query(query, params)
             except Exception as e:
-                logger.error(f"Error loading data model {model.get('name')}: {e}")
+                logger.error(f"Error loading {len(rows)} data models: {e}")
                 
         logger.info(f"Loaded {len(api_definitions)} API endpoints and {len(data_models)} data models for {service_name}") 
\ No newline at end of file
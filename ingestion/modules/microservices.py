@@ -4,7 +4,11 @@ Module for ingesting microservices-based repositories.
 import logging
 import os
 import subprocess
-from typing import Dict, Any
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from ingestion.config import ingestion_settings
 from ingestion.loading.microservices_loader import MicroservicesLoader
@@ -12,6 +16,136 @@ from ingestion.parsing.tree_sitter_parser import TreeSitterParser
 
 logger = logging.getLogger(__name__)
 
+# Source extensions used to detect a service's primary language
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.go': 'go',
+    '.cs': 'csharp',
+    '.java': 'java',
+    '.js': 'javascript',
+    '.ts': 'typescript'
+}
+CODE_EXTENSIONS = frozenset(LANGUAGE_BY_EXTENSION)
+CODE_SUFFIXES = tuple(LANGUAGE_BY_EXTENSION)
+
+# Dependency and build output directories never descended into (hidden ones are skipped too)
+SKIP_DIRS = frozenset({'node_modules', 'vendor', 'target', 'build', 'dist', '__pycache__', 'bin', 'obj'})
+
+# Source files read ahead of the parser per service
+MAX_CONCURRENT_READS = 16
+
+def _iter_file_names(path: str) -> Iterator[os.DirEntry]:
+    """
+    Yield the files under a directory, skipping hidden directories such as .git and
+    the dependency/build directories in SKIP_DIRS.
+    
+    Uses an explicit os.scandir stack, whose entries carry their type, instead of
+    os.walk's extra stat calls and per-directory name lists.
+    """
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.') and entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError as e:
+            logger.warning(f"Cannot list directory: {e}")
+
+def _scan_service(service_path: str) -> Tuple[List[str], Counter]:
+    """
+    Walk a service directory once, returning its source file paths and a count of
+    their extensions (from which its primary language is detected).
+    """
+    file_paths = []
+    extensions = Counter()
+    for entry in _iter_file_names(service_path):
+        name = entry.name
+        if name.endswith(CODE_SUFFIXES):
+            file_paths.append(entry.path)
+        dot = name.rfind('.')
+        if dot > 0:
+            ext = name[dot:].lower()
+            if ext in CODE_EXTENSIONS:
+                extensions[ext] += 1
+    return file_paths, extensions
+
+def _primary_language(extensions: Counter) -> Optional[str]:
+    """The language of the most common source extension, or None if there are none."""
+    if not extensions:
+        return None
+    return LANGUAGE_BY_EXTENSION[extensions.most_common(1)[0][0]]
+
+def _read_source(file_path: str) -> Optional[bytes]:
+    """
+    Read a source file's raw bytes, returning None (and logging) if it cannot be read.
+    
+    Tree-sitter parses bytes, so the file is never decoded into a str only to be
+    encoded back again.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read()
+    except Exception as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        return None
+
+def _iter_sources(file_paths: List[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Yield (file_path, content) for the files in order, reading up to
+    MAX_CONCURRENT_READS of them ahead of the consumer on a thread pool.
+    
+    Reads are blocking syscalls that release the GIL, so they overlap the caller's
+    parsing; the window bounds how many files wait in memory if reading outpaces it.
+    """
+    paths = iter(file_paths)
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_READS) as readers:
+        pending = deque((path, readers.submit(_read_source, path))
+                        for path in islice(paths, MAX_CONCURRENT_READS))
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, readers.submit(_read_source, next_path)))
+            yield file_path, future.result()
+
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    """
+    The YAML loader class for manifests, picked once per process.
+    
+    libyaml's C loader is several times faster than the pure-Python one; PyYAML
+    only provides it when built against libyaml (e.g. with libyaml-dev installed).
+    """
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def _parse_manifest(file_path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse a Kubernetes manifest file into (service_name, metadata) pairs, one per Deployment.
+    
+    Runs on a worker thread; the caller merges the pairs into its service metadata.
+    """
+    import yaml
+    
+    services = []
+    try:
+        with open(file_path) as f:
+            # Parse all documents in the YAML file
+            for manifest in yaml.load_all(f, Loader=_yaml_loader()):
+                if manifest and manifest.get('kind') == 'Deployment':
+                    services.append((manifest['metadata']['name'], {
+                        'containers': manifest['spec']['template']['spec']['containers'],
+                        'labels': manifest['metadata'].get('labels', {}),
+                        'annotations': manifest['metadata'].get('annotations', {})
+                    }))
+    except yaml.YAMLError as e:
+        logger.error(f"Error parsing {os.path.basename(file_path)}: {e}")
+    return services
+
 class MicroservicesIngestion:
     """
     Class for analyzing and ingesting microservices architecture.
@@ -54,6 +188,12 @@ class MicroservicesIngestion:
         self.clone_repository()
         self.load_service_metadata()
     
+    def __getstate__(self):
+        """Pickle everything but the Neo4j loader; service workers only parse, the parent loads."""
+        state = self.__dict__.copy()
+        state['loader'] = None
+        return state
+    
     @staticmethod
     def _extract_repo_name(repo_url: str) -> str:
         """Extract repository name from URL."""
@@ -110,26 +250,20 @@ class MicroservicesIngestion:
         compose_path = os.path.join(self.repo_path, "docker-compose.yaml")
         
         if os.path.exists(k8s_path):
-            for filename in os.listdir(k8s_path):
-                if filename.endswith(('.yaml', '.yml')):
-                    try:
-                        with open(os.path.join(k8s_path, filename)) as f:
-                            # Parse all documents in the YAML file
-                            documents = list(yaml.safe_load_all(f))
-                            for manifest in documents:
-                                if manifest and manifest.get('kind') == 'Deployment':
-                                    service_name = manifest['metadata']['name']
-                                    self.service_metadata[service_name] = {
-                                        'containers': manifest['spec']['template']['spec']['containers'],
-                                        'labels': manifest['metadata'].get('labels', {}),
-                                        'annotations': manifest['metadata'].get('annotations', {})
-                                    }
-                    except yaml.YAMLError as e:
-                        logger.error(f"Error parsing {filename}: {e}")
+            with os.scandir(k8s_path) as entries:
+                manifest_paths = [
+                    entry.path for entry in entries
+                    if entry.name.endswith(('.yaml', '.yml')) and entry.is_file()
+                ]
+            # Read and parse the manifests on a thread pool; map keeps directory order,
+            # so a later file still overrides an earlier one for the same service
+            with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_READS, len(manifest_paths) or 1)) as executor:
+                for services in executor.map(_parse_manifest, manifest_paths):
+                    self.service_metadata.update(services)
         elif os.path.exists(compose_path):
             try:
                 with open(compose_path) as f:
-                    compose = yaml.safe_load(f)
+                    compose = yaml.load(f, Loader=_yaml_loader())
                     for service_name, service_def in compose.get('services', {}).items():
                         self.service_metadata[service_name] = service_def
             except yaml.YAMLError as e:
@@ -145,27 +279,7 @@ class MicroservicesIngestion:
         Returns:
             Primary language of the service or None if not detected
         """
-        extension_map = {
-            '.py': 'python',
-            '.go': 'go',
-            '.cs': 'csharp',
-            '.java': 'java',
-            '.js': 'javascript',
-            '.ts': 'typescript'
-        }
-        
-        extensions = {}
-        for root, _, files in os.walk(service_path):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in extension_map:
-                    extensions[ext] = extensions.get(ext, 0) + 1
-        
-        if not extensions:
-            return None
-            
-        primary_ext = max(extensions.items(), key=lambda x: x[1])[0]
-        return extension_map[primary_ext]
+        return _primary_language(_scan_service(service_path)[1])
 
     def process_service(self, service_path: str, service_name: str) -> Dict[str, Any]:
         """
@@ -178,7 +292,9 @@ class MicroservicesIngestion:
         Returns:
             Dictionary with service data or None if processing failed
         """
-        language = self.detect_language(service_path)
+        # One walk yields both the files to parse and the counts detect_language uses
+        file_paths, extensions = _scan_service(service_path)
+        language = _primary_language(extensions)
         if not language:
             logger.warning(f"Could not detect language for service: {service_name}")
             return None
@@ -201,32 +317,27 @@ class MicroservicesIngestion:
                 "metadata": self.service_metadata[service_name]
             })
 
-        # Process each file in the service
-        for root, _, files in os.walk(service_path):
-            for file in files:
-                if file.endswith(('.py', '.go', '.cs', '.java', '.js', '.ts')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            parsed = self.parser.parse_file(file_path, content, language)
-                            if parsed:
-                                service_data["files"].append(parsed)
-                                
-                                # Merge relationships
-                                for rel_type, rels in parsed.get("relationships", {}).items():
-                                    if rels:
-                                        service_data["relationships"][rel_type].extend(rels)
-                                
-                    except Exception as e:
-                        logger.error(f"Error processing file {file_path}: {e}")
+        # Process each file in the service, as it is read ahead of the parser
+        for file_path, content in _iter_sources(file_paths):
+            if content is None:
+                continue
+            try:
+                parsed = self.parser.parse_file(file_path, content, language)
+                if parsed:
+                    service_data["files"].append(parsed)
+                    
+                    # Merge relationships
+                    for rel_type, rels in parsed.get("relationships", {}).items():
+                        if rels:
+                            service_data["relationships"][rel_type].extend(rels)
+                            
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {e}")
 
         return service_data
 
     def process_all_services(self):
         """Process all microservices in the repository."""
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
         # Check if src directory exists
         src_path = os.path.join(self.repo_path, "src")
         if not os.path.exists(src_path):
@@ -235,21 +346,19 @@ class MicroservicesIngestion:
             logger.info(f"Looking for microservices at repository root: {self.repo_path}")
             src_path = self.repo_path
 
-        # Create indices for better performance
-        self.loader.create_indices()
-
-        # Process each directory that looks like a service
-        with ThreadPoolExecutor() as executor:
+        # Process each directory that looks like a service. Parsing is CPU-bound, so services
+        # run in separate processes; loading stays here, where the Neo4j driver lives, and
+        # happens once for all services in UNWIND batches.
+        services = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
             future_to_service = {}
             for service_dir in os.listdir(src_path):
                 service_path = os.path.join(src_path, service_dir)
                 if os.path.isdir(service_path):
                     # Check if this looks like a service directory (contains code files)
-                    has_code_files = False
-                    for root, _, files in os.walk(service_path):
-                        if any(file.endswith(('.py', '.go', '.cs', '.java', '.js', '.ts')) for file in files):
-                            has_code_files = True
-                            break
+                    has_code_files = any(
+                        entry.name.endswith(CODE_SUFFIXES) for entry in _iter_file_names(service_path)
+                    )
                     
                     if has_code_files:
                         future = executor.submit(self.process_service, service_path, service_dir)
@@ -257,15 +366,22 @@ class MicroservicesIngestion:
                     else:
                         logger.debug(f"Skipping directory without code files: {service_dir}")
 
+            # Create indices for better performance, while the services parse
+            self.loader.create_indices()
+
             for future in as_completed(future_to_service):
                 service_name = future_to_service[future]
                 try:
                     service_data = future.result()
                     if service_data:
-                        self.loader.load_microservice_structure(service_data)
+                        services.append(service_data)
                         logger.info(f"Successfully processed service: {service_name}")
                 except Exception as e:
                     logger.error(f"Error processing service {service_name}: {e}")
+                    
+        if services:
+            self.loader.load_all(services)
+            logger.info(f"Loaded {len(services)} services")
 
     def close(self):
         """Clean up resources."""
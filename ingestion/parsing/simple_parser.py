@@ -96,7 +96,7 @@ class SimpleParser:
                     except Exception as e:
                         logger.warning(f"Error processing message {name} in {file_path}: {e}")
                 
-                logger.debug(f"Found {len(messages)} messages in {file_path}")
+                logger.debug("Found %d messages in %s", len(messages), file_path)
             except Exception as e:
                 logger.warning(f"Error extracting messages from {file_path}: {e}")
             
@@ -124,7 +124,7 @@ class SimpleParser:
                     except Exception as e:
                         logger.warning(f"Error processing service {name} in {file_path}: {e}")
                 
-                logger.debug(f"Found {len(services)} services in {file_path}")
+                logger.debug("Found %d services in %s", len(services), file_path)
             except Exception as e:
                 logger.warning(f"Error extracting services from {file_path}: {e}")
             
@@ -1,9 +1,9 @@
 # ingestion/parsing/tree_sitter_parser.py
 import logging
-import os # Ensure os is imported if needed later, though not directly here
+import os
 from tree_sitter import Language, Parser, Node
 from tree_sitter_languages import get_language, get_parser # Helper library
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
 
 from ingestion.parsing.queries import get_queries_for_language
 from ingestion.parsing.simple_parser import SimpleParser
@@ -13,6 +13,10 @@ logger = logging.getLogger(__name__)
 # Pre-load parsers to avoid reloading on each call
 PARSERS = {}
 LANGUAGES = {}
+# Compiled structure queries, keyed by (language_name, query_string)
+QUERIES = {}
+# SimpleParser instances for non-code formats, keyed by language
+SIMPLE_PARSERS = {}
 
 def _initialize_parser(language_name: str):
     """Initializes and caches the parser for a given language."""
@@ -35,6 +39,23 @@ def _initialize_parser(language_name: str):
             # Raise error to prevent proceeding without parser
             raise RuntimeError(f"Tree-sitter parser for {language_name} not available.") from e
 
+def _get_query(language_name: str, query_string: str):
+    """Compiles a structure query once per process and reuses it for every file."""
+    key = (language_name, query_string)
+    query = QUERIES.get(key)
+    if query is None:
+        query = LANGUAGES[language_name].query(query_string)
+        QUERIES[key] = query
+    return query
+
+def _get_simple_parser(language_name: str) -> SimpleParser:
+    """Returns the SimpleParser for a non-code format, creating it on first use."""
+    parser = SIMPLE_PARSERS.get(language_name)
+    if parser is None:
+        parser = SimpleParser(language_name)
+        SIMPLE_PARSERS[language_name] = parser
+    return parser
+
 # Initialize parsers for all supported languages
 _initialize_parser('python')
 _initialize_parser('go')
@@ -73,7 +94,7 @@ class TreeSitterParser:
         return None # Could not find identifier
 
     @staticmethod
-    def _generic_parse(language_name: str, file_path: str, content: str, structure_queries: Dict[str, str]) -> Dict[str, Any]:
+    def _generic_parse(language_name: str, file_path: str, content: Union[str, bytes], structure_queries: Dict[str, str]) -> Dict[str, Any]:
         """Generic parsing logic using tree-sitter queries."""
         parser = PARSERS.get(language_name)
         lang = LANGUAGES.get(language_name)
@@ -81,7 +102,8 @@ class TreeSitterParser:
             logger.error(f"{language_name.capitalize()} parser not initialized.")
             return {"path": file_path, "functions": [], "classes": [], "structs": [], "interfaces": [], "parse_error": True}
 
-        content_bytes = bytes(content, "utf8")
+        # Callers that read files as bytes skip a decode here and the re-encode below
+        content_bytes = content if isinstance(content, bytes) else content.encode("utf8")
         try:
             tree = parser.parse(content_bytes)
             root_node = tree.root_node
@@ -93,7 +115,7 @@ class TreeSitterParser:
 
         for structure_type, query_string in structure_queries.items():
             try:
-                query = lang.query(query_string)
+                query = _get_query(language_name, query_string)
                 captures = query.captures(root_node)
             except Exception as e:
                  logger.error(f"Failed to compile or run query for {language_name} {structure_type}: {e}")
@@ -121,8 +143,10 @@ class TreeSitterParser:
 
             results[structure_type].extend(items_by_node_id.values())
 
-        logger.debug(f"Parsed {file_path} ({language_name}): Found " +
-                     ", ".join(f"{len(v)} {k}" for k, v in results.items()))
+        # Building the per-type summary costs more than the call itself, so skip it unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsed %s (%s): Found %s", file_path, language_name,
+                         ", ".join(f"{len(v)} {k}" for k, v in results.items()))
 
         # Flatten results into the expected format (functions, classes, etc.)
         output = {"path": file_path, "parse_error": False}
@@ -320,14 +344,25 @@ class TreeSitterParser:
     # --- Main Dispatch Method ---
 
     @staticmethod
-    def parse_file(file_path: str, content: str, language: str) -> Optional[Dict[str, Any]]:
-        """Parse a file using the appropriate parser based on language."""
+    def parse_file(file_path: str, content: Union[str, bytes], language: str) -> Optional[Dict[str, Any]]:
+        """Parse a file (text, or raw UTF-8 bytes) using the appropriate parser based on language."""
+        result = TreeSitterParser._parse_by_language(file_path, content, language)
+        if result is not None:
+            # Computed once here so the loader reads them instead of re-scanning the path
+            result.setdefault("basename", os.path.basename(file_path))
+            result.setdefault("ext", os.path.splitext(file_path)[1].lower())
+        return result
+
+    @staticmethod
+    def _parse_by_language(file_path: str, content: Union[str, bytes], language: str) -> Optional[Dict[str, Any]]:
+        """Dispatch a file to the parser for its language."""
         try:
             # Handle special file formats with SimpleParser
             if language in ['markdown', 'protobuf', 'yaml', 'yml', 'json']:
-                logger.info(f"Using SimpleParser for {language} file: {file_path}")
-                simple_parser = SimpleParser(language)
-                return simple_parser.parse(file_path, content)
+                logger.debug("Using SimpleParser for %s file: %s", language, file_path)
+                if isinstance(content, bytes):
+                    content = content.decode('utf-8', errors='replace')
+                return _get_simple_parser(language).parse(file_path, content)
                 
             # Use language-specific parsers for code files
             if language == 'python':
@@ -1,19 +1,49 @@
 # ingestion/processing/embedding.py
 import logging
 import asyncio
-from openai import OpenAI, AsyncOpenAI # Use Async Client
-from typing import List, Dict, Any
+import importlib.util
+import random
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient # Use Async Client
+from typing import List, Dict, Any, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from app.core.config import settings
+from ingestion.cache import ASTCache, content_hash
 from ingestion.config import ingestion_settings
 
 logger = logging.getLogger(__name__)
 
+# Embedding requests in flight at once; the endpoint is latency-bound, so this scales
+# throughput roughly linearly until the account's rate limit
+EMBED_MAX_CONCURRENCY = 8
+# Upper bound of the random delay before each batch request, so the first wave of
+# concurrent requests does not hit the rate limiter in the same instant
+EMBED_START_JITTER_SEC = 0.05
+
+# One pooled connection set shared by every embedding request; with the h2 package
+# installed, concurrent batches are multiplexed over HTTP/2 instead of each one
+# holding its own HTTP/1.1 connection
+_http_client = DefaultAsyncHttpxClient(
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+)
+
 # Initialize Async OpenAI client
-aclient = AsyncOpenAI(api_key=settings.openai_api_key)
+aclient = AsyncOpenAI(api_key=settings.openai_api_key, http_client=_http_client)
+
+_backoff = wait_random_exponential(min=1, max=60)
+
+def _wait_retry_after(retry_state) -> float:
+    """Wait as long as a 429's Retry-After header asks (plus jitter), else back off exponentially."""
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(retry_after) + random.uniform(0, 1)
+    except (TypeError, ValueError):
+        return _backoff(retry_state)
 
-@retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+@retry(wait=_wait_retry_after, stop=stop_after_attempt(6))
 async def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
     """Generates embeddings for a batch of texts using OpenAI API."""
     if not texts:
@@ -32,6 +62,27 @@ async def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
         # The retry decorator will handle retries
         raise # Re-raise exception to trigger retry
 
+async def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Generates embeddings for a list of texts using the bulk embeddings endpoint.
+    
+    Texts are sent in requests of up to `embedding_batch_size` inputs each, so one
+    HTTP round-trip covers a whole batch instead of a single text.
+    
+    Args:
+        texts (List[str]): The texts to generate embeddings for
+        
+    Returns:
+        List[List[float]]: One embedding vector per input text, in order
+    """
+    if not texts:
+        return []
+        
+    batch_size = ingestion_settings.embedding_batch_size
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*[generate_embeddings_batch(batch) for batch in batches])
+    return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
 @retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(3))
 async def generate_embedding(text: str) -> List[float]:
     """
@@ -61,65 +112,104 @@ async def generate_embedding(text: str) -> List[float]:
         # The retry decorator will handle retries
         raise
 
-async def embed_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def warm_up_client() -> None:
     """
-    Adds vector embeddings to each chunk dictionary using batch processing.
+    Open the client's HTTPS connection ahead of the first embedding request.
+    
+    Fetches the embedding model's metadata (a free call), so DNS and the TLS handshake
+    are paid while other startup work is still running. Failures are only logged;
+    the first real request will surface any actual problem.
     """
-    logger.info(f"Starting embedding generation for {len(chunks)} chunks...")
-    chunks_with_embeddings = []
-    batch_size = ingestion_settings.embedding_batch_size
-    delay_between_batches_sec = 1.0
+    try:
+        await aclient.models.retrieve(settings.openai_embedding_model)
+    except Exception as e:
+        logger.debug(f"OpenAI client warm-up failed: {e}")
 
-    tasks = []
-    text_batches = []
+def split_cached_embeddings(chunks: List[Dict[str, Any]],
+                            cache: Optional[ASTCache]) -> Tuple[List[Dict[str, Any]], Dict[bytes, List[Dict[str, Any]]]]:
+    """
+    Group chunks by content hash and attach cached embeddings to the groups that have one.
+    
+    Boilerplate such as license headers and import blocks repeats across files, so
+    each distinct text only needs to be embedded once.
+    
+    Returns:
+        Tuple of (chunks embedded from the cache, chunks still to embed grouped by content hash)
+    """
+    pending: Dict[bytes, List[Dict[str, Any]]] = {}
+    for chunk in chunks:
+        pending.setdefault(content_hash(chunk['content']), []).append(chunk)
+        
+    cached = []
+    if cache is not None:
+        hits = cache.get_embeddings(list(pending), settings.openai_embedding_model)
+        for sha, embedding in hits.items():
+            if len(embedding) == settings.embedding_dimensions:
+                group = pending.pop(sha)
+                for chunk in group:
+                    chunk['embedding'] = embedding
+                cached.extend(group)
+    logger.info(f"Reusing {len(cached)} cached embeddings; {len(pending)} distinct texts left to embed")
+    return cached, pending
+
+def attach_embedding(sha: bytes, chunks: List[Dict[str, Any]], embedding: List[float],
+                     cache: Optional[ASTCache] = None) -> List[Dict[str, Any]]:
+    """Set the embedding of a group of identical chunks (and cache it) if it has the configured dimension."""
+    # Ensure embedding dimension matches config (optional check)
+    if len(embedding) != settings.embedding_dimensions:
+        logger.warning(f"Embedding dimension mismatch for chunk {chunks[0]['chunk_id']} (Expected {settings.embedding_dimensions}, Got {len(embedding)}). Skipping {len(chunks)} chunk(s).")
+        return []
+        
+    for chunk in chunks:
+        chunk['embedding'] = embedding
+    if cache is not None:
+        cache.put_embedding(sha, settings.openai_embedding_model, embedding)
+    return chunks
+
+async def embed_chunks(chunks: List[Dict[str, Any]], cache: Optional[ASTCache] = None,
+                       max_concurrency: int = EMBED_MAX_CONCURRENCY,
+                       batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Adds vector embeddings to each chunk dictionary using batch processing.
+    
+    Chunks are split into requests of `batch_size` texts (default:
+    `embedding_batch_size`) with up to `max_concurrency` requests in flight.
+    
+    Chunks with identical content are sent once and share the resulting vector. If a
+    cache is given, texts embedded before with the same model reuse the stored vector
+    and only the rest are sent to the API.
+    """
+    total_count = len(chunks)
+    chunks_with_embeddings, pending = split_cached_embeddings(chunks, cache)
+    shas = list(pending)
+        
+    logger.info(f"Starting embedding generation for {len(shas)} distinct chunk texts...")
+    batch_size = batch_size or ingestion_settings.embedding_batch_size
+    batches = [shas[i:i + batch_size] for i in range(0, len(shas), batch_size)]
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    for i in range(0, len(chunks), batch_size):
-        batch_chunks = chunks[i:i + batch_size]
-        batch_texts = [chunk['content'] for chunk in batch_chunks]
-        if batch_texts:
-            text_batches.append(batch_texts)
-            tasks.append(generate_embeddings_batch(batch_texts))
-            logger.debug(f"Waiting {delay_between_batches_sec}s before launching next batch...")
-            await asyncio.sleep(delay_between_batches_sec) # Introduce delay
+    async def _embed_batch(batch_shas: List[bytes]) -> List[List[float]]:
+        await asyncio.sleep(random.random() * EMBED_START_JITTER_SEC)
+        async with semaphore:
+            return await generate_embeddings_batch([pending[sha][0]['content'] for sha in batch_shas])
 
-    # Run all batch embedding tasks concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # gather returns results in batch order, so each result lines up with its chunks
+    results = await asyncio.gather(*[_embed_batch(batch) for batch in batches], return_exceptions=True)
 
     # Process results and combine with original chunks
-    current_chunk_index = 0
-    for i, result in enumerate(results):
-        batch_texts = text_batches[i] # Get corresponding texts for context if error occurs
+    for batch_shas, result in zip(batches, results):
         if isinstance(result, Exception):
-            logger.error(f"Failed to generate embeddings for a batch (size {len(batch_texts)}): {result}. Skipping batch.")
-            # Skip the chunks from this failed batch
-            current_chunk_index += len(batch_texts)
+            logger.error(f"Failed to generate embeddings for a batch (size {len(batch_shas)}): {result}. Skipping batch.")
+            continue
+        elif len(result) != len(batch_shas):
+            logger.error(f"Mismatch in embedding results count for a batch (Expected {len(batch_shas)}, Got {len(result)}). Skipping batch.")
             continue
-        elif len(result) != len(batch_texts):
-             logger.error(f"Mismatch in embedding results count for a batch (Expected {len(batch_texts)}, Got {len(result)}). Skipping batch.")
-             current_chunk_index += len(batch_texts)
-             continue
-
-
-        embeddings = result
-        for j, embedding in enumerate(embeddings):
-            chunk_index = current_chunk_index + j
-            if chunk_index < len(chunks):
-                # Ensure embedding dimension matches config (optional check)
-                if len(embedding) != settings.embedding_dimensions:
-                     logger.warning(f"Embedding dimension mismatch for chunk {chunks[chunk_index]['chunk_id']} (Expected {settings.embedding_dimensions}, Got {len(embedding)}). Skipping chunk.")
-                     continue
-
-                chunks[chunk_index]['embedding'] = embedding
-                chunks_with_embeddings.append(chunks[chunk_index])
-            else:
-                 logger.error("Index out of bounds when matching embeddings to chunks. Check batching logic.")
-
-
-        current_chunk_index += len(batch_texts) # Move index forward by processed batch size
 
+        for sha, embedding in zip(batch_shas, result):
+            chunks_with_embeddings.extend(attach_embedding(sha, pending[sha], embedding, cache))
 
     successful_count = len(chunks_with_embeddings)
-    failed_count = len(chunks) - successful_count
+    failed_count = total_count - successful_count
     logger.info(f"Embedding generation complete. Successfully embedded: {successful_count}, Failed/Skipped: {failed_count}")
 
-    return chunks_with_embeddings
\ No newline at end of file
+    return chunks_with_embeddings
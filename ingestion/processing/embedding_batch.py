@@ -0,0 +1,117 @@
+# ingestion/processing/embedding_batch.py
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from typing import List, Dict, Any, Optional
+
+from app.core.config import settings
+from ingestion.cache import ASTCache
+from ingestion.processing.embedding import aclient, attach_embedding, embed_chunks, split_cached_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Requests allowed in a single Batch API input file
+BATCH_MAX_REQUESTS = 50000
+# Seconds between job status checks
+BATCH_POLL_INTERVAL_SEC = 60
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+async def embed_chunks_batch(chunks: List[Dict[str, Any]], cache: Optional[ASTCache] = None,
+                             poll_interval_sec: float = BATCH_POLL_INTERVAL_SEC) -> List[Dict[str, Any]]:
+    """
+    Adds vector embeddings to each chunk dictionary using the OpenAI Batch API.
+
+    Batch jobs cost about half as much as online requests but may take up to 24h,
+    so this suits full reindexes where latency does not matter. Chunks whose job
+    fails or whose result is missing are embedded with the online API instead.
+    """
+    total_count = len(chunks)
+    chunks_with_embeddings, pending = split_cached_embeddings(chunks, cache)
+    shas = list(pending)
+    logger.info(f"Starting batch embedding job(s) for {len(shas)} distinct chunk texts...")
+
+    jobs = [shas[i:i + BATCH_MAX_REQUESTS] for i in range(0, len(shas), BATCH_MAX_REQUESTS)]
+    results = await asyncio.gather(
+        *[_run_batch_job([pending[sha][0]['content'] for sha in job_shas], poll_interval_sec) for job_shas in jobs],
+        return_exceptions=True
+    )
+
+    unembedded = []
+    for job_shas, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            logger.error(f"Batch embedding job (size {len(job_shas)}) failed: {result}")
+            for sha in job_shas:
+                unembedded.extend(pending[sha])
+            continue
+
+        for i, sha in enumerate(job_shas):
+            embedding = result.get(f"c{i}")
+            if embedding is None:
+                unembedded.extend(pending[sha])
+            else:
+                chunks_with_embeddings.extend(attach_embedding(sha, pending[sha], embedding, cache))
+
+    if unembedded:
+        logger.warning(f"Falling back to online embedding for {len(unembedded)} chunks")
+        chunks_with_embeddings.extend(await embed_chunks(unembedded, cache=cache))
+
+    successful_count = len(chunks_with_embeddings)
+    logger.info(f"Batch embedding complete. Successfully embedded: {successful_count}, Failed/Skipped: {total_count - successful_count}")
+
+    return chunks_with_embeddings
+
+async def _run_batch_job(texts: List[str], poll_interval_sec: float) -> Dict[str, List[float]]:
+    """
+    Run one Batch API job over the texts and return the embeddings by custom_id.
+
+    Raises:
+        RuntimeError: If the job does not complete
+    """
+    # Write one /v1/embeddings request per text, tagged with its position in the job
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+        input_path = f.name
+        for i, text in enumerate(texts):
+            f.write(json.dumps({
+                "custom_id": f"c{i}",
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {"model": settings.openai_embedding_model, "input": text}
+            }) + "\n")
+
+    try:
+        with open(input_path, 'rb') as f:
+            input_file = await aclient.files.create(file=f, purpose="batch")
+    finally:
+        os.remove(input_path)
+
+    batch = await aclient.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/embeddings",
+        completion_window="24h"
+    )
+    logger.info(f"Created batch embedding job {batch.id} for {len(texts)} texts")
+
+    while batch.status not in BATCH_TERMINAL_STATUSES:
+        await asyncio.sleep(poll_interval_sec)
+        batch = await aclient.batches.retrieve(batch.id)
+        logger.debug(f"Batch embedding job {batch.id} status: {batch.status}")
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch embedding job {batch.id} ended with status {batch.status}")
+
+    # Stream the results rather than holding the whole output file in memory
+    embeddings = {}
+    async with aclient.files.with_streaming_response.content(batch.output_file_id) as response:
+        async for line in response.iter_lines():
+            if not line:
+                continue
+            record = json.loads(line)
+            result = record.get("response") or {}
+            if result.get("status_code") != 200:
+                logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error') or result}")
+                continue
+            embeddings[record["custom_id"]] = result["body"]["data"][0]["embedding"]
+
+    return embeddings
@@ -1,16 +1,37 @@
 # ingestion/sources/git_loader.py
+import asyncio
 import os
 import shutil
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from git import Repo, GitCommandError, InvalidGitRepositoryError
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Tuple, Optional
 
 import git
 from ingestion.config import ingestion_settings
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of file reads in flight at once
+MAX_CONCURRENT_READS = 64
+
+# Last path segment of a repository URL, without a trailing ".git" or slashes
+REPO_NAME_RE = re.compile(r'([^/]+?)(?:\.git)?/*$')
+
+@lru_cache(maxsize=512)
+def repo_name_from_url(repo_url: str) -> str:
+    """
+    Get a repository's name (e.g. "langchain" for ".../langchain.git") from its URL.
+    
+    Only a literal ".git" suffix is removed; rstrip('.git') would also eat trailing
+    '.', 'g', 'i' and 't' characters of the name itself.
+    """
+    match = REPO_NAME_RE.search(repo_url)
+    return match.group(1) if match else ""
+
 class GitLoader:
     """
     Git repository loader for cloning and extracting repository content.
@@ -76,14 +97,17 @@ class GitLoader:
                         logger.info(f"Switching from {current_branch} to {self.branch}")
                         self.repo.git.checkout(self.branch)
                 # Pull the latest changes
-                self.repo.git.pull()
+                self.repo.git.pull(jobs=ingestion_settings.clone_concurrency)
             else:
-                # Clone the repository
+                # Clone the repository. The blob filter makes this a partial clone: commits
+                # and trees arrive up front, filtered blobs are fetched on demand.
                 logger.info(f"Cloning repository {self.repo_url} to {self.clone_dir}...")
+                clone_options = {"jobs": ingestion_settings.clone_concurrency}
+                if ingestion_settings.clone_filter:
+                    clone_options["filter"] = ingestion_settings.clone_filter
                 if self.branch:
-                    self.repo = git.Repo.clone_from(self.repo_url, self.clone_dir, branch=self.branch)
-                else:
-                    self.repo = git.Repo.clone_from(self.repo_url, self.clone_dir)
+                    clone_options["branch"] = self.branch
+                self.repo = git.Repo.clone_from(self.repo_url, self.clone_dir, **clone_options)
 
             # Get the commit SHA
             commit_sha = self.repo.head.commit.hexsha
@@ -98,15 +122,186 @@ class GitLoader:
             logger.error(f"Error in get_repo_and_commit: {e}")
             raise
 
-    def get_files_content(self, target_extensions: List[str]) -> List[Tuple[str, str]]:
-        """Gets the content of files matching target extensions."""
+    def get_files_content(
+        self, target_extensions: List[str], paths: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """Gets the content of files matching target extensions (only `paths`, if given)."""
+        return list(self.iter_files_content(target_extensions, paths=paths))
+
+    def get_classified_files(
+        self, target_extensions: List[str], language_by_extension: Dict[str, str],
+        paths: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, str, Optional[str]]]:
+        """Gets (rel_path, content, language) for files matching target extensions."""
+        return list(self.iter_classified_files(target_extensions, language_by_extension, paths=paths))
+
+    def iter_classified_files(
+        self, target_extensions: List[str], language_by_extension: Dict[str, str],
+        paths: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Lazily yields (rel_path, content, language) for files matching target extensions.
+
+        The language is looked up once here from the path's extension (None if it is
+        not in language_by_extension), so callers need no second classification pass.
+        """
+        for rel_path, content in self.iter_files_content(target_extensions, paths=paths):
+            dot = rel_path.rfind('.')
+            language = None
+            if dot > rel_path.rfind(os.sep) + 1:
+                language = language_by_extension.get(rel_path[dot:].lower())
+            yield rel_path, content, language
+
+    def iter_files_content(
+        self, target_extensions: List[str], paths: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Lazily yields (rel_path, content) for files matching target extensions.
+
+        Files are read ahead on a thread pool, MAX_CONCURRENT_READS at a time, so
+        reads overlap each other while only that window (plus whatever the caller
+        keeps) is held in memory. If `paths` is given, only those repository-relative
+        paths are considered.
+        """
+        files_found = 0
+        target_paths = self._iter_target_paths(target_extensions, paths)
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_READS) as readers:
+            while True:
+                window = list(islice(target_paths, MAX_CONCURRENT_READS))
+                if not window:
+                    break
+                    
+                contents = readers.map(lambda p: self._read_file(p[1], p[0]), window)
+                for (rel_path, _), content in zip(window, contents):
+                    if content is None:
+                        continue
+                        
+                    files_found += 1
+                    
+                    # Log found files
+                    if files_found % 50 == 0:
+                        logger.info(f"Found {files_found} files so far...")
+                        
+                    yield rel_path, content
+        
+        logger.info(f"Found {files_found} files with target extensions: {target_extensions}")
+
+    async def aget_files_content(self, target_extensions: List[str]) -> List[Tuple[str, str]]:
+        """Gets the content of files matching target extensions, reading them concurrently."""
+        files_content = []
+        async for batch in self.aiter_files_content(target_extensions):
+            files_content.extend(batch)
+        return files_content
+
+    async def aiter_files_content(
+        self, target_extensions: List[str], batch_size: int = 1024, paths: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[List[Tuple[str, str]]]:
+        """
+        Yields batches of (rel_path, content) for files matching target extensions.
+
+        The files in a batch are read concurrently on worker threads, with at most
+        MAX_CONCURRENT_READS reads in flight, so many small files are not read one
+        seek at a time. If paths is given, only those repository-relative paths are
+        considered instead of walking the whole tree.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def read(rel_path: str, file_path: str) -> Optional[Tuple[str, str]]:
+            async with semaphore:
+                content = await asyncio.to_thread(self._read_file, file_path, rel_path)
+            return None if content is None else (rel_path, content)
+
+        files_found = 0
+        target_paths = self._iter_target_paths(target_extensions, paths)
+        while True:
+            # Walking the tree is cheap next to reading it, so it stays inline
+            batch_paths = list(islice(target_paths, batch_size))
+            if not batch_paths:
+                break
+                
+            results = await asyncio.gather(*(read(rel_path, file_path) for rel_path, file_path in batch_paths))
+            batch = [result for result in results if result is not None]
+            files_found += len(batch)
+            logger.info(f"Found {files_found} files so far...")
+            
+            if batch:
+                yield batch
+        
+        logger.info(f"Found {files_found} files with target extensions: {target_extensions}")
+
+    @staticmethod
+    def _read_file(file_path: str, rel_path: str) -> Optional[str]:
+        """Read a file in a single shot, returning None if it cannot be read."""
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read().decode('utf-8', errors='replace')
+        except Exception as e:
+            logger.warning(f"Error reading file {rel_path}: {e}")
+            return None
+
+    def get_changed_files(self, from_sha: str, to_sha: str) -> Optional[Tuple[List[str], List[str], List[str]]]:
+        """
+        List the files changed between two commits.
+
+        Renamed files count as a deletion of the old path and an addition of the new one.
+
+        Returns:
+            Tuple of (added, modified, deleted) repository-relative paths, or None if
+            the diff cannot be computed (e.g. from_sha is no longer in the history)
+        """
+        if not self.repo:
+            raise ValueError("Repository not initialized. Call get_repo_and_commit first.")
+
+        try:
+            # -z keeps paths verbatim; without it, non-ASCII characters, quotes and tabs
+            # come back C-quoted and would never match a File path
+            fields = self.repo.git.diff('--name-status', '-z', from_sha, to_sha).split('\0')
+        except git.GitCommandError as e:
+            logger.warning(f"Could not diff {from_sha}..{to_sha}: {e}")
+            return None
+
+        added, modified, deleted = [], [], []
+        # Records are "status\0path\0", or "status\0old path\0new path\0" for renames and copies
+        fields = iter(fields)
+        for status in fields:
+            if not status:
+                continue
+            status = status[:1]
+            if status in ('R', 'C'):
+                old_path, new_path = next(fields, ''), next(fields, '')
+                if not new_path:
+                    continue
+                if status == 'R':
+                    deleted.append(old_path)
+                added.append(new_path)
+                continue
+            path = next(fields, '')
+            if not path:
+                continue
+            if status == 'A':
+                added.append(path)
+            elif status == 'D':
+                deleted.append(path)
+            else:
+                # M (modified), T (type changed) and anything unexpected are re-ingested
+                modified.append(path)
+
+        logger.info(f"Changes {from_sha[:8]}..{to_sha[:8]}: {len(added)} added, {len(modified)} modified, {len(deleted)} deleted")
+        return added, modified, deleted
+
+    def _iter_target_paths(
+        self, target_extensions: List[str], paths: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yields (rel_path, file_path) for files matching target extensions that are not gitignored.
+
+        Walks the whole repository unless paths restricts it to the given relative paths.
+        """
         if not self.repo:
             raise ValueError("Repository not initialized. Call get_repo_and_commit first.")
 
         # Print target extensions for debugging
         logger.info(f"Looking for files with these extensions: {target_extensions}")
-
-        files_content = []
         
         # Parse .gitignore if it exists
         ignored_patterns = []
@@ -130,38 +325,36 @@ class GitLoader:
                     return True
             return False
         
+        # str.endswith checks every extension in one call
+        extensions = tuple(target_extensions)
+        
         # Walk through the repository directory
+        for file_path in self._walk_files() if paths is None else self._existing_files(paths):
+            # Check if file has a target extension
+            if file_path.endswith(extensions):
+                # Get relative path from clone directory
+                rel_path = os.path.relpath(file_path, self.clone_dir)
+                    
+                # Skip if file matches a gitignore pattern
+                if should_ignore(rel_path):
+                    logger.debug("Skipping ignored file: %s", rel_path)
+                    continue
+                    
+                yield rel_path, file_path
+
+    def _walk_files(self) -> Iterator[str]:
+        """Yields the absolute path of every file in the clone outside .git."""
         for root, _, files in os.walk(self.clone_dir):
             # Skip .git directory
             if '.git' in root:
                 continue
                 
             for file in files:
-                # Check if file has a target extension
-                if any(file.endswith(ext) for ext in target_extensions):
-                    file_path = os.path.join(root, file)
-                    
-                    # Get relative path from clone directory
-                    rel_path = os.path.relpath(file_path, self.clone_dir)
-                        
-                    # Skip if file matches a gitignore pattern
-                    if should_ignore(rel_path):
-                        logger.debug(f"Skipping ignored file: {rel_path}")
-                        continue
-                            
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                            content = f.read()
-                            
-                            # Add to files_content list
-                            files_content.append((rel_path, content))
-                            
-                            # Log found files
-                            if len(files_content) % 50 == 0:
-                                logger.info(f"Found {len(files_content)} files so far...")
-                                
-                    except Exception as e:
-                        logger.warning(f"Error reading file {rel_path}: {e}")
-        
-        logger.info(f"Found {len(files_content)} files with target extensions: {target_extensions}")
-        return files_content
\ No newline at end of file
+                yield os.path.join(root, file)
+
+    def _existing_files(self, paths: Iterable[str]) -> Iterator[str]:
+        """Yields the absolute path of each repository-relative path that exists as a file."""
+        for path in paths:
+            file_path = os.path.join(self.clone_dir, path)
+            if os.path.isfile(file_path):
+                yield file_path
\ No newline at end of file
@@ -25,14 +25,20 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Use the libuv event loop for asyncio.run() when available (faster Bolt/HTTP I/O)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 async def test_neo4j_connection() -> bool:
     """Test connection to Neo4j database"""
     try:
         from app.db.neo4j_manager import db_manager
         
-        await db_manager.connect()
-        logger.info("Successfully connected to Neo4j")
-        await db_manager.close()
+        async with db_manager:
+            logger.info("Successfully connected to Neo4j")
         return True
     except Exception as e:
         logger.error(f"Failed to connect to Neo4j: {e}")
@@ -54,27 +60,25 @@ async def clear_repository_data(repo_url: str) -> bool:
         logger.info(f"Clearing data for repository: {repo_url}")
         
         # Connect to Neo4j database
-        await db_manager.connect()
-        
-        # Delete all nodes and relationships related to this repository
-        await db_manager.run_query(
-            """
-            MATCH (n)
-            WHERE n.repo_url = $repo_url OR n.url = $repo_url
-            DETACH DELETE n
-            """,
-            {"repo_url": repo_url}
-        )
+        async with db_manager:
+            # Delete all nodes and relationships related to this repository
+            await db_manager.run_query(
+                """
+                MATCH (n)
+                WHERE n.repo_url = $repo_url OR n.url = $repo_url
+                DETACH DELETE n
+                """,
+                {"repo_url": repo_url}
+            )
         
         logger.info(f"Successfully cleared data for repository: {repo_url}")
-        await db_manager.close()
         return True
     except Exception as e:
         logger.error(f"Failed to clear repository data: {e}")
         return False
 
 async def run_ingestion(repo_url: str, description: Optional[str] = None, 
-                       clear: bool = False, force_reindex: bool = False) -> bool:
+                       clear: bool = False, force_reindex: bool = False, batch_mode: bool = False) -> bool:
     """
     Run the main ingestion process
     
@@ -83,6 +87,7 @@ async def run_ingestion(repo_url: str, description: Optional[str] = None,
         description: Optional description of the repository
         clear: Whether to clear existing repository data before ingestion
         force_reindex: Whether to force reindexing of the repository even if it exists
+        batch_mode: Whether to embed through the OpenAI Batch API (cheaper, up to 24h)
         
     Returns:
         bool: True if successful, False otherwise
@@ -109,43 +114,47 @@ async def run_ingestion(repo_url: str, description: Optional[str] = None,
         
         # Check if the repository has already been indexed
         from app.db.neo4j_manager import db_manager
-        existing_commit = await db_manager.get_repository_status(repo_url)
-        logger.info(f"Repository status: {'Already indexed' if existing_commit else 'Not indexed'}")
+        
+        # One connection for the whole run, closed when the block exits on any path
+        async with db_manager:
+            existing_commit = await db_manager.get_repository_status(repo_url)
+            logger.info(f"Repository status: {'Already indexed' if existing_commit else 'Not indexed'}")
             
-        # Only proceed with ingestion if no data exists for this repo or force reindex is set
-        if force_reindex or not existing_commit:
-            # Perform the main ingestion
-            logger.info("Starting main ingestion process")
-            try:
-                await knowledge_system.ingest_repository({
-                    "url": repo_url,
-                    "description": description or f"Repository {repo_url}"
-                })
-            except Exception as e:
-                logger.error(f"An error occurred during ingestion: {e}")
-                return False
+            # Only proceed with ingestion if no data exists for this repo or force reindex is set
+            if force_reindex or not existing_commit:
+                # Perform the main ingestion
+                logger.info("Starting main ingestion process")
+                try:
+                    await knowledge_system.ingest_repository({
+                        "url": repo_url,
+                        "description": description or f"Repository {repo_url}",
+                        "batch_mode": batch_mode
+                    })
+                except Exception as e:
+                    logger.error(f"An error occurred during ingestion: {e}")
+                    return False
             
-            # Fix relationships
-            logger.info("Fixing relationships between nodes")
-            try:
-                await fix_relationships(repo_url)
-            except Exception as e:
-                logger.error(f"An error occurred while fixing relationships: {e}")
-                # Continue execution even if relationship fixing fails
+                # Fix relationships
+                logger.info("Fixing relationships between nodes")
+                try:
+                    await fix_relationships(repo_url)
+                except Exception as e:
+                    logger.error(f"An error occurred while fixing relationships: {e}")
+                    # Continue execution even if relationship fixing fails
             
-            # Fix ontology structure (Class and Function connections)
-            logger.info("Fixing ontology structure (connecting Classes and Functions)")
-            try:
-                await fix_class_connections(repo_url)
-                await fix_function_connections(repo_url)
-            except Exception as e:
-                logger.error(f"An error occurred while fixing ontology structure: {e}")
-                # Continue execution even if ontology fixing fails
+                # Fix ontology structure (Class and Function connections)
+                logger.info("Fixing ontology structure (connecting Classes and Functions)")
+                try:
+                    await fix_class_connections(repo_url)
+                    await fix_function_connections(repo_url)
+                except Exception as e:
+                    logger.error(f"An error occurred while fixing ontology structure: {e}")
+                    # Continue execution even if ontology fixing fails
             
-            logger.info("Ingestion completed successfully")
-        else:
-            logger.info(f"Repository already indexed with commit hash: {existing_commit}")
-            logger.info("Use --force-reindex to reindex anyway")
+                logger.info("Ingestion completed successfully")
+            else:
+                logger.info(f"Repository already indexed with commit hash: {existing_commit}")
+                logger.info("Use --force-reindex to reindex anyway")
         
         return True
     except Exception as e:
@@ -217,6 +226,7 @@ def main():
     parser.add_argument("--description", help="Description of the repository")
     parser.add_argument("--clear", action="store_true", help="Clear existing repository data before ingestion")
     parser.add_argument("--force-reindex", action="store_true", help="Force reindexing of the repository even if it exists")
+    parser.add_argument("--batch-mode", action="store_true", help="Embed through the OpenAI Batch API (about half the cost, may take up to 24h)")
     parser.add_argument("--test-connection", action="store_true", help="Test connection to Neo4j database and exit")
     parser.add_argument("--save-credentials", action="store_true", help="Save Neo4j credentials to .env file")
     
@@ -251,7 +261,8 @@ def main():
         args.repo_url,
         args.description,
         args.clear,
-        args.force_reindex
+        args.force_reindex,
+        args.batch_mode
     ))
     
     sys.exit(0 if success else 1)
@@ -0,0 +1,75 @@
+"""
+Tests for the persistent parse and embedding cache (ingestion.cache.ASTCache).
+"""
+from app.core.config import settings
+from ingestion.cache import ASTCache, content_hash
+from ingestion.processing.embedding import split_cached_embeddings
+
+
+def test_parse_result_round_trip(tmp_path):
+    """Results survive closing and reopening the cache, keyed by path, content and parser."""
+    path = str(tmp_path / "cache.db")
+    sha = content_hash("def main():\n    pass\n")
+    result = {"path": "src/main.py", "functions": [{"name": "main", "start_line": 1}], "classes": []}
+
+    with ASTCache(path=path) as cache:
+        cache.put("src/main.py", sha, result, parser="tree_sitter")
+
+    with ASTCache(path=path) as cache:
+        assert cache.get("src/main.py", sha, parser="tree_sitter") == result
+        # Changed content, another file or another parser all miss
+        assert cache.get("src/main.py", content_hash("changed"), parser="tree_sitter") is None
+        assert cache.get("src/other.py", sha, parser="tree_sitter") is None
+        assert cache.get("src/main.py", sha, parser="enhanced") is None
+
+
+def test_embedding_round_trip(tmp_path):
+    """Embeddings are stored as float32 and the first write for a text wins."""
+    path = str(tmp_path / "cache.db")
+    hello, other = content_hash("hello"), content_hash("other")
+
+    with ASTCache(path=path) as cache:
+        cache.put_embedding(hello, "model-a", [0.5, -0.25, 1.0])
+        cache.put_embedding(hello, "model-a", [9.0, 9.0, 9.0])
+
+    with ASTCache(path=path) as cache:
+        assert cache.get_embedding(hello, "model-a") == [0.5, -0.25, 1.0]
+        assert cache.get_embedding(hello, "model-b") is None
+        assert cache.get_embeddings([hello, other], "model-a") == {hello: [0.5, -0.25, 1.0]}
+
+
+def test_eviction_keeps_cache_under_cap(tmp_path):
+    """Closing a cache that outgrew its cap evicts entries; one under the cap keeps them."""
+    path = str(tmp_path / "cache.db")
+    payload = {"content": "x" * 4096}
+
+    with ASTCache(path=path) as cache:
+        for i in range(50):
+            cache.put(f"src/f{i}.py", content_hash(str(i)), payload)
+
+    with ASTCache(path=path) as cache:
+        assert cache.get("src/f0.py", content_hash("0")) == payload
+        cache.max_bytes = 1
+
+    with ASTCache(path=path) as cache:
+        assert all(cache.get(f"src/f{i}.py", content_hash(str(i))) is None for i in range(50))
+
+
+def test_split_cached_embeddings_reuses_vectors(tmp_path):
+    """Cached texts are embedded from the cache; the rest are grouped by content for one request each."""
+    vector = [0.5] * settings.embedding_dimensions
+    chunks = [
+        {"chunk_id": "a", "content": "license header"},
+        {"chunk_id": "b", "content": "license header"},
+        {"chunk_id": "c", "content": "def f(): pass"},
+        {"chunk_id": "d", "content": "def f(): pass"},
+    ]
+
+    with ASTCache(path=str(tmp_path / "cache.db")) as cache:
+        cache.put_embedding(content_hash("license header"), settings.openai_embedding_model, vector)
+        cached, pending = split_cached_embeddings(chunks, cache)
+
+    assert [chunk["chunk_id"] for chunk in cached] == ["a", "b"]
+    assert all(chunk["embedding"] == vector for chunk in cached)
+    assert list(pending) == [content_hash("def f(): pass")]
+    assert [chunk["chunk_id"] for chunk in pending[content_hash("def f(): pass")]] == ["c", "d"]
@@ -0,0 +1,117 @@
+"""
+Tests for the incremental-ingestion helpers of GitLoader: `git diff --name-status -z`
+parsing in get_changed_files and repository names from URLs.
+"""
+from types import SimpleNamespace
+
+import git
+import pytest
+
+from ingestion.sources.git_loader import GitLoader, repo_name_from_url
+
+
+def name_status(*records):
+    """Render `git diff --name-status -z` output: every field NUL-terminated."""
+    return "".join(field + "\0" for record in records for field in record)
+
+
+class FakeGit:
+    """Stands in for Repo.git, returning canned `git diff` output."""
+
+    def __init__(self, output="", error=None):
+        self.output = output
+        self.error = error
+        self.calls = []
+
+    def diff(self, *args):
+        self.calls.append(args)
+        if self.error:
+            raise self.error
+        return self.output
+
+
+def make_loader(tmp_path, fake_git):
+    loader = GitLoader("https://github.com/org/repo.git", clone_dir=str(tmp_path))
+    loader.repo = SimpleNamespace(git=fake_git)
+    return loader
+
+
+def test_changed_files_by_status(tmp_path):
+    """Added, modified, type-changed and deleted paths land in the right lists."""
+    fake_git = FakeGit(name_status(
+        ("A", "src/new.py"),
+        ("M", "src/changed.py"),
+        ("T", "src/now_a_symlink.py"),
+        ("D", "src/removed.py"),
+    ))
+    loader = make_loader(tmp_path, fake_git)
+
+    added, modified, deleted = loader.get_changed_files("a" * 40, "b" * 40)
+
+    assert added == ["src/new.py"]
+    assert modified == ["src/changed.py", "src/now_a_symlink.py"]
+    assert deleted == ["src/removed.py"]
+    assert fake_git.calls == [("--name-status", "-z", "a" * 40, "b" * 40)]
+
+
+def test_changed_files_renames_and_copies(tmp_path):
+    """A rename deletes the old path and adds the new one; a copy only adds."""
+    loader = make_loader(tmp_path, FakeGit(name_status(
+        ("R097", "src/old_name.py", "src/new_name.py"),
+        ("C100", "src/template.py", "src/copy.py"),
+        ("M", "src/after_copy.py"),
+    )))
+
+    added, modified, deleted = loader.get_changed_files("a" * 40, "b" * 40)
+
+    assert added == ["src/new_name.py", "src/copy.py"]
+    assert modified == ["src/after_copy.py"]
+    assert deleted == ["src/old_name.py"]
+
+
+def test_changed_files_keeps_paths_verbatim(tmp_path):
+    """Non-ASCII characters, quotes and tabs in paths come back unquoted, as stored on File nodes."""
+    loader = make_loader(tmp_path, FakeGit(name_status(
+        ("M", "docs/été.md"),
+        ("D", 'src/say "hi".py'),
+        ("R100", "src/tab\tname.py", "src/naïve.py"),
+    )))
+
+    added, modified, deleted = loader.get_changed_files("a" * 40, "b" * 40)
+
+    assert added == ["src/naïve.py"]
+    assert modified == ["docs/été.md"]
+    assert deleted == ['src/say "hi".py', "src/tab\tname.py"]
+
+
+def test_changed_files_empty_diff(tmp_path):
+    loader = make_loader(tmp_path, FakeGit(""))
+
+    assert loader.get_changed_files("a" * 40, "b" * 40) == ([], [], [])
+
+
+def test_changed_files_unknown_commit(tmp_path):
+    """A diff git cannot compute (e.g. a rewritten history) asks for a full re-ingest."""
+    loader = make_loader(tmp_path, FakeGit(error=git.GitCommandError("diff", 128)))
+
+    assert loader.get_changed_files("a" * 40, "b" * 40) is None
+
+
+def test_changed_files_requires_repo(tmp_path):
+    loader = GitLoader("https://github.com/org/repo.git", clone_dir=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        loader.get_changed_files("a" * 40, "b" * 40)
+
+
+@pytest.mark.parametrize("repo_url, expected", [
+    ("https://github.com/org/langchain.git", "langchain"),
+    ("https://github.com/org/langchain", "langchain"),
+    ("https://github.com/org/langchain.git/", "langchain"),
+    ("https://github.com/org/widget", "widget"),
+    ("https://github.com/org/gitit.git", "gitit"),
+    ("git@github.com:org/repo-name.git", "repo-name"),
+])
+def test_repo_name_from_url(repo_url, expected):
+    """Only a literal ".git" suffix is removed, never trailing letters of the name."""
+    assert repo_name_from_url(repo_url) == expected